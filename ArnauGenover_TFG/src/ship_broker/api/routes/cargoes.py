@@ -9,6 +9,7 @@ import logging
 from ...core.database import Cargo, Vessel
 from ...core.schemas import CargoCreate, CargoResponse
 from ...core.cargo_tracker import CargoTracker
+from ...core.ports import resolve_port_id
 from ...core.vessel_tracker import tracker
 from ..dependencies import get_db
 
@@ -40,6 +41,8 @@ async def create_cargo(cargo: CargoCreate, db: Session = Depends(get_db)):
             quantity=cargo.quantity,
             load_port=cargo.load_port,
             discharge_port=cargo.discharge_port,
+            load_port_id=resolve_port_id(cargo.load_port),
+            discharge_port_id=resolve_port_id(cargo.discharge_port),
             laycan_start=cargo.laycan_start,
             laycan_end=cargo.laycan_end,
             description=cargo.description,
@@ -77,7 +80,7 @@ async def get_matching_vessels(cargo_id: int, db: Session = Depends(get_db)):
 
             # Location matching (40% of score)
             if cargo.load_port:
-                port_coords = tracker._get_port_coordinates(cargo.load_port)
+                port_coords = tracker._get_port_coordinates(cargo.load_port, cargo.load_port_id)
                 if port_coords and vessel.get('lat') and vessel.get('lon'):
                     distance = tracker._calculate_distance(
                         port_coords['lat'],
@@ -1,13 +1,20 @@
 # src/ship_broker/api/routes/email_processing.py
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Any, Dict, List
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from ...core.email_parser import EmailParser
-from ...core.database import Vessel, Cargo, ProcessedEmail  # Added ProcessedEmail import
+from ...core.email_pipeline import EmailPipeline
+from ...core.archive_reprocessor import ArchiveReprocessor
+from ...core.extraction_cache import get_extraction_cache
+from ...core.database import ProcessedEmail
+from ...core.extraction_metrics import PARSER_LLM
+from ...core.model_router import get_model_router
 from ...config import Settings, get_settings
 from ..dependencies import get_db
 
@@ -19,7 +26,7 @@ async def process_emails(
     reprocess: bool = False,
     db: Session = Depends(get_db),
     settings: Settings = Depends(get_settings)
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """Process emails and extract vessel/cargo information"""
     try:
         parser = EmailParser(
@@ -29,36 +36,22 @@ async def process_emails(
             imap_server=settings.IMAP_SERVER
         )
         
+        reprocessed = None
         if reprocess:
-            # Clear existing data if reprocessing
-            try:
-                db.query(ProcessedEmail).delete()
-                db.query(Cargo).delete()
-                db.query(Vessel).delete()
-                db.commit()
-            except Exception as e:
-                logger.error(f"Error clearing database: {str(e)}")
-                db.rollback()
+            # Re-extract archived emails parsed by an older parser version,
+            # replacing only the records that came from them
+            reprocessed = await asyncio.to_thread(ArchiveReprocessor(parser).run)
         
-        emails = parser.get_emails(days=1)
-        logger.info(f"Found {len(emails)} emails to process")
-        
-        total_vessels = 0
-        total_cargoes = 0
-        
-        for email_data in emails:
-            try:
-                logger.info(f"Processing email with subject: {email_data['subject']}")
-                cargoes, vessels = parser.process_and_store_email(email_data)
-                total_vessels += len(vessels)
-                total_cargoes += len(cargoes)
-            except Exception as e:
-                logger.error(f"Error processing individual email: {str(e)}")
-                continue
+        result = await EmailPipeline(parser).run(days=1)
         
         return {
             "status": "success",
-            "message": f"Processed {len(emails)} emails. Found {total_vessels} vessels and {total_cargoes} cargoes",
+            "message": f"Processed {result.emails} emails. Found {result.vessels} vessels and {result.cargoes} cargoes",
+            "duplicates": result.duplicates,
+            "reprocessed": reprocessed.to_dict() if reprocessed else None,
+            "stages": result.to_dict()["stages"],
+            "extraction_cache": _cache_stats(),
+            "model_routing": get_model_router().stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -67,4 +60,73 @@ async def process_emails(
         raise HTTPException(
             status_code=500,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+def _cache_stats() -> Dict[str, Any]:
+    cache = get_extraction_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@router.get("/extraction-cache/")
+async def extraction_cache_stats() -> Dict[str, Any]:
+    """Size and hit/miss counts of the LLM extraction cache since startup"""
+    return _cache_stats()
+
+@router.get("/model-routing/")
+async def model_routing_stats() -> Dict[str, Any]:
+    """Blocks answered by the fast model or escalated to the strong one since startup, with reasons"""
+    return get_model_router().stats()
+
+@router.get("/extraction-costs/")
+async def extraction_costs(
+    group_by: str = Query("day", pattern="^(sender|day)$"),
+    days: int = Query(30, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """
+    LLM tokens, requests, cache use and extraction time of the emails
+    processed in the last `days`, per sender or per day, most tokens first.
+    Emails processed before accounting existed count as emails only.
+    """
+    key = ProcessedEmail.sender if group_by == 'sender' else func.date(ProcessedEmail.processed_at)
+    prompt = func.coalesce(func.sum(ProcessedEmail.prompt_tokens), 0)
+    completion = func.coalesce(func.sum(ProcessedEmail.completion_tokens), 0)
+    rows = db.query(
+        key,
+        func.count(ProcessedEmail.id),
+        func.sum(case((ProcessedEmail.parser == PARSER_LLM, 1), else_=0)),
+        func.coalesce(func.sum(ProcessedEmail.llm_requests), 0),
+        func.coalesce(func.sum(ProcessedEmail.llm_retries), 0),
+        prompt,
+        completion,
+        func.coalesce(func.sum(ProcessedEmail.cache_hits), 0),
+        func.coalesce(func.sum(ProcessedEmail.cache_misses), 0),
+        func.coalesce(func.sum(ProcessedEmail.escalations), 0),
+        func.coalesce(func.sum(ProcessedEmail.tokens_saved), 0),
+        func.coalesce(func.sum(ProcessedEmail.extraction_seconds), 0.0),
+        func.max(ProcessedEmail.extraction_seconds)
+    ).filter(
+        ProcessedEmail.processed_at >= datetime.utcnow() - timedelta(days=days)
+    ).group_by(key).order_by((prompt + completion).desc()).limit(limit).all()
+
+    costs = []
+    for (group, emails, llm_emails, requests, retries, prompt_tokens, completion_tokens,
+         hits, misses, escalations, saved, seconds, max_seconds) in rows:
+        lookups = hits + misses
+        costs.append({
+            group_by: str(group) if group is not None else None,
+            "emails": emails,
+            "llm_emails": llm_emails or 0,
+            "llm_requests": requests,
+            "llm_retries": retries,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_per_email": round((prompt_tokens + completion_tokens) / emails, 1),
+            "tokens_saved": saved,
+            "cache_hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "escalations": escalations,
+            "extraction_seconds": round(seconds, 3),
+            "mean_seconds": round(seconds / emails, 3),
+            "max_seconds": round(max_seconds or 0.0, 3)
+        })
+    return costs
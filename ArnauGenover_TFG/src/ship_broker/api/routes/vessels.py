@@ -73,10 +73,15 @@ async def get_matching_cargoes(vessel_id: int, db: Session = Depends(get_db)):
                 
             # Location matching (30% of score)
             if vessel.position and cargo.load_port:
-                port_coords = tracker._get_port_coordinates(cargo.load_port)
+                port_coords = tracker._get_port_coordinates(cargo.load_port, cargo.load_port_id)
                 if port_coords:
                     try:
-                        vessel_coords = tracker._parse_position(vessel.position)
+                        # Stored IDs can predate a gazetteer change; fall back to the position text
+                        open_port = tracker._get_port_coordinates(vessel.position, vessel.position_port_id)
+                        if open_port:
+                            vessel_coords = (open_port['lat'], open_port['lon'])
+                        else:
+                            vessel_coords = tracker._parse_position(vessel.position)
                         if vessel_coords and vessel_coords[0] is not None:
                             distance = tracker._calculate_distance(
                                 port_coords['lat'],
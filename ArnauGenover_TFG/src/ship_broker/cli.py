@@ -1,5 +1,6 @@
-"""Console script for ArnauGenover_TFG."""
-import ArnauGenover_TFG
+"""Console script for ship_broker."""
+from pathlib import Path
+from typing import List, Optional
 
 import typer
 from rich.console import Console
@@ -8,13 +9,176 @@ app = typer.Typer()
 console = Console()
 
 
-@app.command()
+@app.callback()
 def main():
-    """Console script for ArnauGenover_TFG."""
-    console.print("Replace this message by putting your code into "
-               "ArnauGenover_TFG.cli.main")
-    console.print("See Typer documentation at https://typer.tiangolo.com/")
-    
+    """Ship broker command line tools."""
+
+
+@app.command()
+def ingest(
+    paths: List[Path] = typer.Argument(..., help="mbox files, Maildir folders or directories of .eml files"),
+    workers: Optional[int] = typer.Option(None, help="Extraction processes (default: CPU count)"),
+    batch_size: int = typer.Option(500, help="Emails written per database transaction"),
+    use_ai: bool = typer.Option(False, "--use-ai/--no-ai", help="Extract with OpenAI instead of regex only"),
+):
+    """Backfill vessels and cargoes from offline mailboxes."""
+    from .core.bulk_ingest import BulkIngestor
+    from .core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = BulkIngestor(db, workers=workers, batch_size=batch_size, use_ai=use_ai).ingest(paths)
+    finally:
+        db.close()
+
+    console.print(
+        f"Ingested {stats.messages} emails ({stats.stored} stored, {stats.duplicates} of them duplicates, "
+        f"{stats.skipped} already processed, {stats.failed} failed): "
+        f"{stats.vessels} vessels, {stats.cargoes} cargoes"
+    )
+    console.print(f"{stats.seconds:.1f}s, {stats.emails_per_second:.1f} emails/s")
+
+
+@app.command("triage-eval")
+def triage_eval(
+    corpus: Path = typer.Argument(..., help="JSON lines with subject, content and label (no_content, regex_sufficient, needs_llm)"),
+    thresholds: str = typer.Option("0.5,0.6,0.7,0.8,0.9,1.0", help="Regex coverage thresholds to compare"),
+    max_regex_records: Optional[int] = typer.Option(None, help="Longest circular kept local (default: from settings)"),
+):
+    """Measure the LLM pre-classifier against a labelled corpus."""
+    import json
+    from .core.email_triage import EmailTriage, Triage, evaluate, sweep_coverage
+
+    samples = []
+    with corpus.open(encoding="utf-8") as lines:
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record.get("subject"), record.get("content", ""), Triage(record["label"])))
+
+    report = evaluate(EmailTriage(max_regex_records=max_regex_records), samples)
+    console.print(f"Current settings on {report.total} emails: {report.to_dict()}")
+    console.print("coverage  accuracy  llm_share  missed")
+    for threshold, report in sweep_coverage(samples, [float(t) for t in thresholds.split(",")], max_regex_records):
+        console.print(f"{threshold:8.2f}  {report.accuracy:8.3f}  {report.llm_share:9.3f}  {report.missed:6d}")
+
+
+@app.command("fake-llm")
+def fake_llm(
+    host: str = typer.Option("127.0.0.1"),
+    port: int = typer.Option(8089),
+    latency: float = typer.Option(0.5, help="Seconds before each answer"),
+    jitter: float = typer.Option(0.0, help="Uniform extra seconds of latency"),
+    error_rate: float = typer.Option(0.0, help="Share of requests answered with a 500"),
+    rate_limit_rate: float = typer.Option(0.0, help="Share of requests answered with a 429"),
+    timeout_rate: float = typer.Option(0.0, help="Share of requests left hanging"),
+    truncate_rate: float = typer.Option(0.0, help="Share of streamed answers cut off halfway"),
+    chunk_delay: float = typer.Option(0.0, help="Seconds between streamed chunks"),
+    requests_per_minute: int = typer.Option(0, help="Request quota, enforced with 429s (0 for none)"),
+    retry_after: float = typer.Option(1.0, help="Seconds asked for in random 429s"),
+    responses: Optional[Path] = typer.Option(None, help='JSON list of {"match": text, "response": answer}'),
+    seed: Optional[int] = typer.Option(None, help="Seed for reproducible fault injection"),
+):
+    """Serve a local stand-in for the chat completions API, for offline load tests (EXTRACTION_BACKEND=fake)."""
+    from .core.fake_llm_server import FakeLLMConfig, FakeLLMServer
+
+    config = FakeLLMConfig(
+        latency=latency, jitter=jitter, error_rate=error_rate, rate_limit_rate=rate_limit_rate,
+        timeout_rate=timeout_rate, truncate_rate=truncate_rate, chunk_delay=chunk_delay,
+        requests_per_minute=requests_per_minute, retry_after=retry_after,
+        responses=FakeLLMConfig.load_responses(str(responses)) if responses else [], seed=seed
+    )
+    server = FakeLLMServer(config, host, port)
+    console.print(f"Fake LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        console.print(f"Served: {server.stats()}")
+
+
+@app.command("fake-imap")
+def fake_imap(
+    host: str = typer.Option("127.0.0.1"),
+    port: int = typer.Option(1143),
+    messages: int = typer.Option(200, help="Synthetic messages"),
+    body_bytes: int = typer.Option(4000, help="Approximate text per message"),
+    attachment_rate: float = typer.Option(0.3, help="Share of messages with attachments"),
+    attachment_bytes: int = typer.Option(200_000, help="Mean attachment size"),
+    days: int = typer.Option(7, help="Days the messages are spread over"),
+    latency: float = typer.Option(0.0, help="Seconds before each response"),
+    bytes_per_second: int = typer.Option(0, help="Bandwidth cap (0 for none)"),
+    mailbox: Optional[Path] = typer.Option(None, help="mbox, Maildir or .eml directory served instead"),
+    seed: Optional[int] = typer.Option(None, help="Seed for a reproducible mailbox"),
+):
+    """Serve a local IMAP mailbox over plain TCP (IMAP_SERVER=127.0.0.1 IMAP_PORT=1143 IMAP_SSL=false)."""
+    from .core.fake_imap_server import FakeIMAPConfig, FakeIMAPServer
+
+    config = FakeIMAPConfig(
+        messages=messages, body_bytes=body_bytes, attachment_rate=attachment_rate,
+        attachment_bytes=attachment_bytes, days=days, latency=latency, bytes_per_second=bytes_per_second,
+        mailbox=str(mailbox) if mailbox else None, seed=seed
+    )
+    server = FakeIMAPServer(config, host, port)
+    console.print(f"Fake IMAP on {host}:{server.address[1]}: {len(server.messages)} messages, "
+                  f"{server.mailbox_bytes / 1e6:.1f} MB")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        console.print(f"Served: {server.stats()}")
+
+
+@app.command("imap-bench")
+def imap_bench(
+    messages: int = typer.Option(200, help="Synthetic messages"),
+    body_bytes: int = typer.Option(4000, help="Approximate text per message"),
+    attachment_rate: float = typer.Option(0.3, help="Share of messages with attachments"),
+    attachment_bytes: int = typer.Option(200_000, help="Mean attachment size"),
+    days: int = typer.Option(7, help="Days fetched, and spread of the synthetic messages"),
+    latency: float = typer.Option(0.02, help="Seconds per round trip"),
+    bytes_per_second: int = typer.Option(0, help="Bandwidth cap (0 for none)"),
+    mailbox: Optional[Path] = typer.Option(None, help="mbox, Maildir or .eml directory served instead"),
+    runs: int = typer.Option(3, help="Syncs measured"),
+    seed: int = typer.Option(1, help="Seed for a reproducible mailbox"),
+):
+    """Measure mailbox sync against the fake IMAP server: time, round trips and bytes transferred."""
+    import time
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from .core.database import Base
+    from .core.email_parser import EmailParser
+    from .core.fake_imap_server import FakeIMAPConfig, FakeIMAPServer
+
+    config = FakeIMAPConfig(
+        messages=messages, body_bytes=body_bytes, attachment_rate=attachment_rate,
+        attachment_bytes=attachment_bytes, days=days, latency=latency, bytes_per_second=bytes_per_second,
+        mailbox=str(mailbox) if mailbox else None, seed=seed
+    )
+    # A scratch database, so emails processed in the real one are still fetched
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+
+    with FakeIMAPServer(config) as server, Session(bind=engine) as db:
+        host, port = server.address
+        parser = EmailParser("bench", "bench", db, host, use_ai=False, imap_port=port, imap_ssl=False)
+        console.print(f"Mailbox: {len(server.messages)} messages, {server.mailbox_bytes / 1e6:.1f} MB")
+        console.print("run  emails  seconds  emails/s  round_trips  MB_sent  mailbox_share")
+        for run in range(1, runs + 1):
+            server.reset_stats()
+            started = time.perf_counter()
+            emails = parser.get_emails(days)
+            seconds = time.perf_counter() - started
+            stats = server.stats()
+            sent = stats.get("bytes_sent", 0)
+            console.print(
+                f"{run:3d}  {len(emails):6d}  {seconds:7.2f}  {len(emails) / seconds:8.1f}  "
+                f"{stats.get('commands', 0):11d}  {sent / 1e6:7.2f}  {sent / max(1, server.mailbox_bytes):13.1%}"
+            )
 
 
 if __name__ == "__main__":
@@ -19,10 +19,49 @@ class Settings(BaseSettings):
     EMAIL_ADDRESS: str = ""
     EMAIL_PASSWORD: str = ""
     IMAP_SERVER: str = "imap.gmail.com"
+    IMAP_PORT: int = int(os.getenv("IMAP_PORT", "0"))  # 0 for the protocol default
+    IMAP_SSL: bool = os.getenv("IMAP_SSL", "true").lower() == "true"  # false for local servers such as `ship-broker fake-imap`
     EMAIL_CHECK_INTERVAL: int = int(os.getenv("EMAIL_CHECK_INTERVAL", "300"))  # 5 minutes default
+    EMAIL_USE_IDLE: bool = os.getenv("EMAIL_USE_IDLE", "true").lower() == "true"  # Push ingestion via IMAP IDLE
+    EMAIL_IDLE_TIMEOUT: int = int(os.getenv("EMAIL_IDLE_TIMEOUT", "1740"))  # Re-issue IDLE every 29 minutes
+    EMAIL_JOB_LEASE_SECONDS: int = int(os.getenv("EMAIL_JOB_LEASE_SECONDS", "600"))  # Lease per leased email job
+    EMAIL_JOB_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_JOB_MAX_ATTEMPTS", "3"))
+    PRIORITY_SENDER_WEIGHTS: str = os.getenv("PRIORITY_SENDER_WEIGHTS", "")  # e.g. "desk@broker.com=3,newsletter.com=0.2"; others weigh 1
+    PRIORITY_HALF_LIFE_HOURS: float = float(os.getenv("PRIORITY_HALF_LIFE_HOURS", "24"))  # Message age that halves an email's priority
+    PRIORITY_URGENCY_DAYS: int = int(os.getenv("PRIORITY_URGENCY_DAYS", "5"))  # ETA, laycan or open dates this close are urgent
+    PRIORITY_URGENCY_WEIGHT: float = float(os.getenv("PRIORITY_URGENCY_WEIGHT", "1.0"))  # Added to the priority of urgent emails
+    PRIORITY_AGING_PER_HOUR: float = float(os.getenv("PRIORITY_AGING_PER_HOUR", "0.25"))  # Priority queued emails gain per hour, so none starve
+    EMAIL_MAX_PART_BYTES: int = int(os.getenv("EMAIL_MAX_PART_BYTES", str(512 * 1024)))  # Text kept per MIME part
+    EMAIL_MAX_TEXT_BYTES: int = int(os.getenv("EMAIL_MAX_TEXT_BYTES", str(1024 * 1024)))  # Text kept per email
+    EMAIL_MAX_FETCH_BYTES: int = int(os.getenv("EMAIL_MAX_FETCH_BYTES", str(4 * 1024 * 1024)))  # Raw bytes downloaded per email
+    EMAIL_FETCH_CHUNK_BYTES: int = int(os.getenv("EMAIL_FETCH_CHUNK_BYTES", str(256 * 1024)))
+    TEMPLATE_MIN_SUPPORT: int = int(os.getenv("TEMPLATE_MIN_SUPPORT", "2"))  # LLM-parsed emails before a sender layout is trusted
+    TEMPLATE_MIN_CONFIDENCE: float = float(os.getenv("TEMPLATE_MIN_CONFIDENCE", "0.8"))  # Share of record lines a template must cover
+    DEDUP_SIMILARITY_THRESHOLD: float = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.9"))  # Near-duplicate body similarity
+    TRIAGE_ENABLED: bool = os.getenv("TRIAGE_ENABLED", "true").lower() == "true"  # Decide locally whether an email needs the LLM
+    TRIAGE_REGEX_COVERAGE: float = float(os.getenv("TRIAGE_REGEX_COVERAGE", "1.0"))  # Share of records the regexes must capture; measure with `triage-eval`
+    TRIAGE_MAX_REGEX_RECORDS: int = int(os.getenv("TRIAGE_MAX_REGEX_RECORDS", "10"))  # Longer circulars always go to the LLM
     
     # OpenAI settings
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # Empty for api.openai.com
+    EXTRACTION_BACKEND: str = os.getenv("EXTRACTION_BACKEND", "openai")  # openai, regex (no model) or fake (local stand-in server)
+    FAKE_LLM_URL: str = os.getenv("FAKE_LLM_URL", "http://127.0.0.1:8089/v1")  # Where `ship-broker fake-llm` listens
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Completion requests in flight, process-wide
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))  # Per request
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))  # Timeouts, connection errors, 429s and 5xx
+    LLM_BACKOFF_BASE_SECONDS: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+    LLM_BACKOFF_MAX_SECONDS: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+    EXTRACTION_MODEL: str = os.getenv("EXTRACTION_MODEL", "gpt-4-turbo-preview")  # Strong model, for blocks the fast one gets wrong
+    EXTRACTION_FAST_MODEL: str = os.getenv("EXTRACTION_FAST_MODEL", "gpt-4o-mini")  # Tried first for every block; empty to disable routing
+    ROUTING_MIN_CONFIDENCE: float = float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.8"))  # Fast answers scoring below this are escalated
+    EXTRACTION_CONCURRENCY: int = int(os.getenv("EXTRACTION_CONCURRENCY", "4"))  # Emails extracted in parallel
+    EXTRACTION_BLOCK_CHARS: int = int(os.getenv("EXTRACTION_BLOCK_CHARS", "6000"))  # Circulars longer than this are split into blocks
+    EXTRACTION_TOKEN_BUDGET: int = int(os.getenv("EXTRACTION_TOKEN_BUDGET", "24000"))  # Body tokens sent per block after trimming; the rest is cut
+    EXTRACTION_BLOCK_RETRIES: int = int(os.getenv("EXTRACTION_BLOCK_RETRIES", "2"))  # Retries per failed block
+    EXTRACTION_CACHE_ENABLED: bool = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"  # Reuse LLM answers for seen text
+    EXTRACTION_CACHE_PATH: str = os.getenv("EXTRACTION_CACHE_PATH", "./src/ship_broker/extraction_cache.db")
+    EXTRACTION_CACHE_MAX_MB: int = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "256"))  # Least recently used entries evicted beyond this
     
     # Auction settings
     AUCTION_DURATION_DAYS: int = int(os.getenv("AUCTION_DURATION_DAYS", "15"))
@@ -0,0 +1,108 @@
+# src/ship_broker/core/archive_reprocessor.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .database import EmailFingerprint
+from .email_archive import EmailArchive
+from .email_parser import EmailParser, PARSER_VERSION
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class ReprocessStats:
+    emails: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    vessels: int = 0
+    cargoes: int = 0
+    remaining: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "emails": self.emails,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "vessels": self.vessels,
+            "cargoes": self.cargoes,
+            "remaining": self.remaining,
+            "seconds": round(self.seconds, 3)
+        }
+
+
+class ArchiveReprocessor:
+    """
+    Re-extracts archived emails that an older parser version produced, in
+    batches: each batch's old vessels and cargoes are replaced by the new
+    extraction in one transaction, so an interrupted run loses nothing and
+    the next run continues where it stopped. Emails linked as duplicates
+    keep sharing their original's results and are only re-stamped.
+    """
+
+    def __init__(self, parser: EmailParser, batch_size: int = 100, concurrency: Optional[int] = None):
+        self.parser = parser
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency or settings.EXTRACTION_CONCURRENCY)
+
+    def run(self, limit: Optional[int] = None) -> ReprocessStats:
+        """Reprocess up to `limit` stale archived emails (all of them by default)"""
+        stats = ReprocessStats()
+        started = time.perf_counter()
+        db = self.parser.db
+        archive = EmailArchive(db)
+        duplicates = {
+            message_id for (message_id,) in db.query(EmailFingerprint.message_id).filter(
+                EmailFingerprint.duplicate_of.isnot(None)
+            )
+        }
+
+        # Load fingerprints and templates before the extraction threads share the parser's session
+        self.parser.duplicate_index()
+        self.parser.sender_templates()
+
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reprocess") as pool:
+            while limit is None or stats.emails < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - stats.emails)
+                rows = archive.stale(PARSER_VERSION, size, after_id=last_id)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                emails = [archive.load(row) for row in rows]
+                batch = [
+                    (row, email_data) for row, email_data in zip(rows, emails)
+                    if email_data.get('message_id') not in duplicates
+                ]
+                try:
+                    extracted = list(pool.map(self.parser.extract_email, [email_data for _, email_data in batch]))
+                    self.parser.replace_results([
+                        (row, cargoes, vessels) for (row, _), (cargoes, vessels) in zip(batch, extracted)
+                    ])
+                    archive.mark_parsed(rows, PARSER_VERSION)
+                    db.commit()
+                except Exception as e:
+                    logger.error(f"Failed to reprocess archived emails {rows[0].id}-{last_id}: {str(e)}")
+                    db.rollback()
+                    stats.failed += len(rows)
+                    continue
+
+                stats.emails += len(rows)
+                stats.duplicates += len(rows) - len(batch)
+                stats.vessels += sum(len(vessels) for _, vessels in extracted)
+                stats.cargoes += sum(len(cargoes) for cargoes, _ in extracted)
+
+        stats.remaining = archive.count_stale(PARSER_VERSION)
+        stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Reprocessed {stats.emails} archived emails in {stats.seconds:.1f}s "
+            f"({stats.vessels} vessels, {stats.cargoes} cargoes, {stats.remaining} remaining)"
+        )
+        return stats
@@ -105,6 +105,63 @@ class AuctionService:
             self.db.rollback()
             return None
 
+    def create_auctions_for_vessels(self, vessels: List[Vessel], commit: bool = True) -> List[Auction]:
+        """
+        Create auctions for several vessels with one lookup of existing auctions
+        and one batched insert. With commit=False the auctions are only added to
+        the session so the caller can commit them with its own transaction.
+        """
+        candidates = [vessel for vessel in vessels if vessel.id is not None and vessel.dwt]
+        skipped = len(vessels) - len(candidates)
+        if skipped:
+            logger.error(f"Skipped {skipped} vessels without ID or DWT specified")
+        if not candidates:
+            return []
+
+        try:
+            existing = {
+                vessel_id for (vessel_id,) in self.db.query(Auction.vessel_id).filter(
+                    Auction.vessel_id.in_([vessel.id for vessel in candidates]),
+                    Auction.status == AuctionStatus.ACTIVE
+                )
+            }
+
+            start_date = datetime.utcnow()
+            auctions = []
+            for vessel in candidates:
+                if vessel.id in existing:
+                    logger.info(f"Vessel {vessel.id} already has an active auction")
+                    continue
+
+                params = self.calculate_auction_parameters(vessel)
+                auctions.append(Auction(
+                    vessel_id=vessel.id,
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=params["duration_days"]),
+                    space_mt=vessel.dwt,
+                    space_sold_mt=0.0,
+                    start_price=params["start_price"],
+                    current_price=params["start_price"],
+                    min_price=params["min_price"],
+                    daily_reduction=params["daily_reduction"],
+                    status=AuctionStatus.ACTIVE,
+                    last_updated=start_date
+                ))
+
+            self.db.add_all(auctions)
+            if commit:
+                self.db.commit()
+
+            logger.info(f"Created {len(auctions)} auctions for {len(candidates)} vessels")
+            return auctions
+
+        except Exception as e:
+            logger.error(f"Error creating auctions in bulk: {str(e)}")
+            if commit:
+                self.db.rollback()
+                return []
+            raise
+
     def update_auction_prices(self):
         """Update current prices for all active auctions"""
         try:
@@ -0,0 +1,167 @@
+# src/ship_broker/core/body_trimmer.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .circular_splitter import RECORD_FEATURES
+from .section_classifier import SECTION_SPLIT, scan_section
+
+# Start of the previous message in a reply; forwarded messages are content and are kept
+_REPLY_HISTORY = re.compile(
+    r'^[ \t]*-{2,}[ \t]*original message[ \t]*-*[ \t]*$'
+    r'|^[ \t]*on\b[^\n]{0,200}\bwrote:[ \t]*$'
+    r'|^[ \t]*from:[^\n]*\n[ \t]*sent:',
+    re.IGNORECASE | re.MULTILINE
+)
+_QUOTED_LINE = re.compile(r'^[ \t]*>.*(?:\n|$)', re.MULTILINE)
+# "-- " signature delimiter, or a sign-off line on its own
+_SIGNATURE = re.compile(
+    r'^(?:--[ \t]*'
+    r'|[ \t]*(?:best|kind|warm|many\s+thanks\s+(?:and|&)|thanks\s+(?:and|&))?[ \t]*'
+    r'(?:regards|rgds|brgds|b\.?\s?rgds|cheers|sincerely)[ \t,.!]*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+_DISCLAIMER = re.compile(
+    r'\b(?:this\s+e-?mail\s+(?:message\s+)?(?:and\s+any\s+attachments?|is\s+confidential|may\s+contain)'
+    r'|intended\s+(?:solely|only)\s+for\s+the\s+(?:use\s+of\s+the\s+)?(?:addressee|recipient|individual)'
+    r'|if\s+you\s+(?:have\s+)?received\s+this\s+(?:e-?mail|message|communication)\s+in\s+error'
+    r'|please\s+consider\s+the\s+environment\s+before\s+printing'
+    r'|disclaimer\s*:|virus[\s\-]free|scanned\s+for\s+viruses)',
+    re.IGNORECASE
+)
+_TRAILING_SPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count, about four characters per token for GPT tokenizers; no tokenizer needed"""
+    return (len(text or '') + 3) // 4
+
+
+def _has_records(text: str) -> bool:
+    """Whether any section holds a vessel or cargo, so cutting around it is safe"""
+    for section in SECTION_SPLIT.split(text):
+        if not section.strip():
+            continue
+        scan = scan_section(section)
+        if not scan.features.isdisjoint(RECORD_FEATURES) or scan.get('vessel_name') or scan.get('cargo_type'):
+            return True
+    return False
+
+
+def strip_reply_history(text: str) -> str:
+    """
+    Drop the quoted conversation under a reply. Only done when the new
+    message holds records itself: a "see below" reply to a circular keeps the
+    circular.
+    """
+    match = _REPLY_HISTORY.search(text)
+    if match and _has_records(text[:match.start()]):
+        text = text[:match.start()]
+    unquoted = _QUOTED_LINE.sub('', text)
+    if unquoted != text and _has_records(unquoted):
+        text = unquoted
+    return text
+
+
+def strip_signature(text: str) -> str:
+    """Cut at the first signature delimiter or sign-off with no records after it"""
+    for match in _SIGNATURE.finditer(text):
+        if match.start() == 0:
+            continue
+        if not _has_records(text[match.end():]):
+            return text[:match.start()]
+    return text
+
+
+def strip_disclaimers(text: str) -> str:
+    """Drop legal and environmental boilerplate paragraphs"""
+    sections = SECTION_SPLIT.split(text)
+    kept = [section for section in sections if not _DISCLAIMER.search(section) or _has_records(section)]
+    return '\n\n'.join(section.strip('\n') for section in kept) if len(kept) < len(sections) else text
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """Whole sections from the top that fit in `max_tokens`; a single oversized section is cut on lines"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max_tokens * 4
+    kept: List[str] = []
+    size = 0
+    for section in SECTION_SPLIT.split(text):
+        section = section.strip('\n')
+        if size + len(section) + 2 > max_chars:
+            if not kept:
+                lines = []
+                for line in section.splitlines():
+                    if size + len(line) + 1 > max_chars:
+                        break
+                    lines.append(line)
+                    size += len(line) + 1
+                kept.append('\n'.join(lines))
+            break
+        kept.append(section)
+        size += len(section) + 2
+    return '\n\n'.join(kept)
+
+
+@dataclass
+class TrimResult:
+    """Trimmed email body and what each stage removed, in estimated tokens"""
+    text: str
+    original_tokens: int
+    removed: Dict[str, int] = field(default_factory=dict)
+    truncated: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    def to_dict(self) -> Dict:
+        return {
+            "original": self.original_tokens,
+            "trimmed": self.tokens,
+            "saved": self.tokens_saved,
+            "removed": dict(self.removed),
+            "truncated": self.truncated
+        }
+
+
+_STAGES = (
+    ('reply_history', strip_reply_history),
+    ('disclaimers', strip_disclaimers),
+    ('signature', strip_signature),
+)
+
+
+def trim_body(text: Optional[str], max_tokens: Optional[int] = None) -> TrimResult:
+    """
+    Email body reduced to what the extractor needs: without the quoted
+    history of a reply, legal disclaimers or the signature, and with
+    whitespace tidied. Each stage is skipped when it would cut a vessel or
+    cargo record. With `max_tokens`, whatever is still over budget is cut
+    at section boundaries from the end.
+    """
+    text = text or ''
+    result = TrimResult(text=text, original_tokens=estimate_tokens(text))
+    current = _BLANK_LINES.sub('\n\n', _TRAILING_SPACE.sub('', text.replace('\r\n', '\n'))).strip()
+    result.removed['whitespace'] = result.original_tokens - estimate_tokens(current)
+
+    for name, stage in _STAGES:
+        trimmed = stage(current).strip()
+        result.removed[name] = estimate_tokens(current) - estimate_tokens(trimmed)
+        current = trimmed
+
+    if max_tokens is not None and estimate_tokens(current) > max_tokens:
+        trimmed = truncate_to_budget(current, max_tokens)
+        result.removed['budget'] = estimate_tokens(current) - estimate_tokens(trimmed)
+        result.truncated = True
+        current = trimmed
+
+    result.text = current
+    return result
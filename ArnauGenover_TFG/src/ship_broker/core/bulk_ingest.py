@@ -0,0 +1,222 @@
+# src/ship_broker/core/bulk_ingest.py
+
+import logging
+import mailbox
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import ProcessedEmail
+from .email_parser import EmailParser, CargoData, VesselData
+from .dedup import DuplicateIndex, fingerprint
+from .mime_extractor import MimeTextExtractor
+from .sender_templates import sender_address
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Per-process parser used by the pool workers
+_worker_parser: Optional[EmailParser] = None
+
+
+@dataclass
+class IngestStats:
+    messages: int = 0
+    stored: int = 0
+    duplicates: int = 0  # Stored emails linked to an earlier copy without being extracted
+    skipped: int = 0     # Already processed emails
+    failed: int = 0
+    vessels: int = 0
+    cargoes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def emails_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds > 0 else 0.0
+
+
+def iter_raw_messages(path: Path) -> Iterator[bytes]:
+    """
+    Yield raw RFC822 messages from an mbox file, a Maildir folder, a single
+    .eml file or a directory tree of .eml files.
+    """
+    path = Path(path)
+    if path.is_file():
+        if path.suffix.lower() == '.eml':
+            yield path.read_bytes()
+            return
+        box = mailbox.mbox(str(path), create=False)
+    elif (path / 'cur').is_dir() and (path / 'new').is_dir():
+        box = mailbox.Maildir(str(path), factory=None, create=False)
+    elif path.is_dir():
+        for eml in sorted(path.rglob('*.eml')):
+            yield eml.read_bytes()
+        return
+    else:
+        raise FileNotFoundError(f"No mailbox found at {path}")
+
+    try:
+        for key in box.iterkeys():
+            yield box.get_bytes(key)
+    finally:
+        box.close()
+
+
+def _init_worker(use_ai: bool):
+    global _worker_parser
+    # Extraction never touches the database, so workers need no session
+    _worker_parser = EmailParser("", "", db=None, use_ai=use_ai)
+
+
+def _parse_raw(raw: bytes) -> Optional[Dict]:
+    """Parse one raw message into the email dict the parser extracts from, in a pool worker"""
+    try:
+        extractor = MimeTextExtractor(settings.EMAIL_MAX_PART_BYTES, settings.EMAIL_MAX_TEXT_BYTES)
+        extractor.feed(raw)
+        content = extractor.close()
+        headers = extractor.headers or {}
+        return {
+            'subject': headers.get("subject") or "",
+            'content': content,
+            'message_id': headers.get("Message-ID"),
+            'sender': sender_address(headers.get("From")),
+            # Hashed here so the writer only has to look it up
+            'fingerprint': fingerprint(content)
+        }
+    except Exception as e:
+        logger.error(f"Failed to parse message: {str(e)}")
+        return None
+
+
+def _extract_parsed(email_data: Dict) -> Tuple[Optional[Dict], List[CargoData], List[VesselData]]:
+    """Extract the vessels and cargoes of one parsed message in a pool worker"""
+    try:
+        cargoes, vessels = _worker_parser.extract_email(email_data)
+        return email_data, cargoes, vessels
+    except Exception as e:
+        logger.error(f"Failed to extract message: {str(e)}")
+        return None, [], []
+
+
+def _batched(items: Iterable[bytes], size: int) -> Iterator[List[bytes]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkIngestor:
+    """
+    Offline ingestion of historical mailboxes.
+    Messages are parsed and fingerprinted across a process pool first; only
+    those not already processed and not copies of an extracted email go on
+    to extraction. Each batch of results is written in a single transaction
+    while the pool already works on the next batch.
+    """
+
+    def __init__(self, db: Session, workers: Optional[int] = None, batch_size: int = 500, use_ai: bool = False):
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.use_ai = use_ai
+        self.writer = EmailParser("", "", db=db, use_ai=False)
+
+    def ingest(self, paths: Iterable[Path]) -> IngestStats:
+        stats = IngestStats()
+        started = time.perf_counter()
+
+        messages = (raw for path in paths for raw in iter_raw_messages(path))
+        # Emails sent to extraction but not stored yet, so copies in the next batch are not extracted again
+        seen_ids: Set[str] = set()
+        submitted = DuplicateIndex(settings.DEDUP_SIMILARITY_THRESHOLD)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.use_ai,)) as pool:
+            pending = None
+            for batch in _batched(messages, self.batch_size):
+                chunksize = max(1, len(batch) // (self.workers * 4))
+                parsed = list(pool.map(_parse_raw, batch, chunksize=chunksize))
+                plan = self._plan(parsed, stats, seen_ids, submitted)
+                # map() submits the extractions now and returns results lazily
+                extracted = pool.map(
+                    _extract_parsed, [email_data for email_data, extract in plan if extract], chunksize=chunksize
+                )
+                if pending is not None:
+                    self._store(*pending, stats)
+                pending = (plan, extracted)
+                stats.messages += len(batch)
+            if pending is not None:
+                self._store(*pending, stats)
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Ingested {stats.messages} messages in {stats.seconds:.1f}s "
+            f"({stats.emails_per_second:.1f} emails/s)"
+        )
+        return stats
+
+    def _plan(self, parsed: List[Optional[Dict]], stats: IngestStats, seen_ids: Set[str],
+              submitted: DuplicateIndex) -> List[Tuple[Dict, bool]]:
+        """
+        Each parsed email with whether it needs extraction, dropping already
+        processed ones. Copies of an extracted or submitted email are kept,
+        unextracted, for store_batch to link to their original.
+        """
+        message_ids = [email_data['message_id'] for email_data in parsed if email_data and email_data['message_id']]
+        processed = {
+            message_id for (message_id,) in self.db.query(ProcessedEmail.message_id).filter(
+                ProcessedEmail.message_id.in_(message_ids)
+            )
+        } if message_ids else set()
+        index = self.writer.duplicate_index()
+
+        plan = []
+        for email_data in parsed:
+            if email_data is None:
+                stats.failed += 1
+                continue
+            message_id, fp = email_data['message_id'], email_data['fingerprint']
+            if message_id in processed or message_id in seen_ids:
+                stats.skipped += 1
+                continue
+            if not message_id or fp is None:
+                # Never fingerprinted by store_batch, so never linked either
+                plan.append((email_data, True))
+                continue
+            seen_ids.add(message_id)
+            if index.match(fp) or submitted.match(fp):
+                plan.append((email_data, False))
+                continue
+            submitted.add(message_id, fp)
+            plan.append((email_data, True))
+        return plan
+
+    def _store(self, plan: List[Tuple[Dict, bool]], extracted: Iterable[Tuple], stats: IngestStats):
+        results = iter(extracted)
+        batch = []
+        for email_data, extract in plan:
+            cargoes, vessels = [], []
+            if extract:
+                email_data, cargoes, vessels = next(results)
+                if email_data is None:
+                    stats.failed += 1
+                    continue
+            batch.append((email_data, cargoes, vessels))
+
+        try:
+            stored = self.writer.store_batch(batch)
+            stats.stored += stored.emails
+            stats.duplicates += stored.duplicates
+            stats.vessels += stored.vessels
+            stats.cargoes += stored.cargoes
+        except Exception as e:
+            logger.error(f"Failed to store batch of {len(batch)} emails: {str(e)}")
+            stats.failed += len(batch)
@@ -0,0 +1,90 @@
+# src/ship_broker/core/circular_splitter.py
+
+from typing import List
+
+from .section_classifier import SECTION_SPLIT, scan_section
+
+# Leading text repeated in front of every block, e.g. "PLS PROPOSE SUITABLE CARGOES FOR:"
+MAX_PREAMBLE_CHARS = 1000
+
+# Section features that describe one particular vessel or cargo, as opposed
+# to circular headers such as "propose suitable cargoes"
+RECORD_FEATURES = frozenset({
+    'mv_name', 'mv_block', 'vessel_block', 'name_block', 'ship_block', 'vessel_details',
+    'dwt', 'imo', 'dwcc', 'tonnage', 'quantity', 'laycan', 'load_port', 'discharge_port'
+})
+
+
+def _is_record(section: str) -> bool:
+    return not scan_section(section).features.isdisjoint(RECORD_FEATURES)
+
+
+def _split_long(record: str, max_chars: int) -> List[str]:
+    """Cut an oversized record on line boundaries; position lists often put one vessel per line"""
+    pieces: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in record.splitlines():
+        if current and size + len(line) + 1 > max_chars:
+            pieces.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append('\n'.join(current))
+    return pieces
+
+
+def split_records(text: str) -> List[str]:
+    """
+    Blank-line sections grouped into records: each section that describes a
+    vessel or cargo starts a record, and the sections after it that do not
+    (remarks, terms) stay attached to it. Text before the first record is
+    returned as the first element, possibly empty.
+    """
+    preamble: List[str] = []
+    records: List[List[str]] = []
+    for section in SECTION_SPLIT.split(text or ''):
+        section = section.strip()
+        if not section:
+            continue
+        if _is_record(section):
+            records.append([section])
+        elif records:
+            records[-1].append(section)
+        else:
+            preamble.append(section)
+    return ['\n\n'.join(preamble)] + ['\n\n'.join(record) for record in records]
+
+
+def split_blocks(text: str, max_chars: int) -> List[str]:
+    """
+    Split a circular into blocks of whole records of at most about
+    `max_chars` each, for independent extraction. Every block carries the
+    circular's preamble so instructions like "propose suitable cargoes"
+    still apply to it. Short emails come back as a single block, unchanged.
+    """
+    if len(text or '') <= max_chars:
+        return [text]
+
+    preamble, *records = split_records(text)
+    if len(records) < 2 and not any(len(record) > max_chars for record in records):
+        return [text]
+
+    preamble = preamble[:MAX_PREAMBLE_CHARS]
+    budget = max(max_chars - len(preamble), max_chars // 2)
+
+    blocks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for record in records:
+        for piece in _split_long(record, budget) if len(record) > budget else [record]:
+            if current and size + len(piece) + 2 > budget:
+                blocks.append(current)
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+    if current:
+        blocks.append(current)
+
+    return ['\n\n'.join(([preamble] if preamble else []) + block) for block in blocks]
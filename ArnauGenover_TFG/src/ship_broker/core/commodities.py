@@ -0,0 +1,95 @@
+# src/ship_broker/core/commodities.py
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from .phrase_matcher import PhraseMatcher
+
+# Canonical commodity -> (category, synonyms and broker abbreviations)
+TAXONOMY: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'GRAIN': ('AGRI', ('GRAINS', 'HSS', 'HEAVY GRAINS')),
+    'WHEAT': ('AGRI', ('MILLING WHEAT', 'FEED WHEAT', 'DURUM')),
+    'CORN': ('AGRI', ('MAIZE', 'YELLOW CORN')),
+    'BARLEY': ('AGRI', ('FEED BARLEY', 'MALTING BARLEY')),
+    'SOYBEANS': ('AGRI', ('SOYBEAN', 'SOYA BEANS', 'SOYA', 'SBS')),
+    'SOYBEAN MEAL': ('AGRI', ('SBM', 'SOYA MEAL', 'SOYMEAL', 'SOY MEAL')),
+    'SUGAR': ('AGRI', ('RAW SUGAR', 'WHITE SUGAR', 'BAGGED SUGAR')),
+    'RICE': ('AGRI', ('BAGGED RICE',)),
+    'COAL': ('ENERGY', ('STEAM COAL', 'THERMAL COAL', 'STEAMING COAL', 'COKING COAL', 'MET COAL', 'ANTHRACITE')),
+    'PETCOKE': ('ENERGY', ('PET COKE', 'PETROLEUM COKE', 'GREEN PETCOKE')),
+    'PALM KERNEL SHELLS': ('BIOMASS', ('PKS', 'PALM KERNEL SHELL')),
+    'WOOD PELLETS': ('BIOMASS', ('PELLETS', 'WOODPELLETS')),
+    'WOOD CHIPS': ('BIOMASS', ('WOODCHIPS',)),
+    'IRON ORE': ('ORE', ('IRON ORE FINES', 'IOF', 'IRON ORE PELLETS', 'FINES', 'LUMP ORE')),
+    'BAUXITE': ('ORE', ()),
+    'MANGANESE ORE': ('ORE', ('MANGANESE', 'MN ORE')),
+    'NICKEL ORE': ('ORE', ('NICKEL',)),
+    'COPPER CONCENTRATE': ('ORE', ('COPPER CONC', 'CU CONC', 'COPPER CONCENTRATES')),
+    'STEEL': ('STEEL', ('STEELS', 'STEEL PRODUCTS', 'STEEL CARGO')),
+    'HOT ROLLED COILS': ('STEEL', ('HRC', 'HR COILS', 'HOT ROLLED COIL')),
+    'COLD ROLLED COILS': ('STEEL', ('CRC', 'CR COILS', 'COLD ROLLED COIL')),
+    'STEEL BILLETS': ('STEEL', ('BILLETS',)),
+    'STEEL SLABS': ('STEEL', ('SLABS',)),
+    'REBARS': ('STEEL', ('REBAR', 'DEFORMED BARS')),
+    'PIG IRON': ('STEEL', ()),
+    'SCRAP': ('STEEL', ('STEEL SCRAP', 'HMS', 'HMS 1/2', 'SHREDDED SCRAP')),
+    'FERTILIZER': ('FERTILIZER', ('FERTILIZERS', 'FERTILISER', 'FERTILISERS')),
+    'UREA': ('FERTILIZER', ('GRANULAR UREA', 'PRILLED UREA')),
+    'POTASH': ('FERTILIZER', ('MOP', 'MURIATE OF POTASH')),
+    'PHOSPHATE': ('FERTILIZER', ('DAP', 'PHOSPHATE ROCK', 'ROCK PHOSPHATE', 'TSP')),
+    'SULPHUR': ('FERTILIZER', ('SULFUR',)),
+    'CEMENT': ('CONSTRUCTION', ('BAGGED CEMENT', 'BULK CEMENT')),
+    'CLINKER': ('CONSTRUCTION', ('CEMENT CLINKER',)),
+    'GYPSUM': ('CONSTRUCTION', ()),
+    'AGGREGATES': ('CONSTRUCTION', ('AGGREGATE', 'LIMESTONE', 'GRAVEL')),
+    'SALT': ('MINERALS', ('ROCK SALT', 'INDUSTRIAL SALT')),
+    'CARGO OPPORTUNITY': ('OPPORTUNITY', ()),
+}
+
+# Words that mark a cargo_type as a misread header or vessel detail
+SUSPICIOUS_TERMS = (
+    'DETAILS', 'DETAIL', 'INFO', 'CERTIFICATE', 'CERTIFICATES', 'AGE',
+    'WITH ALL', 'ARRIVING', 'NEXT', 'ETA'
+)
+
+_SUSPICIOUS = object()
+
+
+@dataclass(frozen=True)
+class CommodityMatch:
+    canonical: Optional[str]
+    category: Optional[str]
+    suspicious: bool
+
+    @property
+    def is_commodity(self) -> bool:
+        return self.canonical is not None
+
+
+def _build_matcher() -> PhraseMatcher:
+    phrases = {term: _SUSPICIOUS for term in SUSPICIOUS_TERMS}
+    for canonical, (_, synonyms) in TAXONOMY.items():
+        for phrase in (canonical, *synonyms):
+            phrases[phrase] = canonical
+    return PhraseMatcher(phrases)
+
+
+_MATCHER = _build_matcher()
+
+
+@lru_cache(maxsize=4096)
+def classify_commodity(text: Optional[str]) -> CommodityMatch:
+    """
+    One pass over a cargo description: the first commodity named, with its
+    canonical name and category, and whether any suspicious term appears.
+    """
+    canonical = None
+    suspicious = False
+    for match in _MATCHER.finditer(text or ''):
+        if match.value is _SUSPICIOUS:
+            suspicious = True
+        elif canonical is None:
+            canonical = match.value
+    category = TAXONOMY[canonical][0] if canonical else None
+    return CommodityMatch(canonical, category, suspicious)
@@ -1,10 +1,11 @@
 # src/ship_broker/core/database.py
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, LargeBinary, Text, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 import enum
+import logging
 from passlib.context import CryptContext
 from ..config import settings
 
@@ -12,6 +13,8 @@ engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class ProcessedEmail(Base):
@@ -20,7 +23,79 @@ class ProcessedEmail(Base):
     id = Column(Integer, primary_key=True, index=True)
     message_id = Column(String, unique=True, index=True)
     subject = Column(String)
-    processed_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    sender = Column(String, nullable=True, index=True)
+    # Extraction cost, see core/extraction_metrics.py
+    parser = Column(String, nullable=True)  # template, regex, llm, regex_fallback or skipped
+    backend = Column(String, nullable=True)
+    models = Column(String, nullable=True)  # Comma separated, in order of use
+    llm_requests = Column(Integer, default=0)
+    llm_retries = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+    cache_misses = Column(Integer, default=0)
+    escalations = Column(Integer, default=0)
+    tokens_saved = Column(Integer, default=0)
+    extraction_seconds = Column(Float, nullable=True)
+
+class EmailJobStatus(enum.Enum):
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+class EmailJob(Base):
+    __tablename__ = "email_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_id = Column(String, unique=True, index=True)
+    subject = Column(String)
+    sender = Column(String, nullable=True)
+    content = Column(String)
+    received_at = Column(DateTime, nullable=True)  # Date header, UTC
+    priority = Column(Float, default=0.0)
+    rank = Column(Float, default=0.0, index=True)  # Lease order, highest first; see core/email_priority.py
+    status = Column(Enum(EmailJobStatus), default=EmailJobStatus.PENDING, index=True)
+    attempts = Column(Integer, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+class EmailFingerprint(Base):
+    __tablename__ = "email_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_id = Column(String, unique=True, index=True)
+    content_hash = Column(String, index=True)
+    signature = Column(LargeBinary)  # MinHash signature, see core/dedup.py
+    duplicate_of = Column(String, nullable=True, index=True)  # Message-ID of the email whose results this one shares
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class RawEmail(Base):
+    __tablename__ = "raw_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, unique=True, index=True)  # SHA-256 of the body
+    message_id = Column(String, index=True)  # First message seen with this body
+    subject = Column(String)
+    sender = Column(String, nullable=True)
+    size = Column(Integer)
+    body = Column(LargeBinary)  # zlib-compressed JSON, see core/email_archive.py
+    parser_version = Column(Integer, nullable=True, index=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    parsed_at = Column(DateTime, nullable=True)
+
+class SenderTemplate(Base):
+    __tablename__ = "sender_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sender = Column(String, unique=True, index=True)
+    templates = Column(Text)  # JSON list of line templates, see core/sender_templates.py
+    hits = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
 class AuctionStatus(enum.Enum):
     ACTIVE = "active"
@@ -56,11 +131,16 @@ class Vessel(Base):
     name = Column(String, index=True)
     dwt = Column(Float, nullable=True)
     position = Column(String, nullable=True)
+    position_port_id = Column(String(5), nullable=True, index=True)  # UN/LOCODE, see core/ports.py
     eta = Column(DateTime, nullable=True)
     open_date = Column(DateTime, nullable=True)
     vessel_type = Column(String, nullable=True)
+    imo = Column(String, nullable=True, index=True)
     description = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    mention_count = Column(Integer, default=1)  # Emails that mentioned this vessel
+    source_email_id = Column(Integer, ForeignKey("raw_emails.id"), nullable=True, index=True)  # Latest mention
     
     # Add owner relationship
     owner_id = Column(Integer, ForeignKey("users.id"))
@@ -73,15 +153,20 @@ class Cargo(Base):
     __tablename__ = "cargoes"
     
     id = Column(Integer, primary_key=True, index=True)
-    cargo_type = Column(String)
+    cargo_type = Column(String, index=True)  # Canonical commodity name, see core/commodities.py
     quantity = Column(Float, nullable=True)
     load_port = Column(String, nullable=True)
     discharge_port = Column(String, nullable=True)
+    load_port_id = Column(String(5), nullable=True, index=True)  # UN/LOCODE, see core/ports.py
+    discharge_port_id = Column(String(5), nullable=True, index=True)
     laycan_start = Column(DateTime, nullable=True)
     laycan_end = Column(DateTime, nullable=True)
     rate = Column(String, nullable=True)
     description = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    mention_count = Column(Integer, default=1)  # Emails that mentioned this cargo
+    source_email_id = Column(Integer, ForeignKey("raw_emails.id"), nullable=True, index=True)  # Latest mention
     
     # Add owner relationship
     owner_id = Column(Integer, ForeignKey("users.id"))
@@ -126,5 +211,45 @@ class AuctionBid(Base):
     # Existing relationships
     auction = relationship("Auction", back_populates="bids")
 
+def upgrade_schema(bind) -> list:
+    """Add mapped columns missing from existing tables.
+
+    create_all only creates missing tables, so databases created before a
+    column was added would fail on every query that selects it. This adds
+    each missing column (with its scalar default) and its index, and is safe
+    to run on every start. Returns the "table.column" names it added.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=bind.dialect)}"
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if isinstance(default, enum.Enum):
+                    default = default.name
+                if isinstance(default, bool):
+                    default = int(default)
+                if isinstance(default, (int, float)):
+                    ddl += f" DEFAULT {default}"
+                elif isinstance(default, str):
+                    ddl += " DEFAULT '{}'".format(default.replace("'", "''"))
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn, checkfirst=True)
+    if added:
+        logger.info(f"Added columns to existing tables: {', '.join(added)}")
+    return added
+
 # Create tables
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
\ No newline at end of file
@@ -0,0 +1,141 @@
+# src/ship_broker/core/date_normalizer.py
+
+import calendar
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+MONTHS = {
+    'JAN': 1, 'JANUARY': 1, 'FEB': 2, 'FEBRUARY': 2, 'MAR': 3, 'MARCH': 3,
+    'APR': 4, 'APRIL': 4, 'MAY': 5, 'JUN': 6, 'JUNE': 6, 'JUL': 7, 'JULY': 7,
+    'AUG': 8, 'AUGUST': 8, 'SEP': 9, 'SEPT': 9, 'SEPTEMBER': 9, 'OCT': 10, 'OCTOBER': 10,
+    'NOV': 11, 'NOVEMBER': 11, 'DEC': 12, 'DECEMBER': 12
+}
+
+# Broker period words as (point day, window start, window end); 0 is the
+# last day of the month. Point days follow the conventions the LLM used:
+# "early Nov" -> 01-11, "mid Dec" -> 15-12, "end of Jan" -> 31-01.
+PERIODS = {
+    'EARLY': (1, 1, 10), 'ELY': (1, 1, 10), 'BEG': (1, 1, 10), 'BEGIN': (1, 1, 10), 'BEGINNING': (1, 1, 10),
+    'MID': (15, 11, 20), 'MIDDLE': (15, 11, 20),
+    'LATE': (25, 21, 0), 'END': (0, 21, 0)
+}
+
+_MONTH = '(?P<month>' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\b'
+_YEAR = r'(?P<year>\d{4}|\d{2})'
+_PROMPT = re.compile(r'^(?:PPT|PROMPT|ASAP|SPOT|IMMEDIATE(?:LY)?|PROMPT\s+PPT)$')
+_ISO = re.compile(r'^(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})(?:[T ][\d:.]+Z?)?$')
+_NUMERIC = re.compile(r'^(?P<day>\d{1,2})[-/.](?P<month>\d{1,2})(?:\s*[-/. ]\s*' + _YEAR + ')?$')
+_DAY_MONTH = re.compile(
+    r'^(?P<day>\d{1,2})(?:\s*[-/]\s*(?P<day_end>\d{1,2}))?\s*[-/ ]?\s*' + _MONTH + r'(?:\s*[-/ ,]?\s*' + _YEAR + ')?$'
+)
+_MONTH_DAY = re.compile(
+    '^' + _MONTH + r'\s*(?P<day>\d{1,2})(?!\d)(?:\s*[-/]\s*(?P<day_end>\d{1,2}))?(?:\s*,?\s*' + _YEAR + ')?$'
+)
+_PERIOD = re.compile(
+    '^(?P<period>' + '|'.join(sorted(PERIODS, key=len, reverse=True)) + r')\s*' + _MONTH + r'(?:\s*' + _YEAR + ')?$'
+)
+_MONTH_ONLY = re.compile('^' + _MONTH + r'(?:\s*(?P<year>\d{4}))?$')
+
+# Noise removed before matching: ordinals, filler words, trailing punctuation
+_ORDINAL = re.compile(r'(?<=\d)(?:ST|ND|RD|TH)\b')
+_FILLER = re.compile(r'\b(?:OF|THE|ABOUT|ABT|ARND|AROUND|ON|DAYS?)\b')
+_SPACES = re.compile(r'\s+')
+
+DateRange = Tuple[datetime, datetime]
+# (point date, window start, window end)
+_Parsed = Tuple[datetime, datetime, datetime]
+
+
+def normalize_date(text: Optional[str], today: Optional[date] = None) -> Optional[datetime]:
+    """
+    Parse broker date shorthand ("07-11", "early Nov", "10/15 NOV", "PPT", ...)
+    into a datetime. Dates without a year are placed in the near future.
+    Returns None when the grammar does not recognise the text.
+    """
+    parsed = _parse_text(text, today)
+    return parsed[0] if parsed else None
+
+
+def normalize_date_range(text: Optional[str], today: Optional[date] = None) -> Optional[DateRange]:
+    """Like normalize_date, but returns the (start, end) window the text describes"""
+    parsed = _parse_text(text, today)
+    return parsed[1:] if parsed else None
+
+
+def _parse_text(text: Optional[str], today: Optional[date]) -> Optional[_Parsed]:
+    if not text or not isinstance(text, str):
+        return None
+    return _parse(_clean(text), today or date.today())
+
+
+def _clean(text: str) -> str:
+    text = text.upper().strip().strip('.,;:()')
+    text = _ORDINAL.sub('', text)
+    text = _FILLER.sub(' ', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str, today: date) -> Optional[_Parsed]:
+    if not text:
+        return None
+
+    if _PROMPT.match(text):
+        start = datetime.combine(today, datetime.min.time())
+        return start, start, start
+
+    match = _ISO.match(text)
+    if match:
+        return _window(today, int(match['day']), int(match['month']), match['year'])
+
+    match = _NUMERIC.match(text)
+    if match:
+        return _window(today, int(match['day']), int(match['month']), match['year'])
+
+    for pattern in (_DAY_MONTH, _MONTH_DAY):
+        match = pattern.match(text)
+        if match:
+            month = MONTHS[match['month']]
+            day_end = int(match['day_end']) if match['day_end'] else None
+            return _window(today, int(match['day']), month, match['year'], day_end)
+
+    match = _PERIOD.match(text)
+    if match:
+        point, first, last = PERIODS[match['period']]
+        return _window(today, first, MONTHS[match['month']], match['year'], last, point)
+
+    match = _MONTH_ONLY.match(text)
+    if match:
+        # Too vague for a day: use the first of the month
+        return _window(today, 1, MONTHS[match['month']], match['year'])
+
+    return None
+
+
+def _window(today: date, day: int, month: int, year: Optional[str],
+            day_end: Optional[int] = None, point_day: Optional[int] = None) -> Optional[_Parsed]:
+    """
+    Build the (point, start, end) datetimes. A day of 0 means the last day of
+    the month. Without an explicit year, a window already past rolls to next year.
+    """
+    if year:
+        years = [int(year) + 2000 if len(year) == 2 else int(year)]
+    else:
+        years = [today.year, today.year + 1]
+
+    for candidate_year in years:
+        last_day = calendar.monthrange(candidate_year, month)[1] if 1 <= month <= 12 else 0
+        try:
+            start = date(candidate_year, month, day)
+            end = date(candidate_year, month, (day_end or last_day) if day_end is not None else day)
+            point = date(candidate_year, month, point_day or last_day) if point_day is not None else start
+        except ValueError:
+            return None
+
+        if end < start:
+            return None
+        if year or end >= today or candidate_year == years[-1]:
+            return tuple(datetime.combine(value, datetime.min.time()) for value in (point, start, end))
+    return None
@@ -0,0 +1,156 @@
+# src/ship_broker/core/dedup.py
+
+import hashlib
+import re
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import EmailFingerprint
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+
+_PRIME = (1 << 61) - 1
+# Fixed permutation coefficients, so signatures stay comparable across runs and processes
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f'a{i}'.encode()).digest()[:8], 'big') % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.sha256(f'b{i}'.encode()).digest()[:8], 'big') % _PRIME)
+    for i in range(NUM_PERM)
+]
+_SIGNATURE_FORMAT = f'>{NUM_PERM}Q'
+
+# Forward/reply wrapping that differs between copies of the same circular
+_FORWARD_HEADER = re.compile(
+    r'^\s*(?:from|sent|to|cc|date|subject)\s*:.*$|^\s*-{2,}\s*(?:original message|forwarded message).*$',
+    re.IGNORECASE | re.MULTILINE
+)
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Exact content hash plus MinHash signature of a normalized email body"""
+    content_hash: str
+    signature: Tuple[int, ...]
+
+    def similarity(self, other: 'Fingerprint') -> float:
+        """Estimated Jaccard similarity of the two bodies' shingle sets"""
+        if self.content_hash == other.content_hash:
+            return 1.0
+        same = sum(1 for a, b in zip(self.signature, other.signature) if a == b)
+        return same / NUM_PERM
+
+    def pack(self) -> bytes:
+        return struct.pack(_SIGNATURE_FORMAT, *self.signature)
+
+    @classmethod
+    def unpack(cls, content_hash: str, packed: bytes) -> 'Fingerprint':
+        return cls(content_hash, struct.unpack(_SIGNATURE_FORMAT, packed))
+
+
+def normalize_body(text: str) -> str:
+    """Lowercase words only, without forward headers, quoting or punctuation"""
+    text = _FORWARD_HEADER.sub(' ', text or '')
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def fingerprint(text: str) -> Optional[Fingerprint]:
+    """Fingerprint an email body; None when it has no words to compare"""
+    normalized = normalize_body(text)
+    if not normalized:
+        return None
+
+    words = normalized.split()
+    count = max(1, len(words) - SHINGLE_WORDS + 1)
+    shingles = {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+        for i in range(count)
+    }
+    signature = tuple(
+        min((a * shingle + b) % _PRIME for shingle in shingles)
+        for a, b in _PERMUTATIONS
+    )
+    return Fingerprint(hashlib.sha1(normalized.encode('utf-8')).hexdigest(), signature)
+
+
+class DuplicateIndex:
+    """
+    In-memory index of fingerprints of already extracted emails.
+    Exact copies are found by content hash; near copies through MinHash
+    locality-sensitive hashing, where signatures are split into bands and
+    only emails sharing a band are compared. Thread-safe, so extraction
+    workers can query it while the writer adds to it.
+    """
+
+    def __init__(self, threshold: float = 0.9):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._exact: Dict[str, str] = {}
+        self._fingerprints: Dict[str, Fingerprint] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+
+    @classmethod
+    def load(cls, db: Session, threshold: float = 0.9) -> 'DuplicateIndex':
+        """Build the index from stored fingerprints of original (non-duplicate) emails"""
+        index = cls(threshold)
+        rows = db.query(
+            EmailFingerprint.message_id, EmailFingerprint.content_hash, EmailFingerprint.signature
+        ).filter(EmailFingerprint.duplicate_of.is_(None))
+        for message_id, content_hash, signature in rows:
+            index.add(message_id, Fingerprint.unpack(content_hash, signature))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, key: str, fp: Fingerprint):
+        with self._lock:
+            if key in self._fingerprints:
+                return
+            self._fingerprints[key] = fp
+            self._exact.setdefault(fp.content_hash, key)
+            for band in self._bands(fp):
+                self._buckets.setdefault(band, []).append(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            fp = self._fingerprints.pop(key, None)
+            if fp is None:
+                return
+            if self._exact.get(fp.content_hash) == key:
+                del self._exact[fp.content_hash]
+            for band in self._bands(fp):
+                keys = self._buckets.get(band, [])
+                if key in keys:
+                    keys.remove(key)
+
+    def match(self, fp: Fingerprint) -> Optional[str]:
+        """Key of the most similar indexed email at or above the threshold"""
+        with self._lock:
+            exact = self._exact.get(fp.content_hash)
+            if exact is not None:
+                return exact
+
+            best, best_score = None, self.threshold
+            seen = set()
+            for band in self._bands(fp):
+                for key in self._buckets.get(band, ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    score = fp.similarity(self._fingerprints[key])
+                    if score >= best_score:
+                        best, best_score = key, score
+            return best
+
+    @staticmethod
+    def _bands(fp: Fingerprint):
+        for band in range(BANDS):
+            yield band, fp.signature[band * ROWS:(band + 1) * ROWS]
@@ -0,0 +1,96 @@
+# src/ship_broker/core/email_archive.py
+
+import hashlib
+import json
+import logging
+import zlib
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from .database import RawEmail
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_LEVEL = 6
+
+
+def archive_key(content: str) -> str:
+    """Content address of an email body"""
+    return hashlib.sha256(content.encode('utf-8', 'replace')).hexdigest()
+
+
+def compress(email_data: Dict) -> bytes:
+    payload = {key: email_data.get(key) for key in ('subject', 'sender', 'message_id', 'content')}
+    return zlib.compress(json.dumps(payload).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress(body: bytes) -> Dict:
+    return json.loads(zlib.decompress(body).decode('utf-8'))
+
+
+class EmailArchive:
+    """
+    Content-addressed, compressed store of the email text the parser
+    extracted from. Each distinct body is kept once, however many times it
+    was received; vessels and cargoes point at the archived email they came
+    from, and the parser version that last extracted each email is recorded
+    so reprocessing can re-run only what an older parser produced.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_many(self, emails: List[Dict]) -> List[RawEmail]:
+        """
+        Archive emails, reusing rows for bodies already stored. Returns the
+        archive row of each email, in order. New rows are flushed, so they
+        have IDs, but not committed: they join the caller's transaction.
+        """
+        keys = [archive_key(email_data.get('content') or '') for email_data in emails]
+        rows = {
+            row.content_hash: row
+            for row in self.db.query(RawEmail).filter(RawEmail.content_hash.in_(set(keys)))
+        } if keys else {}
+
+        archived = []
+        for key, email_data in zip(keys, emails):
+            row = rows.get(key)
+            if row is None:
+                body = compress(email_data)
+                row = RawEmail(
+                    content_hash=key,
+                    message_id=email_data.get('message_id'),
+                    subject=email_data.get('subject', ''),
+                    sender=email_data.get('sender'),
+                    size=len(email_data.get('content') or ''),
+                    body=body
+                )
+                self.db.add(row)
+                rows[key] = row
+            archived.append(row)
+        self.db.flush()
+        return archived
+
+    def load(self, row: RawEmail) -> Dict:
+        """The archived email as the dict the parser extracts from"""
+        return decompress(row.body)
+
+    def stale(self, parser_version: int, limit: int, after_id: int = 0) -> List[RawEmail]:
+        """Archived emails last extracted by an older parser version, oldest first"""
+        return self.db.query(RawEmail).filter(
+            RawEmail.id > after_id,
+            (RawEmail.parser_version.is_(None)) | (RawEmail.parser_version < parser_version)
+        ).order_by(RawEmail.id).limit(limit).all()
+
+    def mark_parsed(self, rows: List[RawEmail], parser_version: int):
+        now = datetime.utcnow()
+        for row in rows:
+            row.parser_version = parser_version
+            row.parsed_at = now
+
+    def count_stale(self, parser_version: int) -> int:
+        return self.db.query(RawEmail).filter(
+            (RawEmail.parser_version.is_(None)) | (RawEmail.parser_version < parser_version)
+        ).count()
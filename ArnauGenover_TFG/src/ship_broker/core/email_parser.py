@@ -1,18 +1,69 @@
 # src/ship_broker/core/email_parser.py
 import email
+import email.utils
 import imaplib
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 import logging
 from sqlalchemy.orm import Session
 
 from typing import Dict, List, Optional, Tuple, Union
 
-from .openai_helper import OpenAIHelper
-from .database import Cargo, Vessel, ProcessedEmail  # Added ProcessedEmail import
+from .extraction_backend import ExtractionBackend, get_extraction_backend
+from .commodities import classify_commodity
+from .section_classifier import scan_section, scan_sections
+from .date_normalizer import normalize_date
+from .mime_extractor import MimeTextExtractor, message_text
+from .sender_templates import TemplateCache, TemplateMatch, sender_address
+from .dedup import DuplicateIndex, Fingerprint, fingerprint
+from .email_archive import EmailArchive
+from .entity_resolution import EntityIndex, cargo_key, find_imo, valid_imo
+from .ports import find_ports, get_port, resolve_port_id
+from .email_triage import EmailTriage, Triage
+from .imap_idle import open_imap
+from .extraction_metrics import (
+    PARSER_LLM, PARSER_REGEX_FALLBACK, PARSER_SKIPPED, PARSER_TEMPLATE, ExtractionMetrics
+)
+from .database import Cargo, Vessel, ProcessedEmail, EmailJob, EmailFingerprint, RawEmail
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INVALID_PORT_WORDS = frozenset({'DETAILS', 'INFO', 'WITH', 'ALL', 'ETA', 'CERTIFICATES', 'LLNA', 'AGE'})
+
+# Bump whenever extraction changes, so archived emails are re-extracted on reprocess
+PARSER_VERSION = 9
+# Records link to their archived email; descriptions only keep a summary
+MAX_DESCRIPTION_CHARS = 500
+
+# Words that name the load or discharge port right after them, and what joins the two ports of a route
+LOAD_CUE = re.compile(r'\b(?:LOAD(?:ING)?(?:\s+PORT)?|LOADPORT|L/PORT|POL|(?<!OPEN )FROM)\s*(?:AT|IN)?\s*[:\-]?\s*$', re.IGNORECASE)
+DISCHARGE_CUE = re.compile(
+    r'\b(?:DISCH(?:ARGE|ARGING)?(?:\s+PORT)?|DISPORT|D/PORT|POD|TO)\s*(?:AT|IN)?\s*[:\-]?\s*$', re.IGNORECASE
+)
+ROUTE_JOIN = re.compile(r'\s*(?:/|\bTO\b)\s*', re.IGNORECASE)
+CUE_WINDOW = 30
+
+
+def header_datetime(value: Optional[str]) -> Optional[datetime]:
+    """A Date header as naive UTC, or None when missing or malformed"""
+    try:
+        parsed = email.utils.parsedate_to_datetime(value) if value else None
+    except (TypeError, ValueError):
+        return None
+    if parsed is None or parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def short_description(text: Optional[str]) -> str:
+    text = ' '.join((text or '').split())
+    if len(text) <= MAX_DESCRIPTION_CHARS:
+        return text
+    return text[:MAX_DESCRIPTION_CHARS - 3].rstrip() + '...'
 
 @dataclass
 class VesselData:
@@ -23,6 +74,13 @@ class VesselData:
     open_date: Optional[datetime] = None
     vessel_type: Optional[str] = None
     description: str = ""
+    imo: Optional[str] = None
+    position_port_id: Optional[str] = None
+
+    def __post_init__(self):
+        # Ports resolve to gazetteer IDs at parse time, whichever extractor produced the record
+        if self.position_port_id is None:
+            self.position_port_id = resolve_port_id(self.position)
 
 @dataclass
 class CargoData:
@@ -34,76 +92,94 @@ class CargoData:
     laycan_end: Optional[datetime] = None
     rate: Optional[str] = None
     description: str = ""
+    load_port_id: Optional[str] = None
+    discharge_port_id: Optional[str] = None
+
+    def __post_init__(self):
+        if self.load_port_id is None:
+            self.load_port_id = resolve_port_id(self.load_port)
+        if self.discharge_port_id is None:
+            self.discharge_port_id = resolve_port_id(self.discharge_port)
 
     def is_valid(self) -> bool:
-        """Strict validation of cargo data"""
-        valid_cargo_types = {
-            'GRAIN', 'COAL', 'IRON ORE', 'STEEL', 'FERTILIZER', 'SOYBEANS', 
-            'WHEAT', 'CORN', 'BARLEY', 'CEMENT', 'BAUXITE', 'PETCOKE',
-            'CARGO OPPORTUNITY'  # Added for vessel-as-cargo cases
-        }
-        
+        """
+        Strict validation of cargo data. A valid cargo_type is normalized to
+        its canonical commodity name, e.g. "HRC" -> "HOT ROLLED COILS".
+        """
         # Handle "Cargo opportunity for [Vessel Name]" format
         clean_cargo_type = self.cargo_type.upper().strip()
         if clean_cargo_type.startswith('CARGO FOR'):
             return True  # Accept these as valid by default
-            
-        cargo_type_valid = (
-            clean_cargo_type in valid_cargo_types or
-            any(valid_type in clean_cargo_type for valid_type in valid_cargo_types)
-        )
-        
+
+        # Commodity and suspicious words are found in the same pass
+        commodity = classify_commodity(clean_cargo_type)
+
         has_quantity = self.quantity is not None and self.quantity > 0
         has_complete_route = bool(self.load_port and self.discharge_port)
         valid_ports = self._validate_ports()
-        has_suspicious_text = self._check_suspicious_text()
-        
-        return (
-            cargo_type_valid and
+
+        valid = (
+            commodity.is_commodity and
             valid_ports and
-            not has_suspicious_text and
+            not commodity.suspicious and
             (
                 (has_quantity and (self.load_port or self.discharge_port)) or
                 (has_complete_route and len(clean_cargo_type) > 3)
             )
         )
+        if valid:
+            self.cargo_type = commodity.canonical
+        return valid
 
     def _validate_ports(self) -> bool:
-        invalid_words = {'DETAILS', 'INFO', 'WITH', 'ALL', 'ETA', 'CERTIFICATES', 'LLNA', 'AGE'}
         valid_ports = True
         
         for port in [self.load_port, self.discharge_port]:
             if port:
                 port = port.strip().upper()
-                if (len(port) < 2 or port in invalid_words):
+                if (len(port) < 2 or port in INVALID_PORT_WORDS):
                     valid_ports = False
                     break
         return valid_ports
 
     def _check_suspicious_text(self) -> bool:
-        suspicious_patterns = [
-            r'DETAILS', r'INFO', r'CERTIFICATE', r'AGE',
-            r'WITH ALL', r'ARRIVING', r'NEXT', r'ETA'
-        ]
-        return any(re.search(pattern, self.cargo_type, re.IGNORECASE) 
-                  for pattern in suspicious_patterns)
+        return classify_commodity(self.cargo_type.upper().strip()).suspicious
+
+@dataclass
+class BatchStats:
+    """What store_batch wrote"""
+    emails: int = 0      # Emails marked as processed, duplicates included
+    duplicates: int = 0  # Of those, linked to an already extracted email instead of storing results
+    vessels: int = 0     # New rows; mentions of known vessels and cargoes update those instead
+    cargoes: int = 0
 
 class EmailParser:
-    def __init__(self, email_address: str, password: str, db: Session, imap_server: str = "imap.gmail.com"):
+    def __init__(self, email_address: str, password: str, db: Session, imap_server: str = "imap.gmail.com",
+                 use_ai: bool = True, backend: Optional[ExtractionBackend] = None,
+                 imap_port: Optional[int] = None, imap_ssl: Optional[bool] = None):
         self.email_address = email_address
         self.password = password
         self.imap_server = imap_server
+        self.imap_port = imap_port or settings.IMAP_PORT or None
+        self.imap_ssl = settings.IMAP_SSL if imap_ssl is None else imap_ssl
         self.db = db
+        self._duplicates: Optional[DuplicateIndex] = None
+        self._templates: Optional[TemplateCache] = None
+        self._entities: Optional[EntityIndex] = None
+        self.triage = EmailTriage() if settings.TRIAGE_ENABLED else None
+        self.use_ai = False
+        if not use_ai:
+            return
         try:
-            self.ai = OpenAIHelper()  
-            self.use_ai = True       
+            self.ai = backend or get_extraction_backend()
+            self.use_ai = True
         except Exception as e:
-            logger.warning(f"Failed to initialize OpenAI: {str(e)}")
+            logger.warning(f"Failed to initialize the {settings.EXTRACTION_BACKEND} extraction backend: {str(e)}")
             self.use_ai = False
 
-    def connect(self) -> imaplib.IMAP4_SSL:
+    def connect(self) -> imaplib.IMAP4:
         logger.info(f"Connecting to {self.imap_server}")
-        mail = imaplib.IMAP4_SSL(self.imap_server)
+        mail = open_imap(self.imap_server, self.imap_port, self.imap_ssl)
         mail.login(self.email_address, self.password)
         return mail
 
@@ -118,34 +194,35 @@ class EmailParser:
         
         emails_data = []
         processed_ids = {pe.message_id for pe in self.db.query(ProcessedEmail.message_id).all()}
+        # Emails already in the work queue are drained from there, not refetched
+        processed_ids.update(job.message_id for job in self.db.query(EmailJob.message_id).all())
         
         for num in messages[0].split():
-            _, msg_data = mail.fetch(num, '(RFC822)')
-            email_body = msg_data[0][1]
-            email_message = email.message_from_bytes(email_body)
+            # Headers first, so processed emails never download their body
+            _, header_data = mail.fetch(num, '(RFC822.SIZE BODY.PEEK[HEADER.FIELDS (MESSAGE-ID SUBJECT FROM DATE)])')
+            if not header_data or not isinstance(header_data[0], tuple):
+                continue
+            headers = email.message_from_bytes(header_data[0][1])
+            size_match = re.search(rb'RFC822\.SIZE (\d+)', header_data[0][0])
+            size = int(size_match.group(1)) if size_match else settings.EMAIL_MAX_FETCH_BYTES
             
-            message_id = email_message["Message-ID"] or email_message["message-id"]
+            message_id = headers["Message-ID"] or headers["message-id"]
             
             # Skip if already processed
             if message_id and message_id in processed_ids:
-                logger.info(f"Skipping already processed email: {email_message['subject']}")
-                continue
-            
-            # Skip if subject matches a previously processed email
-            subject = email_message["subject"] or ""
-            if self.db.query(ProcessedEmail).filter(
-                ProcessedEmail.subject == subject
-            ).first():
-                logger.info(f"Skipping already processed subject: {subject}")
+                logger.info(f"Skipping already processed email: {headers['subject']}")
                 continue
             
-            content = self._get_email_content(email_message)
+            subject = headers["subject"] or ""
+            content = self._fetch_email_content(mail, num, size)
             
             logger.info(f"Found new email with subject: {subject}")
             emails_data.append({
                 'subject': subject,
                 'content': content,
-                'message_id': message_id
+                'message_id': message_id,
+                'sender': sender_address(headers["from"]),
+                'received_at': header_datetime(headers["date"])
             })
         
         mail.close()
@@ -155,184 +232,500 @@ class EmailParser:
     
     def has_vessel_indicators(self, text: str) -> bool:
         """Check if text has strong vessel indicators"""
-        indicators = [
-            r'M/V\s+[A-Z]',
-            r'\bVESSEL\s+(?:DETAILS?|SPECS?|NAME)\b',
-            r'\bDWT\b',
-            r'\bIMO\s+NO\b',
-            r'\bBUILT\b',
-            r'\bFLAG\b',
-            r'\bCLASS\b',
-            r'\bVESSEL\s+POSITION\b',
-            r'\bOPEN\s+(?:AT|IN|FROM)\b',
-            r'\bETA\b'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in indicators)
+        return scan_section(text).has_vessel_indicators
+
+    def _fetch_email_content(self, mail: imaplib.IMAP4, num: bytes, size: int) -> str:
+        """
+        Stream the message body in partial fetches through the MIME extractor.
+        Attachment payloads are skipped as they arrive, so memory stays bounded
+        by the configured caps, and fetching stops once the outermost
+        multipart is closed or the text caps are reached.
+        """
+        extractor = MimeTextExtractor(settings.EMAIL_MAX_PART_BYTES, settings.EMAIL_MAX_TEXT_BYTES)
+        limit = min(size, settings.EMAIL_MAX_FETCH_BYTES)
+        offset = 0
+        while offset < limit and not extractor.done:
+            chunk_size = min(settings.EMAIL_FETCH_CHUNK_BYTES, limit - offset)
+            _, data = mail.fetch(num, f'(BODY.PEEK[]<{offset}.{chunk_size}>)')
+            chunk = data[0][1] if data and isinstance(data[0], tuple) else b''
+            if not chunk:
+                break
+            extractor.feed(chunk)
+            offset += len(chunk)
+        if offset >= settings.EMAIL_MAX_FETCH_BYTES and offset < size:
+            logger.warning(f"Email body truncated at {offset} of {size} bytes")
+        return extractor.close()
 
     def _get_email_content(self, email_message) -> str:
-        """Extract content from email message"""
-        content = ""
-        if email_message.is_multipart():
-            for part in email_message.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        content += part.get_payload(decode=True).decode()
-                    except:
-                        logger.error("Failed to decode email part")
-                        continue
-        else:
-            try:
-                content = email_message.get_payload(decode=True).decode()
-            except:
-                logger.error("Failed to decode email")
-                content = email_message.get_payload()
-        return content
+        """Extract content from an already parsed email message"""
+        return message_text(email_message)
 
     def process_and_store_email(self, email_data: Union[str, Dict]) -> Tuple[List[Cargo], List[Vessel]]:
         """Process email content and store results in database"""
-        cargoes = []
-        vessels = []
-
         try:
-            # Handle both string and dict input
-            content = email_data['content'] if isinstance(email_data, dict) else email_data
-
-            if self.use_ai:
-                try:
-                    ai_results = self.ai.extract_info(content)
-                    if ai_results:
-                        # Process vessels from AI
-                        for vessel_data in ai_results.get('vessels', []):
-                            try:
-                                vessel = VesselData(**vessel_data)
-                                vessels.append(vessel)
-                            except Exception as e:
-                                logger.error(f"Failed to process AI vessel: {str(e)}")
-
-                        # Process cargoes from AI
-                        for cargo_data in ai_results.get('cargoes', []):
-                            try:
-                                cargo = CargoData(**cargo_data)
-                                if cargo.is_valid():
-                                    cargoes.append(cargo)
-                                else:
-                                    logger.debug(f"Invalid cargo from AI: {cargo_data}")
-                            except Exception as e:
-                                logger.error(f"Failed to process AI cargo: {str(e)}")
-                except Exception as e:
-                    logger.error(f"AI parsing failed: {str(e)}")
-
-            # Fallback to regex parsing if needed
-            if not vessels:
-                vessels.extend(self.extract_vessels(content))
-            if not cargoes:
-                cargoes.extend(self.extract_cargoes(content))
-
-            # Store results in database
-            self._store_results(cargoes, vessels)
-            
-            # Mark email as processed if we have message_id
-            if isinstance(email_data, dict) and email_data.get('message_id'):
-                processed = ProcessedEmail(
-                    message_id=email_data['message_id'],
-                    subject=email_data.get('subject', '')
-                )
-                self.db.add(processed)
-                self.db.commit()
-
+            cargoes, vessels = self.extract_email(email_data)
+            self.store_email(email_data, cargoes, vessels)
             return cargoes, vessels
         except Exception as e:
             logger.error(f"Error processing email: {str(e)}")
             self.db.rollback()
             return [], []
 
+    def extract_email(self, email_data: Union[str, Dict]) -> Tuple[List[CargoData], List[VesselData]]:
+        """
+        Extract vessels and cargoes from an email without touching the
+        database. For dict input, what the extraction cost is left under
+        email_data['extraction'] and stored with its processed marker.
+        """
+        # Handle both string and dict input
+        content = email_data['content'] if isinstance(email_data, dict) else email_data
+        sender = email_data.get('sender') if isinstance(email_data, dict) else None
+        subject = email_data.get('subject') if isinstance(email_data, dict) else None
+
+        metrics = ExtractionMetrics()
+        started = time.perf_counter()
+        try:
+            return self._extract(content, sender, subject, metrics)
+        finally:
+            metrics.seconds = time.perf_counter() - started
+            if isinstance(email_data, dict):
+                email_data['extraction'] = metrics
+
+    def _extract(self, content: str, sender: Optional[str], subject: Optional[str],
+                 metrics: ExtractionMetrics) -> Tuple[List[CargoData], List[VesselData]]:
+        cargoes = []
+        vessels = []
 
-    def _store_results(self, cargoes: List[CargoData], vessels: List[VesselData]):
-        """Store parsed results in database and create auctions for vessels with ETAs"""
+        # Cheap local triage first: most auto-replies and chatter never reach the LLM
+        label = Triage.NEEDS_LLM
+        if self.triage:
+            decision = self.triage.classify(subject, content)
+            label = decision.label
+            logger.debug(f"Triage of {subject!r}: {label.value} ({decision.reason})")
+            if label is Triage.NO_CONTENT:
+                metrics.parser = PARSER_SKIPPED
+                return cargoes, vessels
+
+        # Known sender layouts are extracted locally, without the LLM
+        match = self.sender_templates().apply(sender, content)
+        if match:
+            logger.info(f"Extracted email from {sender} with templates (confidence {match.confidence:.2f})")
+            metrics.parser = PARSER_TEMPLATE
+            return self._template_records(match)
+
+        if label is Triage.REGEX_SUFFICIENT:
+            vessels = self.extract_vessels(content)
+            cargoes = self.extract_cargoes(content)
+            if vessels or cargoes:
+                return cargoes, vessels
+            # The regexes found less than triage expected; let the LLM look
+
+        if self.use_ai:
+            try:
+                # Records are validated as the backend streams them; on a failure the ones so far are kept
+                for kind, record in self.ai.iter_records(content, metrics, validate=self.validate_ai_record):
+                    if kind == 'vessels':
+                        try:
+                            vessels.append(VesselData(**record))
+                        except Exception as e:
+                            logger.error(f"Failed to process AI vessel: {str(e)}")
+                        continue
+                    try:
+                        cargo = CargoData(**record)
+                        if cargo.is_valid():
+                            cargoes.append(cargo)
+                        else:
+                            logger.debug(f"Invalid cargo from AI: {record}")
+                    except Exception as e:
+                        logger.error(f"Failed to process AI cargo: {str(e)}")
+            except Exception as e:
+                logger.error(f"AI parsing failed: {str(e)}")
+
+            if vessels or cargoes:
+                metrics.parser = PARSER_LLM
+                self.sender_templates().learn(sender, content, vessels, cargoes)
+            else:
+                metrics.parser = PARSER_REGEX_FALLBACK
+
+        # Fallback to regex parsing if needed
+        if not vessels:
+            vessels.extend(self.extract_vessels(content))
+        if not cargoes:
+            cargoes.extend(self.extract_cargoes(content))
+
+        return cargoes, vessels
+
+    def validate_ai_record(self, kind: str, record: Dict) -> bool:
+        """
+        Whether a raw LLM record would make a usable vessel or cargo; the
+        extraction backend escalates to a stronger model when too many fail.
+        """
         try:
-            # Store cargoes
-            for cargo in cargoes:
-                db_cargo = Cargo(
-                    cargo_type=cargo.cargo_type,
-                    quantity=cargo.quantity,
-                    load_port=cargo.load_port,
-                    discharge_port=cargo.discharge_port,
-                    laycan_start=cargo.laycan_start,
-                    laycan_end=cargo.laycan_end,
-                    rate=cargo.rate,
-                    description=cargo.description
+            if kind == 'vessels':
+                return bool(str(record.get('name') or '').strip()) and any(
+                    record.get(field) for field in ('dwt', 'position', 'open_date', 'imo')
                 )
-                self.db.add(db_cargo)
-            
-            from .auction_service import AuctionService  # Import here to avoid circular imports
-            auction_service = AuctionService(self.db)
-            
-            # Store vessels and create auctions if they have ETAs
-            for vessel in vessels:
-                db_vessel = Vessel(
+            quantity = record.get('quantity')
+            if isinstance(quantity, str):
+                quantity = float(quantity.replace(',', '')) if quantity.strip() else None
+            return CargoData(
+                cargo_type=str(record.get('cargo_type') or ''),
+                quantity=quantity,
+                load_port=record.get('load_port'),
+                discharge_port=record.get('discharge_port'),
+                rate=record.get('rate')
+            ).is_valid()
+        except (TypeError, ValueError):
+            return False
+
+    def _template_records(self, match: TemplateMatch) -> Tuple[List[CargoData], List[VesselData]]:
+        vessels = [VesselData(**record) for record in match.vessels]
+        cargoes = []
+        for record in match.cargoes:
+            cargo = CargoData(**record)
+            if cargo.is_valid():
+                cargoes.append(cargo)
+            else:
+                logger.debug(f"Invalid cargo from template: {record}")
+        return cargoes, vessels
+
+    def sender_templates(self) -> TemplateCache:
+        """Per-sender extraction templates, loaded from the database on first use"""
+        if self._templates is None:
+            self._templates = TemplateCache.load(
+                self.db, settings.TEMPLATE_MIN_SUPPORT, settings.TEMPLATE_MIN_CONFIDENCE
+            )
+        return self._templates
+
+    def store_email(self, email_data: Union[str, Dict], cargoes: List[CargoData], vessels: List[VesselData]) -> BatchStats:
+        """Store extracted results and mark the email as processed"""
+        return self.store_batch([(email_data, cargoes, vessels)])
+
+    def duplicate_index(self) -> DuplicateIndex:
+        """Fingerprints of extracted emails, loaded from the database on first use"""
+        if self._duplicates is None:
+            self._duplicates = DuplicateIndex.load(self.db, settings.DEDUP_SIMILARITY_THRESHOLD)
+        return self._duplicates
+
+    def find_duplicate(self, email_data: Union[str, Dict]) -> Optional[str]:
+        """Message-ID of an already extracted email with the same or near-identical body"""
+        fp = self.fingerprint_email(email_data)
+        if fp is None:
+            return None
+        original = self.duplicate_index().match(fp)
+        message_id = email_data.get('message_id') if isinstance(email_data, dict) else None
+        return original if original != message_id else None
+
+    def fingerprint_email(self, email_data: Union[str, Dict]) -> Optional[Fingerprint]:
+        """Body fingerprint, cached on the email dict so each body is hashed once"""
+        if not isinstance(email_data, dict):
+            return fingerprint(email_data)
+        if 'fingerprint' not in email_data:
+            email_data['fingerprint'] = fingerprint(email_data.get('content', ''))
+        return email_data['fingerprint']
+
+    def store_batch(self, results: List[Tuple[Union[str, Dict], List[CargoData], List[VesselData]]]) -> BatchStats:
+        """
+        Store the results of many emails in one transaction and mark them as
+        processed. Emails whose Message-ID was already processed are skipped.
+        Emails whose body duplicates an already extracted one are marked as
+        processed and linked to it, without storing their results again.
+        """
+        message_ids = [
+            email_data['message_id'] for email_data, _, _ in results
+            if isinstance(email_data, dict) and email_data.get('message_id')
+        ]
+        seen = set()
+        if message_ids:
+            seen = {
+                message_id for (message_id,) in self.db.query(ProcessedEmail.message_id).filter(
+                    ProcessedEmail.message_id.in_(message_ids)
+                )
+            }
+
+        index = self.duplicate_index()
+        archive = EmailArchive(self.db)
+        all_cargoes = []
+        all_vessels = []
+        processed = []
+        fingerprints = []
+        to_archive = []
+        indexed = []
+        stats = BatchStats()
+        for email_data, cargoes, vessels in results:
+            if not isinstance(email_data, dict):
+                email_data = {'content': email_data}
+            message_id = email_data.get('message_id')
+            if message_id in seen:
+                logger.info(f"Skipping already processed email: {email_data.get('subject', '')}")
+                continue
+            stats.emails += 1
+            # Records keep a reference to their archived source instead of a copy of it
+            source = len(to_archive)
+            to_archive.append(email_data)
+
+            # Mark email as processed if we have message_id
+            fp = self.fingerprint_email(email_data) if message_id else None
+            if message_id:
+                seen.add(message_id)
+                extraction = email_data.get('extraction')
+                processed.append(ProcessedEmail(
+                    message_id=message_id,
+                    subject=email_data.get('subject', ''),
+                    sender=sender_address(email_data.get('sender')),
+                    **(extraction.columns() if extraction else {})
+                ))
+            if fp is not None:
+                original = self.find_duplicate(email_data)
+                fingerprints.append(EmailFingerprint(
+                    message_id=message_id,
+                    content_hash=fp.content_hash,
+                    signature=fp.pack(),
+                    duplicate_of=original
+                ))
+                if original:
+                    logger.info(f"Email {email_data.get('subject', '')} duplicates {original}, linking to its results")
+                    stats.duplicates += 1
+                    continue
+                # Indexed right away so later emails in this batch match it too
+                index.add(message_id, fp)
+                indexed.append(message_id)
+            all_cargoes.extend((cargo, source) for cargo in cargoes)
+            all_vessels.extend((vessel, source) for vessel in vessels)
+
+        # Store results, processed markers, archive and learned templates in one transaction
+        senders = self.sender_templates().save(self.db)
+        try:
+            sources = archive.add_many(to_archive)
+            archive.mark_parsed(sources, PARSER_VERSION)
+            stats.vessels, stats.cargoes = self._store_results(
+                [(cargo, sources[source]) for cargo, source in all_cargoes],
+                [(vessel, sources[source]) for vessel, source in all_vessels],
+                processed, fingerprints
+            )
+        except Exception:
+            self.db.rollback()
+            for message_id in indexed:
+                index.remove(message_id)
+            self.sender_templates().mark_dirty(senders)
+            raise
+        return stats
+
+    def replace_results(self, results: List[Tuple[RawEmail, List[CargoData], List[VesselData]]]):
+        """
+        Replace the records extracted from archived emails with a new
+        extraction, in one transaction, and stamp them with this parser version.
+        Vessels and cargoes also mentioned by other emails are kept and updated.
+        Replaced vessels are deleted through the session, so their auctions and
+        bids go with them.
+        """
+        sources = [source for source, _, _ in results]
+        source_ids = [source.id for source in sources]
+        try:
+            if source_ids:
+                replaced = self.db.query(Cargo).filter(
+                    Cargo.source_email_id.in_(source_ids), Cargo.mention_count <= 1
+                ).all()
+                replaced += self.db.query(Vessel).filter(
+                    Vessel.source_email_id.in_(source_ids), Vessel.mention_count <= 1
+                ).all()
+                for row in replaced:
+                    self.db.delete(row)
+                if replaced:
+                    self.db.flush()
+                    self._entities = None  # Reloaded without the deleted rows
+            EmailArchive(self.db).mark_parsed(sources, PARSER_VERSION)
+            self._store_results(
+                [(cargo, source) for source, cargoes, _ in results for cargo in cargoes],
+                [(vessel, source) for source, _, vessels in results for vessel in vessels],
+                count_mentions=False
+            )
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def entity_index(self) -> EntityIndex:
+        """Known vessels and cargoes, loaded from the database on first use"""
+        if self._entities is None:
+            self._entities = EntityIndex.load(self.db)
+        return self._entities
+
+
+    def _store_results(self, cargoes: List[Tuple[CargoData, Optional[RawEmail]]],
+                       vessels: List[Tuple[VesselData, Optional[RawEmail]]],
+                       processed: Optional[List[ProcessedEmail]] = None,
+                       fingerprints: Optional[List[EmailFingerprint]] = None,
+                       count_mentions: bool = True) -> Tuple[int, int]:
+        """
+        Store parsed results in database and create auctions for vessels with ETAs.
+        Each record is paired with the archived email it came from. Records
+        that resolve to a known vessel or cargo update that row instead of
+        inserting another, so tables grow with the fleet, not with mail volume.
+        Everything, including the processed-email marker, is written in one
+        transaction with batched inserts, so the cost per email stays constant.
+        Returns the number of vessel and cargo rows inserted.
+        """
+        index = self.entity_index()
+        try:
+            # Resolve against known entities, and against new ones earlier in this batch
+            batch = EntityIndex()
+            vessel_updates = []
+            db_vessels: List[Vessel] = []
+            for vessel, source in vessels:
+                imo = str(vessel.imo) if valid_imo(str(vessel.imo or '')) else find_imo(vessel.description)
+                vessel_id = index.match_vessel(vessel.name, imo, vessel.dwt)
+                if vessel_id is not None:
+                    vessel_updates.append((vessel_id, vessel, imo, source))
+                    continue
+                position = batch.match_vessel(vessel.name, imo, vessel.dwt)
+                if position is not None:
+                    row = db_vessels[position]
+                    self._update_vessel(row, vessel, imo, source, count_mentions)
+                    batch.add_vessel(position, row.name, row.imo, row.dwt)
+                    continue
+                batch.add_vessel(len(db_vessels), vessel.name, imo, vessel.dwt)
+                db_vessels.append(Vessel(
                     name=vessel.name,
                     dwt=vessel.dwt,
                     position=vessel.position,
+                    position_port_id=vessel.position_port_id,
                     eta=vessel.eta,
                     open_date=vessel.open_date,
                     vessel_type=vessel.vessel_type,
-                    description=vessel.description
+                    imo=imo,
+                    description=short_description(vessel.description),
+                    mention_count=1,
+                    source_email_id=source.id if source else None
+                ))
+
+            cargo_updates = []
+            db_cargoes: List[Cargo] = []
+            for cargo, source in cargoes:
+                key = cargo_key(
+                    cargo.cargo_type, cargo.quantity,
+                    cargo.load_port_id or cargo.load_port, cargo.discharge_port_id or cargo.discharge_port
                 )
-                self.db.add(db_vessel)
-                self.db.flush()  # Get ID without committing
-                
-                # If vessel has ETA, create auction
-                if vessel.eta:
-                    auction_service.create_auction_for_vessel(db_vessel.id)
-                
+                cargo_id = index.match_cargo(key)
+                if cargo_id is not None:
+                    cargo_updates.append((cargo_id, cargo, source))
+                    continue
+                position = batch.match_cargo(key)
+                if position is not None:
+                    self._update_cargo(db_cargoes[position], cargo, source, count_mentions)
+                    continue
+                batch.add_cargo(len(db_cargoes), key)
+                db_cargoes.append(Cargo(
+                    cargo_type=cargo.cargo_type,
+                    quantity=cargo.quantity,
+                    load_port=cargo.load_port,
+                    discharge_port=cargo.discharge_port,
+                    load_port_id=cargo.load_port_id,
+                    discharge_port_id=cargo.discharge_port_id,
+                    laycan_start=cargo.laycan_start,
+                    laycan_end=cargo.laycan_end,
+                    rate=cargo.rate,
+                    description=short_description(cargo.description),
+                    mention_count=1,
+                    source_email_id=source.id if source else None
+                ))
+
+            # Existing rows are loaded with one query per table
+            updated_vessels = []
+            if vessel_updates:
+                rows = {row.id: row for row in self.db.query(Vessel).filter(
+                    Vessel.id.in_({vessel_id for vessel_id, _, _, _ in vessel_updates})
+                )}
+                for vessel_id, vessel, imo, source in vessel_updates:
+                    if vessel_id in rows:
+                        self._update_vessel(rows[vessel_id], vessel, imo, source, count_mentions)
+                updated_vessels = list(rows.values())
+            if cargo_updates:
+                rows = {row.id: row for row in self.db.query(Cargo).filter(
+                    Cargo.id.in_({cargo_id for cargo_id, _, _ in cargo_updates})
+                )}
+                for cargo_id, cargo, source in cargo_updates:
+                    if cargo_id in rows:
+                        self._update_cargo(rows[cargo_id], cargo, source, count_mentions)
+
+            self.db.add_all(db_cargoes)
+            self.db.add_all(db_vessels)
+
+            if processed:
+                self.db.add_all(processed)
+            if fingerprints:
+                self.db.add_all(fingerprints)
+
+            self.db.flush()  # Batched inserts; assigns vessel IDs without committing
+
+            # Create auctions for vessels with ETAs; vessels that already have one are skipped
+            with_eta = [db_vessel for db_vessel in db_vessels + updated_vessels if db_vessel.eta]
+            if with_eta:
+                from .auction_service import AuctionService  # Import here to avoid circular imports
+                AuctionService(self.db).create_auctions_for_vessels(with_eta, commit=False)
+
+            # Read before the commit expires the rows, which would reload each one
+            new_vessels = [(row.id, row.name, row.imo, row.dwt) for row in db_vessels]
+            # Updated rows may have gained a DWT or IMO to resolve later mentions by
+            updated = [(row.id, row.name, row.imo, row.dwt) for row in updated_vessels]
+            new_cargoes = [(row.id, cargo_key(
+                row.cargo_type, row.quantity,
+                row.load_port_id or row.load_port, row.discharge_port_id or row.discharge_port
+            )) for row in db_cargoes]
             self.db.commit()
         except Exception as e:
             logger.error(f"Database storage failed: {str(e)}")
             self.db.rollback()
             raise
 
+        # Only committed rows become known entities
+        for vessel_id, name, imo, dwt in new_vessels + updated:
+            index.add_vessel(vessel_id, name, imo, dwt)
+        for cargo_id, key in new_cargoes:
+            index.add_cargo(cargo_id, key)
+        return len(new_vessels), len(new_cargoes)
+
+    def _update_vessel(self, row: Vessel, vessel: VesselData, imo: Optional[str],
+                       source: Optional[RawEmail], count_mentions: bool):
+        """Apply a newer mention: its position and dates win, known details are kept"""
+        for field in ('position', 'position_port_id', 'eta', 'open_date'):
+            value = getattr(vessel, field)
+            if value is not None:
+                setattr(row, field, value)
+        row.dwt = row.dwt or vessel.dwt
+        row.vessel_type = row.vessel_type or vessel.vessel_type
+        row.imo = row.imo or imo
+        if vessel.description:
+            row.description = short_description(vessel.description)
+        if source is not None:
+            row.source_email_id = source.id
+        if count_mentions:
+            row.mention_count = (row.mention_count or 1) + 1
+        row.updated_at = datetime.utcnow()
+
+    def _update_cargo(self, row: Cargo, cargo: CargoData, source: Optional[RawEmail], count_mentions: bool):
+        for field in ('laycan_start', 'laycan_end', 'rate'):
+            value = getattr(cargo, field)
+            if value is not None:
+                setattr(row, field, value)
+        if cargo.description:
+            row.description = short_description(cargo.description)
+        if source is not None:
+            row.source_email_id = source.id
+        if count_mentions:
+            row.mention_count = (row.mention_count or 1) + 1
+        row.updated_at = datetime.utcnow()
+
     def has_cargo_indicators(self, text: str) -> bool:
         """Check if text has strong cargo indicators"""
-        indicators = [
-            r'\b\d{4,6}\s*(?:MT|MTS|KMT|K|TONS?|DWT)\b',
-            r'\bLAYCAN\b',
-            r'\bFREIGHT\s+RATE\b',
-            r'\bLOAD(?:ING)?\s+PORT\b',
-            r'\bDISCH(?:ARGE)?\s+PORT\b',
-            r'\bCARGO\s+READY\b',
-            r'\bDWCC\b',  # Deadweight Cargo Capacity
-            r'\bCBFT\b',  # Cubic Feet
-            r'\bPROPOSE\s+(?:SUITABLE\s+)?C(?:AR)?GOES?\b',
-            r'\bOPEN\s+(?:AT|IN|FROM|ON)\b',
-            r'\bGR:\d',  # Grain capacity
-            r'\bCRANES?\b'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in indicators)
+        return scan_section(text).has_cargo_indicators
 
     def is_vessel_section(self, text: str) -> bool:
         """Check if text is about vessel details"""
-        vessel_indicators = [
-            r'\bVESSEL\s+(?:DETAILS?|SPECS?|NAME)\b',
-            r'\bDWT\b',
-            r'\bIMO\s+NO\b',
-            r'\bBUILT\b',
-            r'\bFLAG\b',
-            r'\bCLASS\b',
-            r'\bVESSEL\s+POSITION\b'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in vessel_indicators)
+        return scan_section(text).is_vessel_section
 
     def is_position_update(self, text: str) -> bool:
         """Check if text is a position update"""
-        position_indicators = [
-            r'\b(?:CURRENT\s+)?POSITION\b',
-            r'\bETA\b',
-            r'\bOPEN\s+(?:AT|IN|FROM)\b',
-            r'\bARRIVING\b',
-            r'\bDEPARTING\b',
-            r'\bEXPECTED\b'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in position_indicators)
+        return scan_section(text).is_position_update
 
     def clean_rate(self, rate: str) -> Optional[str]:
         """Clean and standardize rate format"""
@@ -349,46 +742,86 @@ class EmailParser:
         text = ' '.join(text.split())
         return text
 
+    def clean_port(self, value: Optional[str]) -> Optional[str]:
+        """
+        A port captured by the field regexes, which run on past the port name
+        ("RICHARDS BAY\nTO ROTTERDAM"), cut down to the gazetteer port it starts with
+        """
+        if not value:
+            return None
+        matches = find_ports(value)
+        if matches and not value[:matches[0].start].strip():
+            return get_port(matches[0].value).name
+        return value.strip()
+
+    def extract_route(self, text: str, load_value: Optional[str],
+                      discharge_value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Load and discharge ports. When a label is missing, a gazetteer port is
+        only taken on an explicit cue: right after "load"/"disch"/"from"/"to",
+        or as one side of an "X/Y" or "X TO Y" route. Otherwise it stays None;
+        an open position or bunkering port named first is not a load port.
+        """
+        load_port, discharge_port = self.clean_port(load_value), self.clean_port(discharge_value)
+        if load_port and discharge_port:
+            return load_port, discharge_port
+
+        matches = find_ports(text)
+        for match in matches:
+            name = get_port(match.value).name
+            before = text[max(0, match.start - CUE_WINDOW):match.start]
+            if not load_port and name != discharge_port and LOAD_CUE.search(before):
+                load_port = name
+            elif not discharge_port and name != load_port and DISCHARGE_CUE.search(before):
+                discharge_port = name
+
+        for first, second in zip(matches, matches[1:]):
+            if load_port and discharge_port:
+                break
+            if not ROUTE_JOIN.fullmatch(text, first.end, second.start):
+                continue
+            origin, destination = get_port(first.value).name, get_port(second.value).name
+            if origin == destination:
+                continue
+            if not load_port and discharge_port in (None, destination):
+                load_port, discharge_port = origin, destination
+            elif not discharge_port and load_port == origin:
+                discharge_port = destination
+        return load_port, discharge_port
+
     def extract_rate(self, text: str) -> Optional[str]:
         """Extract rate information from text"""
-        rate_patterns = [
-            r'(?:FREIGHT|RATE)\s*:?\s*(?:USD|US\$|\$)?\s*([\d,\.]+)(?:\s*(?:USD|US\$|\$|\/)?\s*(?:MT|TON|PER MT|PMT))',
-            r'(?:USD|US\$|\$)\s*([\d,\.]+)(?:\s*(?:\/|\s+PER\s+)?(?:MT|TON|METRIC TON))',
-            r'([\d,\.]+)\s*(?:USD|US\$|\$)(?:\s*(?:\/|\s+PER\s+)?(?:MT|TON|METRIC TON))'
-        ]
-        
-        for pattern in rate_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                rate_value = float(match.group(1).replace(',', ''))
-                return f"USD {rate_value}/MT"
-        
+        rate = scan_section(text).rate()
+        if rate:
+            rate_value = float(rate.replace(',', ''))
+            return f"USD {rate_value}/MT"
+
         return None
 
     def extract_cargoes(self, text: str) -> List[CargoData]:
         """Extract cargo information with regex"""
         logger.info("Extracting cargo information")
         cargoes = []
-        
-        sections = re.split(r'\n\s*\n', text)
-        
-        for section in sections:
-            if self.has_cargo_indicators(section):
+
+        for scan in scan_sections(text):
+            if scan.has_cargo_indicators:
+                section = scan.text
                 # Extract basic cargo information
-                cargo_type_match = re.search(r'(?:CARGO|COMMODITY)\s*:?\s*([A-Z][A-Z\s]+)', section, re.IGNORECASE)
-                quantity_match = re.search(r'(?:QUANTITY|QTY|AMOUNT)\s*:?\s*([\d,\.]+)\s*(?:MT|MTS|KMT|K|TONS?)', section, re.IGNORECASE)
-                load_port_match = re.search(r'(?:LOAD(?:ING)?\s+PORT|FROM)\s*:?\s*([A-Z][A-Z\s,]+)', section, re.IGNORECASE)
-                discharge_port_match = re.search(r'(?:DISCH(?:ARGE)?\s+PORT|TO)\s*:?\s*([A-Z][A-Z\s,]+)', section, re.IGNORECASE)
-                
+                cargo_type = scan.get('cargo_type')
+                quantity = scan.get('quantity_value')
+                load_port, discharge_port = self.extract_route(
+                    section, scan.get('load_port_value'), scan.get('discharge_port_value')
+                )
+
                 # Extract rate information
                 rate = self.extract_rate(section)
-                
-                if cargo_type_match and quantity_match:
+
+                if cargo_type and quantity:
                     cargo = CargoData(
-                        cargo_type=cargo_type_match.group(1).strip(),
-                        quantity=float(quantity_match.group(1).replace(',', '')),
-                        load_port=load_port_match.group(1).strip() if load_port_match else None,
-                        discharge_port=discharge_port_match.group(1).strip() if discharge_port_match else None,
+                        cargo_type=cargo_type.strip(),
+                        quantity=float(quantity.replace(',', '')),
+                        load_port=load_port,
+                        discharge_port=discharge_port,
                         rate=rate,
                         description=self.clean_description(section)
                     )
@@ -406,68 +839,49 @@ class EmailParser:
         """Extract vessel information with regex"""
         logger.info("Extracting vessel information")
         vessels = []
-        
-        vessel_indicators = [
-            r'VESSEL\s+DETAILS?:?',
-            r'M/?V\s+',
-            r'NAME\s*:',
-            r'SHIP\s+DETAILS?:?'
-        ]
-        
-        sections = re.split(r'\n\s*\n', text)
-        
+
+        scans = scan_sections(text)
+
         # Skip vessel extraction if we see cargo indicators in the header
-        cargo_headers = [
-            r'PROPOSE\s+(?:SUITABLE\s+)?CGOES',
-            r'PLS\s+(?:DO\s+)?NOT\s+RECIRCULATE',
-            r'AVAILABLE\s+CARGOES?:',
-        ]
-        
-        if any(re.search(pattern, sections[0], re.IGNORECASE) for pattern in cargo_headers):
+        if scans[0].has_cargo_headers:
             logger.info("Skipping vessel extraction due to cargo headers")
             return vessels
-        
-        for section in sections:
-            is_vessel_section = any(
-                re.search(pattern, section, re.IGNORECASE) 
-                for pattern in vessel_indicators
-            )
-            
-            name_match = re.search(r'(?:VESSEL|NAME|M/?V)\s*:?\s*([A-Z][A-Z\s]+)', section, re.IGNORECASE)
-            
-            if name_match and (is_vessel_section or self.has_vessel_indicators(section)):
-                vessel_name = name_match.group(1).strip()
-                
+
+        for scan in scans:
+            name = scan.get('vessel_name')
+
+            if name and (scan.is_vessel_block or scan.has_vessel_indicators):
+                vessel_name = name.strip()
+
                 # Extract basic information
-                dwt_match = re.search(r'(?:DWT|DEADWEIGHT)\s*:?\s*([\d,\.]+)', section, re.IGNORECASE)
-                position_match = re.search(r'(?:POSITION|PORT|LOC)\s*:?\s*([A-Z][A-Z\s]+)', section, re.IGNORECASE)
-                type_match = re.search(r'(?:TYPE|VESSEL TYPE)\s*:?\s*([A-Z][A-Z\s]+)', section, re.IGNORECASE)
-                eta_match = re.search(r'ETA\s*:?\s*([\d\-\.\/]+\s*(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)?(?:\s*\d{4})?)', section, re.IGNORECASE)
-                open_match = re.search(r'OPEN\s*:?\s*([\d\-\.\/]+\s*(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)?(?:\s*\d{4})?)', section, re.IGNORECASE)
-                
+                dwt = scan.get('dwt_value')
+                position = self.clean_port(scan.get('position_value'))
+                vessel_type = scan.get('type_value')
+                eta = scan.get('eta_value')
+                open_date = scan.get('open_value')
+
                 # Extract rate information
-                rate_match = re.search(r'(?:FREIGHT|RATE)\s*:?\s*(?:USD|US\$|\$)?\s*([\d,\.]+)(?:\s*(?:USD|US\$|\$|\/)?\s*(?:MT|TON|PER MT|PMT))', section, re.IGNORECASE)
+                rate_value = scan.get('freight_rate_value')
                 rate = None
-                if rate_match:
-                    rate_value = float(rate_match.group(1).replace(',', ''))
-                    rate = f"USD {rate_value}/MT"
-                
-                if not self.is_cargo_section(section):
+                if rate_value:
+                    rate = f"USD {float(rate_value.replace(',', ''))}/MT"
+
+                if not scan.is_cargo_section:
                     logger.info(f"Found vessel: {vessel_name}")
-                    
-                    description = self.clean_description(section)
-                    
+
+                    description = self.clean_description(scan.text)
+
                     # Add rate to description if found
                     if rate:
                         description = f"Rate: {rate}. " + description
-                    
+
                     vessel = VesselData(
                         name=vessel_name,
-                        dwt=float(dwt_match.group(1).replace(',', '')) if dwt_match else None,
-                        position=position_match.group(1).strip() if position_match else None,
-                        vessel_type=type_match.group(1).strip() if type_match else None,
-                        eta=self.parse_date(eta_match.group(1)) if eta_match else None,
-                        open_date=self.parse_date(open_match.group(1)) if open_match else None,
+                        dwt=float(dwt.replace(',', '')) if dwt else None,
+                        position=position,
+                        vessel_type=vessel_type.strip() if vessel_type else None,
+                        eta=self.parse_date(eta) if eta else None,
+                        open_date=self.parse_date(open_date) if open_date else None,
                         description=description
                     )
                     vessels.append(vessel)
@@ -476,38 +890,20 @@ class EmailParser:
     
     def is_cargo_section(self, text: str) -> bool:
         """Check if text is about cargo"""
-        cargo_indicators = [
-            r'\bCARGO\b',
-            r'\bLAYCAN\b',
-            r'\bFREIGHT\b',
-            r'\bRATE\b',
-            r'\bPROPOSE\s+SUITABLE\s+CGOES\b',
-            r'\bMT\b',
-            r'\bQUANTITY\b',
-            r'\bDWCC\b',
-            r'\bCBFT\b'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in cargo_indicators)
+        return scan_section(text).is_cargo_section
 
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse various date formats"""
         try:
             if not date_str:
                 return None
-                
-            formats = [
-                '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d',
-                '%d-%b-%Y', '%d %b %Y', '%d %B %Y',
-                '%d-%m-%y', '%d/%m/%y'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
+
+            # Local broker date grammar first; it covers nearly every date we see
+            parsed = normalize_date(date_str)
+            if parsed:
+                return parsed
             
-            # If standard formats fail, try OpenAI's date parsing if available
+            # If the grammar fails, try OpenAI's date parsing if available
             if self.use_ai:
                 try:
                     return self.ai.standardize_date(date_str)
@@ -517,4 +913,4 @@ class EmailParser:
             return None
         except Exception as e:
             logger.error(f"Date parsing failed: {str(e)}")
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,236 @@
+# src/ship_broker/core/email_pipeline.py
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .email_parser import BatchStats, EmailParser
+from .email_queue import EmailQueue, new_worker_id
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Queue sentinel telling a stage that its input is exhausted
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Item counts and timings for one pipeline stage"""
+    name: str
+    items: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def record(self, started: float, ok: bool = True, items: int = 1):
+        finished = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = started
+        self.finished_at = finished
+        self.busy_seconds += finished - started
+        if ok:
+            self.items += items
+        else:
+            self.failed += items
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Items per second over the stage's active window"""
+        return self.items / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "items": self.items,
+            "failed": self.failed,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.throughput, 2)
+        }
+
+
+@dataclass
+class PipelineResult:
+    emails: int = 0
+    vessels: int = 0
+    cargoes: int = 0
+    duplicates: int = 0
+    total_seconds: float = 0.0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            "emails": self.emails,
+            "vessels": self.vessels,
+            "cargoes": self.cargoes,
+            "duplicates": self.duplicates,
+            "total_seconds": round(self.total_seconds, 3),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()}
+        }
+
+
+class EmailPipeline:
+    """
+    Three-stage email processing: fetch, extract and store.
+    Fetched emails go into the durable EmailQueue first; the pipeline then
+    drains every job it can lease, including ones left over by a crashed or
+    concurrent run. Extraction runs in `concurrency` workers, which bounds the
+    number of LLM requests in flight; emails whose body duplicates one already
+    extracted skip extraction and are linked to it. A single writer owns the parser's
+    database session and completes each job in the same transaction as its
+    results, so writes stay serialized while extraction continues.
+    """
+
+    def __init__(self, parser: EmailParser, concurrency: Optional[int] = None, queue_size: Optional[int] = None):
+        self.parser = parser
+        self.concurrency = max(1, concurrency or settings.EXTRACTION_CONCURRENCY)
+        self.queue_size = queue_size or self.concurrency * 2
+        self.worker_id = new_worker_id()
+
+    async def run(self, days: int = 1, emails: Optional[List[Dict]] = None) -> PipelineResult:
+        """Process new emails from the last `days` days, or the given emails"""
+        result = PipelineResult(stages={name: StageStats(name) for name in ('fetch', 'extract', 'store')})
+        started = time.perf_counter()
+
+        # Load fingerprints and templates before any stage shares the parser's session
+        await asyncio.to_thread(self.parser.duplicate_index)
+        await asyncio.to_thread(self.parser.sender_templates)
+
+        to_extract: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_store: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        # A dedicated pool so the default executor's size cannot cap the concurrency
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="extract")
+        extractors = [
+            asyncio.create_task(self._extract_worker(to_extract, to_store, result, executor))
+            for _ in range(self.concurrency)
+        ]
+        writer = asyncio.create_task(self._writer(to_store, result))
+
+        try:
+            await self._fetch(to_extract, result, days, emails)
+        finally:
+            # Drain the later stages even when fetching fails
+            for _ in extractors:
+                await to_extract.put(_DONE)
+            await asyncio.gather(*extractors)
+            executor.shutdown(wait=False)
+            await to_store.put(_DONE)
+            await writer
+
+            result.total_seconds = time.perf_counter() - started
+            self._log_result(result)
+
+        return result
+
+    async def _fetch(self, to_extract: asyncio.Queue, result: PipelineResult, days: int,
+                     emails: Optional[List[Dict]]):
+        stage = result.stages['fetch']
+        # The writer thread owns the parser's session; leasing needs its own
+        queue = EmailQueue(Session(bind=self.parser.db.get_bind()))
+        try:
+            started = time.perf_counter()
+            if emails is None:
+                emails = await asyncio.to_thread(self.parser.get_emails, days)
+            await asyncio.to_thread(queue.enqueue, emails)
+            stage.record(started, items=len(emails))
+            logger.info(f"Found {len(emails)} emails to process")
+
+            # Lease in small batches so leases do not expire while jobs wait in memory
+            while True:
+                jobs = await asyncio.to_thread(queue.lease, self.worker_id, self.queue_size)
+                if not jobs:
+                    break
+                result.emails += len(jobs)
+                for job in jobs:
+                    await to_extract.put(job)
+        finally:
+            queue.db.close()
+
+    async def _extract_worker(self, to_extract: asyncio.Queue, to_store: asyncio.Queue, result: PipelineResult,
+                              executor: ThreadPoolExecutor):
+        stage = result.stages['extract']
+        loop = asyncio.get_running_loop()
+        while True:
+            email_data = await to_extract.get()
+            if email_data is _DONE:
+                return
+
+            started = time.perf_counter()
+            try:
+                original = await loop.run_in_executor(executor, self.parser.find_duplicate, email_data)
+                if original:
+                    # The writer links it to the original's results, and counts it
+                    await to_store.put((email_data, [], []))
+                    continue
+                cargoes, vessels = await loop.run_in_executor(executor, self.parser.extract_email, email_data)
+            except Exception as e:
+                logger.error(f"Error extracting email {email_data.get('subject')}: {str(e)}")
+                stage.record(started, ok=False)
+                # Job state is only ever touched by the writer's session
+                await to_store.put((email_data, None, str(e)))
+                continue
+
+            stage.record(started)
+            await to_store.put((email_data, cargoes, vessels))
+
+    async def _writer(self, to_store: asyncio.Queue, result: PipelineResult):
+        stage = result.stages['store']
+        queue = EmailQueue(self.parser.db)
+        while True:
+            item = await to_store.get()
+            if item is _DONE:
+                return
+
+            email_data, cargoes, vessels = item
+            if cargoes is None:
+                await asyncio.to_thread(queue.fail, email_data['job_id'], self.worker_id, vessels)
+                continue
+
+            started = time.perf_counter()
+            try:
+                stored = await asyncio.to_thread(self._store_job, queue, email_data, cargoes, vessels)
+            except Exception as e:
+                logger.error(f"Error storing email {email_data.get('subject')}: {str(e)}")
+                stage.record(started, ok=False)
+                await asyncio.to_thread(queue.fail, email_data['job_id'], self.worker_id, str(e))
+                continue
+
+            stage.record(started)
+            if stored:
+                result.vessels += stored.vessels
+                result.cargoes += stored.cargoes
+                result.duplicates += stored.duplicates
+
+    def _store_job(self, queue: EmailQueue, email_data: Dict, cargoes: List, vessels: List) -> Optional[BatchStats]:
+        # Completing first takes the row lock; results and completion then
+        # commit together, or neither does
+        if not queue.complete(email_data['job_id'], self.worker_id, commit=False):
+            self.parser.db.rollback()
+            logger.info(f"Skipping email {email_data.get('subject')}: job was completed by another worker")
+            return None
+        return self.parser.store_email(email_data, cargoes, vessels)
+
+    def _log_result(self, result: PipelineResult):
+        for stage in result.stages.values():
+            logger.info(
+                f"Pipeline stage {stage.name}: {stage.items} ok, {stage.failed} failed, "
+                f"{stage.throughput:.2f} emails/s over {stage.wall_seconds:.2f}s"
+            )
+        logger.info(
+            f"Processed {result.emails} emails in {result.total_seconds:.2f}s "
+            f"({result.vessels} vessels, {result.cargoes} cargoes, {result.duplicates} duplicates)"
+        )
@@ -0,0 +1,110 @@
+# src/ship_broker/core/email_priority.py
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Optional
+
+from .date_normalizer import normalize_date_range
+from ..config import get_settings
+
+settings = get_settings()
+
+# Job ranks count hours from here; naive UTC like the rest of the database
+_EPOCH = datetime(1970, 1, 1)
+
+# A date right after ETA, laycan, open or ready: "ETA 15/05", "OPEN AT SINGAPORE 10-15 MAY", "LAYCAN PPT"
+_URGENT_DATE = re.compile(
+    r'\b(?:ETA|ETB|LAYCAN|L/C|OPEN|READY)\b(?:\s+(?:ON|AT|IN|FROM)(?:\s+[A-Z]+){1,2})?\s*[:\-]?\s*'
+    r'(PROMPT|PPT|SPOT|ASAP|\d{1,2}(?:\s*-\s*\d{1,2})?\s*[/\-. ]\s*(?:[A-Z]{3,9}|\d{1,2}))',
+    re.IGNORECASE
+)
+# Urgency only looks at the top of the body, where positions are announced
+_URGENCY_SCAN_CHARS = 8000
+
+
+def parse_sender_weights(spec: str) -> Dict[str, float]:
+    """'broker@a.com=3,clarksons.com=2,news.com=0.2' -> {address or domain: weight}"""
+    weights = {}
+    for item in spec.split(','):
+        key, _, weight = item.partition('=')
+        if key.strip() and weight.strip():
+            weights[key.strip().lower()] = float(weight)
+    return weights
+
+
+def urgent_within(text: str, days: int, today: Optional[date] = None) -> bool:
+    """Whether the text mentions an ETA, laycan or open date starting within `days`"""
+    today = today or date.today()
+    for match in _URGENT_DATE.finditer(text[:_URGENCY_SCAN_CHARS]):
+        window = normalize_date_range(match.group(1), today)
+        if window and 0 <= (window[0].date() - today).days <= days:
+            return True
+    return False
+
+
+class EmailPrioritizer:
+    """
+    Extraction priority of a fetched email: its sender's weight (1.0 unless
+    configured, by address or domain) decayed by message age with a half
+    life of `half_life_hours`, plus `urgency_weight` when the body has an
+    ETA, laycan or open date within `urgency_days`. Fresh positions from key
+    brokers score highest; stale newsletters lowest.
+
+    `rank` turns a score into the queue's ordering key. Jobs gain
+    `aging_per_hour` for every hour they wait, so anything queued is
+    eventually leased ahead of fresher arrivals: an email never waits more
+    than (highest score - its score) / aging_per_hour hours behind later ones.
+    """
+
+    def __init__(self, sender_weights: Optional[Dict[str, float]] = None, half_life_hours: float = 24.0,
+                 urgency_days: int = 5, urgency_weight: float = 1.0, aging_per_hour: float = 0.25):
+        self.sender_weights = {key.lower(): weight for key, weight in (sender_weights or {}).items()}
+        self.half_life_hours = half_life_hours
+        self.urgency_days = urgency_days
+        self.urgency_weight = urgency_weight
+        self.aging_per_hour = aging_per_hour
+
+    def sender_weight(self, sender: Optional[str]) -> float:
+        """Weight of the address, else of its domain or a parent domain"""
+        if not sender:
+            return 1.0
+        sender = sender.lower()
+        if sender in self.sender_weights:
+            return self.sender_weights[sender]
+        domain = sender.rpartition('@')[2]
+        while domain:
+            if domain in self.sender_weights:
+                return self.sender_weights[domain]
+            domain = domain.partition('.')[2]
+        return 1.0
+
+    def score(self, email_data: Dict, now: Optional[datetime] = None) -> float:
+        now = now or datetime.utcnow()
+        score = self.sender_weight(email_data.get('sender'))
+        received = email_data.get('received_at')
+        if received and self.half_life_hours > 0:
+            age_hours = max(0.0, (now - received).total_seconds() / 3600)
+            score *= 0.5 ** (age_hours / self.half_life_hours)
+        if self.urgency_weight and urgent_within(email_data.get('content') or '', self.urgency_days, now.date()):
+            score += self.urgency_weight
+        return score
+
+    def rank(self, score: float, enqueued_at: datetime) -> float:
+        """
+        Ordering key, highest first. Equal to the score plus the aging
+        earned by now, minus the same amount for every job, so it is fixed
+        at enqueue time and can be indexed.
+        """
+        return score - self.aging_per_hour * (enqueued_at - _EPOCH).total_seconds() / 3600
+
+
+@lru_cache()
+def get_email_prioritizer() -> EmailPrioritizer:
+    return EmailPrioritizer(
+        parse_sender_weights(settings.PRIORITY_SENDER_WEIGHTS),
+        half_life_hours=settings.PRIORITY_HALF_LIFE_HOURS,
+        urgency_days=settings.PRIORITY_URGENCY_DAYS,
+        urgency_weight=settings.PRIORITY_URGENCY_WEIGHT,
+        aging_per_hour=settings.PRIORITY_AGING_PER_HOUR
+    )
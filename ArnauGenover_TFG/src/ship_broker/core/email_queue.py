@@ -0,0 +1,221 @@
+# src/ship_broker/core/email_queue.py
+
+import hashlib
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from .database import EmailJob, EmailJobStatus
+from .email_priority import EmailPrioritizer, get_email_prioritizer
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def new_worker_id() -> str:
+    """Identify a queue consumer uniquely across hosts, processes and runs"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def job_message_id(email_data: Dict) -> str:
+    """Message-ID of an email, or a content hash when the header is missing"""
+    if email_data.get('message_id'):
+        return email_data['message_id']
+    digest = hashlib.sha1(email_data.get('content', '').encode('utf-8', 'replace')).hexdigest()
+    return f"<sha1-{digest}@ship-broker>"
+
+
+class EmailQueue:
+    """
+    Database-backed queue of fetched emails.
+    Jobs move pending -> leased -> done, or back to pending on failure until
+    EMAIL_JOB_MAX_ATTEMPTS is reached, after which they are marked failed.
+    Leases expire, so jobs held by a crashed worker are picked up again, and
+    every transition is a conditional update, so several workers can drain
+    the queue at the same time without processing a job twice.
+    Jobs are leased highest priority first, as scored by the
+    EmailPrioritizer when enqueued, rather than in fetch order.
+    """
+
+    def __init__(self, db: Session, lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None,
+                 prioritizer: Optional[EmailPrioritizer] = None):
+        self.db = db
+        self.lease_seconds = lease_seconds or settings.EMAIL_JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.EMAIL_JOB_MAX_ATTEMPTS
+        self.prioritizer = prioritizer or get_email_prioritizer()
+
+    def enqueue(self, emails: List[Dict]) -> int:
+        """Add fetched emails as pending jobs, ignoring ones already queued"""
+        by_id = {job_message_id(email_data): email_data for email_data in emails}
+        if not by_id:
+            return 0
+        now = datetime.utcnow()
+
+        try:
+            existing = {
+                message_id for (message_id,) in self.db.query(EmailJob.message_id).filter(
+                    EmailJob.message_id.in_(list(by_id))
+                )
+            }
+            jobs = []
+            for message_id, email_data in by_id.items():
+                if message_id in existing:
+                    continue
+                score = self.prioritizer.score(email_data, now)
+                jobs.append(EmailJob(
+                    message_id=message_id,
+                    subject=email_data.get('subject', ''),
+                    sender=email_data.get('sender'),
+                    content=email_data.get('content', ''),
+                    received_at=email_data.get('received_at'),
+                    priority=score,
+                    rank=self.prioritizer.rank(score, now),
+                    status=EmailJobStatus.PENDING,
+                    attempts=0,
+                    created_at=now
+                ))
+            self.db.add_all(jobs)
+            self.db.commit()
+            if jobs:
+                logger.info(f"Queued {len(jobs)} new email jobs")
+            return len(jobs)
+        except Exception as e:
+            logger.error(f"Error queueing emails: {str(e)}")
+            self.db.rollback()
+            raise
+
+    def lease(self, worker_id: str, limit: int) -> List[Dict]:
+        """Lease up to `limit` pending or expired jobs for this worker, highest priority first"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        try:
+            self._fail_exhausted(now)
+
+            candidates = [
+                job_id for (job_id,) in self.db.query(EmailJob.id)
+                .filter(self._leasable(now))
+                .order_by(EmailJob.rank.desc(), EmailJob.id)
+                .limit(limit)
+            ]
+            if not candidates:
+                return []
+
+            # Re-check leasability in the update itself; a concurrent worker that
+            # claimed the same rows first makes this update skip them
+            self.db.query(EmailJob).filter(
+                EmailJob.id.in_(candidates),
+                self._leasable(now)
+            ).update({
+                EmailJob.status: EmailJobStatus.LEASED,
+                EmailJob.lease_owner: worker_id,
+                EmailJob.lease_expires_at: expires_at,
+                EmailJob.attempts: EmailJob.attempts + 1
+            }, synchronize_session=False)
+            self.db.commit()
+
+            jobs = self.db.query(EmailJob).filter(
+                EmailJob.id.in_(candidates),
+                EmailJob.status == EmailJobStatus.LEASED,
+                EmailJob.lease_owner == worker_id,
+                EmailJob.lease_expires_at == expires_at
+            ).order_by(EmailJob.rank.desc(), EmailJob.id).all()
+
+            return [
+                {
+                    'job_id': job.id,
+                    'message_id': job.message_id,
+                    'subject': job.subject,
+                    'sender': job.sender,
+                    'content': job.content,
+                    'received_at': job.received_at
+                }
+                for job in jobs
+            ]
+        except Exception as e:
+            logger.error(f"Error leasing email jobs: {str(e)}")
+            self.db.rollback()
+            return []
+
+    def complete(self, job_id: int, worker_id: str, commit: bool = True) -> bool:
+        """
+        Mark a leased job as done. Returns False when this worker no longer
+        holds the lease, e.g. because it expired and another worker finished
+        the job. With commit=False the update joins the caller's transaction,
+        so results and completion are committed together. The body is
+        dropped, as the email archive keeps the raw message.
+        """
+        updated = self.db.query(EmailJob).filter(
+            EmailJob.id == job_id,
+            EmailJob.status == EmailJobStatus.LEASED,
+            EmailJob.lease_owner == worker_id
+        ).update({
+            EmailJob.status: EmailJobStatus.DONE,
+            EmailJob.content: None,
+            EmailJob.completed_at: datetime.utcnow(),
+            EmailJob.lease_owner: None,
+            EmailJob.lease_expires_at: None,
+            EmailJob.last_error: None
+        }, synchronize_session=False)
+        if commit:
+            self.db.commit()
+        return updated == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Release a leased job for retry, or mark it failed when out of attempts"""
+        try:
+            job = self.db.query(EmailJob).filter(
+                EmailJob.id == job_id,
+                EmailJob.status == EmailJobStatus.LEASED,
+                EmailJob.lease_owner == worker_id
+            ).first()
+            if not job:
+                return
+
+            job.status = EmailJobStatus.FAILED if job.attempts >= self.max_attempts else EmailJobStatus.PENDING
+            job.lease_owner = None
+            job.lease_expires_at = None
+            job.last_error = error
+            self.db.commit()
+
+            if job.status == EmailJobStatus.FAILED:
+                logger.error(f"Email job {job_id} failed after {job.attempts} attempts: {error}")
+        except Exception as e:
+            logger.error(f"Error releasing email job {job_id}: {str(e)}")
+            self.db.rollback()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        counts = {status.value: 0 for status in EmailJobStatus}
+        for status, count in self.db.query(EmailJob.status, func.count(EmailJob.id)).group_by(EmailJob.status):
+            counts[status.value] = count
+        return counts
+
+    def _leasable(self, now: datetime):
+        return and_(
+            EmailJob.attempts < self.max_attempts,
+            or_(
+                EmailJob.status == EmailJobStatus.PENDING,
+                and_(EmailJob.status == EmailJobStatus.LEASED, EmailJob.lease_expires_at < now)
+            )
+        )
+
+    def _fail_exhausted(self, now: datetime):
+        # Jobs whose last allowed lease expired without completion
+        self.db.query(EmailJob).filter(
+            EmailJob.status == EmailJobStatus.LEASED,
+            EmailJob.lease_expires_at < now,
+            EmailJob.attempts >= self.max_attempts
+        ).update({
+            EmailJob.status: EmailJobStatus.FAILED,
+            EmailJob.lease_owner: None,
+            EmailJob.lease_expires_at: None,
+            EmailJob.last_error: "Lease expired on final attempt"
+        }, synchronize_session=False)
@@ -0,0 +1,194 @@
+# src/ship_broker/core/email_triage.py
+
+import enum
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .circular_splitter import RECORD_FEATURES
+from .commodities import classify_commodity
+from .ports import find_ports
+from .section_classifier import SectionScan, scan_sections
+from ..config import get_settings
+
+settings = get_settings()
+
+# Read receipts and bounces only when the subject starts with their prefix, so "Must read: open tonnage" is kept
+_AUTO_REPLY_SUBJECT = re.compile(
+    r'\b(?:out\s+of\s+(?:the\s+)?office|automatic\s+reply|auto[\s\-]?reply|autoreply|away\s+from\s+the\s+office)\b|'
+    r'^\s*(?:(?:read|read\s+receipt|undeliverable)\s*:|delivery\s+status\s+notification\b|mail\s+delivery\s+failed\b)',
+    re.IGNORECASE
+)
+_AWAY_NOTICE = re.compile(
+    r'\b(?:i\s+am|i\s+will\s+be|i\'m)\s+(?:currently\s+)?(?:out\s+of\s+(?:the\s+)?office|away|on\s+(?:annual\s+)?leave)\b',
+    re.IGNORECASE
+)
+_BULK_MAIL = re.compile(
+    r'\b(?:unsubscribe|view\s+(?:this\s+email\s+)?in\s+(?:your\s+)?browser|newsletter|manage\s+(?:your\s+)?preferences)\b',
+    re.IGNORECASE
+)
+
+
+class Triage(enum.Enum):
+    NO_CONTENT = "no_content"              # Nothing to extract: auto-replies, newsletters, chatter
+    REGEX_SUFFICIENT = "regex_sufficient"  # Labelled layouts the field regexes fully capture
+    NEEDS_LLM = "needs_llm"
+
+
+@dataclass(frozen=True)
+class TriageFeatures:
+    records: int = 0            # Sections describing one vessel or cargo
+    labelled_records: int = 0   # Of those, sections whose key fields the regexes captured
+    ports: int = 0              # Gazetteer ports named anywhere
+    auto_reply: bool = False    # Subject of an automatic reply or bounce
+    away_notice: bool = False   # "I am out of the office" near the top of the body
+    bulk_mail: bool = False
+
+    @property
+    def coverage(self) -> float:
+        return self.labelled_records / self.records if self.records else 0.0
+
+
+@dataclass(frozen=True)
+class TriageDecision:
+    label: Triage
+    features: TriageFeatures
+    reason: str
+
+
+def _is_labelled(scan: SectionScan) -> bool:
+    """Whether the regex extractors would turn this section into a complete record"""
+    if scan.get('cargo_type') and scan.get('quantity_value'):
+        return classify_commodity(scan.get('cargo_type')).is_commodity
+    return bool(scan.get('vessel_name') and (scan.get('dwt_value') or scan.get('position_value')))
+
+
+def _is_record(scan: SectionScan) -> bool:
+    # Any section the regex extractors could read a record from counts, so skipping stays conservative
+    return bool(
+        not scan.features.isdisjoint(RECORD_FEATURES) or scan.get('vessel_name') or scan.get('cargo_type')
+    )
+
+
+def triage_features(subject: Optional[str], content: Optional[str]) -> TriageFeatures:
+    """Lightweight features from the section scans the regex extractors share"""
+    content = content or ''
+    records = [scan for scan in scan_sections(content) if _is_record(scan)]
+    return TriageFeatures(
+        records=len(records),
+        labelled_records=sum(1 for scan in records if _is_labelled(scan)),
+        ports=len(find_ports(content)),
+        auto_reply=bool(_AUTO_REPLY_SUBJECT.search(subject or '')),
+        away_notice=bool(_AWAY_NOTICE.search(content[:2000])),
+        bulk_mail=bool(_BULK_MAIL.search(content))
+    )
+
+
+class EmailTriage:
+    """
+    Cheap local decision on how an email should be extracted, made before
+    any LLM call: skip it, trust the field regexes, or send it to the model.
+    Auto-replies are skipped, as are away notices, newsletters and other
+    emails with no vessel or cargo sections and no port names. Short emails whose
+    records the regexes capture (at least `regex_coverage` of them) stay
+    local. Thresholds come from settings; `evaluate` and `sweep_coverage`
+    measure them against a labelled corpus.
+    """
+
+    def __init__(self, regex_coverage: Optional[float] = None, max_regex_records: Optional[int] = None):
+        self.regex_coverage = settings.TRIAGE_REGEX_COVERAGE if regex_coverage is None else regex_coverage
+        self.max_regex_records = settings.TRIAGE_MAX_REGEX_RECORDS if max_regex_records is None else max_regex_records
+
+    def classify(self, subject: Optional[str], content: Optional[str]) -> TriageDecision:
+        return self.decide(triage_features(subject, content))
+
+    def decide(self, features: TriageFeatures) -> TriageDecision:
+        if features.auto_reply:
+            # Anything quoted in an auto-reply was extracted from the original
+            return TriageDecision(Triage.NO_CONTENT, features, "auto-reply")
+        if not features.records:
+            if features.away_notice:
+                return TriageDecision(Triage.NO_CONTENT, features, "away notice")
+            if features.bulk_mail:
+                return TriageDecision(Triage.NO_CONTENT, features, "bulk mail")
+            if not features.ports:
+                return TriageDecision(Triage.NO_CONTENT, features, "no vessel, cargo or port mentions")
+            return TriageDecision(Triage.NEEDS_LLM, features, "ports named in free text")
+
+        if features.records <= self.max_regex_records and features.coverage >= self.regex_coverage:
+            return TriageDecision(
+                Triage.REGEX_SUFFICIENT, features,
+                f"{features.labelled_records}/{features.records} records labelled"
+            )
+        return TriageDecision(
+            Triage.NEEDS_LLM, features,
+            f"{features.labelled_records}/{features.records} records labelled"
+        )
+
+
+@dataclass
+class TriageReport:
+    """Confusion counts of predicted against expected labels"""
+    confusion: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.confusion.values())
+
+    @property
+    def accuracy(self) -> float:
+        correct = sum(count for (expected, predicted), count in self.confusion.items() if expected == predicted)
+        return correct / self.total if self.total else 0.0
+
+    @property
+    def llm_share(self) -> float:
+        """Share of emails that would still be sent to the LLM"""
+        sent = sum(count for (_, predicted), count in self.confusion.items() if predicted is Triage.NEEDS_LLM)
+        return sent / self.total if self.total else 0.0
+
+    @property
+    def missed(self) -> int:
+        """Emails that needed the LLM but would not get it; the costly error"""
+        return sum(
+            count for (expected, predicted), count in self.confusion.items()
+            if expected is Triage.NEEDS_LLM and predicted is not Triage.NEEDS_LLM
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "accuracy": round(self.accuracy, 3),
+            "llm_share": round(self.llm_share, 3),
+            "missed": self.missed,
+            "confusion": {
+                f"{expected.value}->{predicted.value}": count
+                for (expected, predicted), count in sorted(
+                    self.confusion.items(), key=lambda item: (item[0][0].value, item[0][1].value)
+                )
+            }
+        }
+
+
+Sample = Tuple[Optional[str], str, Triage]  # (subject, content, expected label)
+
+
+def evaluate(triage: EmailTriage, samples: Iterable[Sample]) -> TriageReport:
+    report = TriageReport()
+    for subject, content, expected in samples:
+        report.confusion[(expected, triage.classify(subject, content).label)] += 1
+    return report
+
+
+def sweep_coverage(samples: Sequence[Sample], thresholds: Iterable[float],
+                   max_regex_records: Optional[int] = None) -> List[Tuple[float, TriageReport]]:
+    """Reports for each coverage threshold; features are computed once per sample"""
+    features = [(triage_features(subject, content), expected) for subject, content, expected in samples]
+    results = []
+    for threshold in thresholds:
+        triage = EmailTriage(regex_coverage=threshold, max_regex_records=max_regex_records)
+        report = TriageReport()
+        for sample_features, expected in features:
+            report.confusion[(expected, triage.decide(sample_features).label)] += 1
+        results.append((threshold, report))
+    return results
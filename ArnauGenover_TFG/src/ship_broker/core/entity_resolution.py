@@ -0,0 +1,127 @@
+# src/ship_broker/core/entity_resolution.py
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import Cargo, Vessel
+
+# Relative DWT difference still considered the same ship (rounding, summer vs tropical)
+DWT_TOLERANCE = 0.03
+
+_VESSEL_PREFIX = re.compile(r'^(?:M\s*/?\s*V|M\s*/?\s*S|S\s*/?\s*S|MV|MS|SS)\b\.?\s*')
+_NON_WORD = re.compile(r'[^A-Z0-9]+')
+_IMO = re.compile(r'\bIMO\s*(?:NO\.?|NUMBER|NR\.?)?\s*[:#]?\s*(\d{7})\b', re.IGNORECASE)
+
+CargoKey = Tuple[str, Optional[int], str, str]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Vessel name without "MV"-style prefixes, punctuation or spacing differences"""
+    name = (name or '').upper().strip()
+    name = _VESSEL_PREFIX.sub('', name)
+    return _NON_WORD.sub(' ', name).strip()
+
+
+def _normalize_place(text: Optional[str]) -> str:
+    return _NON_WORD.sub(' ', (text or '').upper()).strip()
+
+
+def valid_imo(imo: Optional[str]) -> bool:
+    """IMO ship numbers carry a check digit: sum of digits 1-6 weighted 7..2, mod 10"""
+    if not imo or not re.fullmatch(r'\d{7}', imo):
+        return False
+    digits = [int(d) for d in imo]
+    return sum(d * w for d, w in zip(digits[:6], range(7, 1, -1))) % 10 == digits[6]
+
+
+def find_imo(text: Optional[str]) -> Optional[str]:
+    """First valid IMO number mentioned in a text"""
+    for match in _IMO.finditer(text or ''):
+        if valid_imo(match.group(1)):
+            return match.group(1)
+    return None
+
+
+def cargo_key(cargo_type: Optional[str], quantity: Optional[float],
+              load_port: Optional[str], discharge_port: Optional[str]) -> CargoKey:
+    """Identity of a cargo stem: type, quantity to the nearest thousand MT and route"""
+    bucket = int(round(quantity / 1000)) if quantity else None
+    return _normalize_place(cargo_type), bucket, _normalize_place(load_port), _normalize_place(discharge_port)
+
+
+def _same_dwt(a: Optional[float], b: Optional[float]) -> bool:
+    return bool(a and b) and abs(a - b) <= DWT_TOLERANCE * max(a, b)
+
+
+def _conflicting_imo(a: Optional[str], b: Optional[str]) -> bool:
+    return bool(a and b) and a != b
+
+
+class EntityIndex:
+    """
+    In-memory lookup of known vessels and cargoes, so repeat mentions in
+    new emails resolve to the existing row instead of creating another.
+    Vessels match by IMO number first, then by normalized name with a
+    compatible DWT. A name alone only matches when one known vessel has it,
+    and never a vessel with a different IMO number. Cargoes match by type,
+    quantity and route. Values are row IDs, or any other handle the caller
+    chooses.
+    """
+
+    def __init__(self):
+        self._vessels_by_imo: Dict[str, int] = {}
+        self._vessels_by_name: Dict[str, List[Tuple[int, Optional[float], Optional[str]]]] = {}
+        self._cargoes: Dict[CargoKey, int] = {}
+
+    @classmethod
+    def load(cls, db: Session) -> 'EntityIndex':
+        index = cls()
+        for vessel_id, name, imo, dwt in db.query(Vessel.id, Vessel.name, Vessel.imo, Vessel.dwt):
+            index.add_vessel(vessel_id, name, imo, dwt)
+        rows = db.query(
+            Cargo.id, Cargo.cargo_type, Cargo.quantity,
+            Cargo.load_port_id, Cargo.load_port, Cargo.discharge_port_id, Cargo.discharge_port
+        )
+        for cargo_id, cargo_type, quantity, load_id, load_port, discharge_id, discharge_port in rows:
+            # Resolved port IDs identify the route; free text only when the port is not in the gazetteer
+            index.add_cargo(cargo_id, cargo_key(cargo_type, quantity, load_id or load_port, discharge_id or discharge_port))
+        return index
+
+    def match_vessel(self, name: Optional[str], imo: Optional[str], dwt: Optional[float]) -> Optional[int]:
+        if imo and imo in self._vessels_by_imo:
+            return self._vessels_by_imo[imo]
+        entries = self._vessels_by_name.get(normalize_name(name), [])
+        candidates = [
+            (vessel_id, known_dwt) for vessel_id, known_dwt, known_imo in entries
+            if _same_dwt(dwt, known_dwt) and not _conflicting_imo(imo, known_imo)
+        ]
+        if candidates:
+            # Prefer the candidate with the closest DWT
+            return min(candidates, key=lambda c: abs(c[1] - dwt))[0]
+        # Common names recur across the fleet, so without a DWT to compare only a sole namesake matches
+        if len(entries) == 1:
+            vessel_id, known_dwt, known_imo = entries[0]
+            if not (dwt and known_dwt) and not _conflicting_imo(imo, known_imo):
+                return vessel_id
+        return None
+
+    def add_vessel(self, vessel_id: int, name: Optional[str], imo: Optional[str], dwt: Optional[float]):
+        if imo:
+            self._vessels_by_imo.setdefault(imo, vessel_id)
+        key = normalize_name(name)
+        if key:
+            entries = self._vessels_by_name.setdefault(key, [])
+            entries[:] = [entry for entry in entries if entry[0] != vessel_id]
+            entries.append((vessel_id, dwt, imo))
+
+    def match_cargo(self, key: CargoKey) -> Optional[int]:
+        return self._cargoes.get(key)
+
+    def add_cargo(self, cargo_id: int, key: CargoKey):
+        if key[0]:
+            self._cargoes.setdefault(key, cargo_id)
+
+    def __len__(self) -> int:
+        return len(self._cargoes) + sum(len(entries) for entries in self._vessels_by_name.values())
@@ -0,0 +1,76 @@
+# src/ship_broker/core/extraction_backend.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .date_normalizer import normalize_date
+from .extraction_metrics import ExtractionMetrics
+from ..config import get_settings
+
+settings = get_settings()
+
+BACKENDS = ('openai', 'regex', 'fake')
+
+
+class ExtractionBackend(ABC):
+    """
+    Where EmailParser sends the emails it cannot extract locally.
+    `extract_info` returns {'vessels': [...], 'cargoes': [...]} with dicts of
+    VesselData and CargoData fields; empty lists leave the email to the
+    field regexes. Backends must implement it, or fail to instantiate.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def extract_info(self, content: str) -> Dict:
+        """Vessel and cargo records of an email"""
+
+    def iter_records(self, content: str, metrics: Optional[ExtractionMetrics] = None,
+                     validate: Optional[Callable[[str, Dict], bool]] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        ('vessels' or 'cargoes', record) pairs; backends that stream yield
+        them as they arrive. `metrics` receives what the extraction cost;
+        `validate` tells whether a raw record would be kept, for backends
+        that check answers before using them.
+        """
+        result = self.extract_info(content)
+        for kind in ('vessels', 'cargoes'):
+            for record in result.get(kind, []):
+                yield kind, record
+
+    def standardize_date(self, date_str: Optional[str]) -> Optional[datetime]:
+        """Parse a date string the local grammar could not; here, the grammar is all there is"""
+        return normalize_date(date_str) if isinstance(date_str, str) else None
+
+
+class RegexBackend(ExtractionBackend):
+    """No model: every email is extracted by the field regexes, with no network or API key"""
+
+    name = "regex"
+
+    def extract_info(self, content: str) -> Dict:
+        return {'vessels': [], 'cargoes': []}
+
+
+def get_extraction_backend(name: Optional[str] = None) -> ExtractionBackend:
+    """
+    The backend named in settings (or `name`): "openai", "regex", or "fake",
+    which is the OpenAI backend pointed at the local stand-in server started
+    with `ship-broker fake-llm`, for offline load tests.
+    """
+    name = (name or settings.EXTRACTION_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extraction backend {name!r}, expected one of: {', '.join(BACKENDS)}")
+    if name == 'regex':
+        return RegexBackend()
+
+    # Imported here so regex-only processes never load the OpenAI SDK
+    from .llm_client import get_llm_client
+    from .openai_helper import OpenAIHelper
+
+    if name == 'fake':
+        # Its own model name keeps stand-in answers apart from real ones in the extraction cache
+        return OpenAIHelper(llm=get_llm_client(settings.FAKE_LLM_URL), model="fake-llm", name="fake")
+    return OpenAIHelper()
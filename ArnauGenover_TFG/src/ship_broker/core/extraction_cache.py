@@ -0,0 +1,150 @@
+# src/ship_broker/core/extraction_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_QUOTE_PREFIX = re.compile(r'^[ \t]*(?:>[ \t]*)+', re.MULTILINE)
+
+# Share of the size limit kept after an eviction, so evictions come in batches
+_EVICT_TO = 0.9
+
+
+def normalize_content(text: str) -> str:
+    """Email text without reply quoting or whitespace differences; a forward of the same body keys the same"""
+    return ' '.join(_QUOTE_PREFIX.sub('', text or '').split())
+
+
+def cache_key(content: str, prompt_version: int, model: str) -> str:
+    """Content address of one extraction: the normalized text, the prompt version and the model"""
+    digest = hashlib.sha256()
+    digest.update(f'{prompt_version}\0{model}\0'.encode('utf-8'))
+    digest.update(normalize_content(content).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of LLM extraction results, keyed by content address, so
+    reprocessing, retries and forwarded duplicates reuse an earlier answer
+    instead of paying for another completion. Entries are compressed JSON in
+    a small SQLite file of their own; once the file holds more than
+    `max_bytes` of entries, the least recently used are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_extractions_last_used ON extractions (last_used)")
+        self._bytes, self._entries = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM extractions"
+        ).fetchone()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The cached value, or None on a miss; a broken cache file only costs misses"""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value FROM extractions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE extractions SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+                    )
+                    value = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+                    self.hits += 1
+                    return value
+            except (sqlite3.Error, zlib.error, ValueError) as e:
+                logger.warning(f"Extraction cache read failed: {str(e)}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict):
+        blob = zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            try:
+                self._put(key, blob)
+            except sqlite3.Error as e:
+                logger.warning(f"Extraction cache write failed: {str(e)}")
+
+    def _put(self, key: str, blob: bytes):
+        now = time.time()
+        old = self._conn.execute("SELECT size FROM extractions WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, value, size, created_at, last_used, hits) "
+            "VALUES (?, ?, ?, ?, ?, 0)",
+            (key, blob, len(blob), now, now)
+        )
+        if old:
+            self._bytes -= old[0]
+        else:
+            self._entries += 1
+        self._bytes += len(blob)
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under its limit"""
+        target = int(self.max_bytes * _EVICT_TO)
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM extractions ORDER BY last_used").fetchall():
+            if self._bytes - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", doomed)
+        self._bytes -= freed
+        self._entries -= len(doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+            self._bytes = self._entries = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+@lru_cache()
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Process-wide cache shared by every OpenAIHelper; None when disabled"""
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return None
+    return ExtractionCache(settings.EXTRACTION_CACHE_PATH, settings.EXTRACTION_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,60 @@
+# src/ship_broker/core/extraction_metrics.py
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+# Which step produced an email's records
+PARSER_SKIPPED = "skipped"            # Triage found nothing to extract
+PARSER_TEMPLATE = "template"          # Learned sender layout
+PARSER_REGEX = "regex"                # Field regexes, without asking the LLM
+PARSER_LLM = "llm"
+PARSER_REGEX_FALLBACK = "regex_fallback"  # The LLM was asked but found nothing
+
+
+@dataclass
+class ExtractionMetrics:
+    """What extracting one email cost: LLM tokens and requests, cache use and wall time"""
+    parser: str = PARSER_REGEX
+    backend: Optional[str] = None
+    models: List[str] = field(default_factory=list)  # In order of first use
+    llm_requests: int = 0
+    llm_retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    escalations: int = 0
+    tokens_saved: int = 0  # Trimmed from the body before sending
+    seconds: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add_request(self, model: str, prompt_tokens: int, completion_tokens: int, retries: int = 0):
+        if model not in self.models:
+            self.models.append(model)
+        self.llm_requests += 1 + retries
+        self.llm_retries += retries
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def columns(self) -> Dict:
+        """Values for the matching ProcessedEmail columns"""
+        return {
+            'parser': self.parser,
+            'backend': self.backend,
+            'models': ','.join(self.models) or None,
+            'llm_requests': self.llm_requests,
+            'llm_retries': self.llm_retries,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'escalations': self.escalations,
+            'tokens_saved': self.tokens_saved,
+            'extraction_seconds': round(self.seconds, 4)
+        }
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), total_tokens=self.total_tokens)
@@ -0,0 +1,384 @@
+# src/ship_broker/core/fake_imap_server.py
+
+import random
+import re
+import select
+import socketserver
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email import policy
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid, parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# (raw RFC822 bytes with CRLF line ends, internal date as naive UTC)
+Message = Tuple[bytes, datetime]
+
+_SENDERS = ('desk@broker-one.com', 'chartering@broker-two.com', 'ops@owner-three.com', 'weekly@market-news.com')
+_PORTS = ('SINGAPORE', 'ROTTERDAM', 'SANTOS', 'HOUSTON', 'QINGDAO', 'RICHARDS BAY', 'NEW ORLEANS')
+_CARGOES = ('WHEAT', 'COAL', 'IRON ORE', 'SOYBEANS', 'CEMENT', 'UREA')
+# Attachment mix: (content type, filename suffix, whether the payload is text)
+_ATTACHMENTS = (('application/pdf', 'pdf', False), ('image/png', 'png', False), ('text/csv', 'csv', True))
+
+_SINCE = re.compile(r'SINCE\s+"?(\d{1,2}-[A-Za-z]{3}-\d{4})"?', re.IGNORECASE)
+_FETCH_ITEM = re.compile(
+    r'(BODY(?:\.PEEK)?)\[([^\]]*)\](?:<(\d+)(?:\.(\d+))?>)?|RFC822\.SIZE|RFC822\.HEADER|RFC822|INTERNALDATE|FLAGS|UID',
+    re.IGNORECASE
+)
+_HEADER_FIELDS = re.compile(r'HEADER\.FIELDS\s*\(([^)]*)\)', re.IGNORECASE)
+
+
+@dataclass
+class FakeIMAPConfig:
+    """The mailbox served and how the server behaves"""
+    messages: int = 200                 # Synthetic messages
+    body_bytes: int = 4000              # Approximate text per synthetic message
+    attachment_rate: float = 0.3        # Share of synthetic messages with one to three attachments
+    attachment_bytes: int = 200_000     # Mean attachment size before base64
+    days: int = 7                       # Synthetic messages are spread over this many days back
+    latency: float = 0.0                # Seconds before each command's response, i.e. one network round trip
+    bytes_per_second: int = 0           # Bandwidth cap on responses; 0 for none
+    mailbox: Optional[str] = None       # mbox, Maildir or .eml directory served instead of synthetic mail
+    seed: Optional[int] = None
+
+
+def synthetic_message(index: int, rng: random.Random, config: FakeIMAPConfig, received: datetime) -> bytes:
+    """A position or cargo circular padded to `body_bytes`, with attachments after the text"""
+    message = EmailMessage(policy=policy.SMTP)
+    message['From'] = rng.choice(_SENDERS)
+    message['To'] = 'chartering@ship-broker.example'
+    message['Subject'] = f"Positions and cargoes {index}"
+    message['Date'] = format_datetime(received.replace(tzinfo=timezone.utc))
+    message['Message-ID'] = make_msgid(f"fake{index}", domain="fake-imap.local")
+
+    sections = ["PLS PROPOSE SUITABLE CARGOES"]
+    size = len(sections[0])
+    while size < config.body_bytes:
+        if rng.random() < 0.5:
+            section = (
+                f"MV OCEAN {rng.randint(1, 999)}\nDWT: {rng.randint(20, 90) * 1000}\n"
+                f"OPEN AT {rng.choice(_PORTS)} {rng.randint(1, 20)}-{rng.randint(21, 28)} "
+                f"{received.strftime('%b').upper()}"
+            )
+        else:
+            section = (
+                f"CARGO: {rng.choice(_CARGOES)}\nQUANTITY: {rng.randint(10, 80) * 1000} MT\n"
+                f"LOAD PORT: {rng.choice(_PORTS)}\nDISCHARGE PORT: {rng.choice(_PORTS)}\n"
+                f"LAYCAN {rng.randint(1, 14)}-{rng.randint(15, 28)} {received.strftime('%b').upper()}"
+            )
+        sections.append(section)
+        size += len(section) + 2
+    message.set_content("\n\n".join(sections))
+
+    if rng.random() < config.attachment_rate:
+        for number in range(rng.randint(1, 3)):
+            content_type, suffix, is_text = rng.choice(_ATTACHMENTS)
+            length = max(1, int(config.attachment_bytes * rng.uniform(0.5, 1.5)))
+            maintype, subtype = content_type.split('/')
+            filename = f"attachment{number}.{suffix}"
+            if is_text:
+                rows = "\n".join(f"{i},{rng.choice(_CARGOES)},{rng.randint(1, 99999)}" for i in range(length // 20))
+                message.add_attachment(rows, subtype=subtype, filename=filename)
+            else:
+                message.add_attachment(rng.randbytes(length), maintype=maintype, subtype=subtype, filename=filename)
+    return message.as_bytes()
+
+
+def synthetic_mailbox(config: FakeIMAPConfig, now: Optional[datetime] = None) -> List[Message]:
+    """`config.messages` circulars, oldest first, spread over the last `config.days` days"""
+    rng = random.Random(config.seed)
+    now = now or datetime.utcnow()
+    span = config.days * 86400
+    received = sorted(now - timedelta(seconds=rng.uniform(0, span)) for _ in range(config.messages))
+    return [(synthetic_message(i, rng, config, date), date) for i, date in enumerate(received, 1)]
+
+
+def load_mailbox(path: str) -> List[Message]:
+    """Fixture messages from an mbox, Maildir or .eml directory, dated by their Date header"""
+    # Imported here so synthetic mailboxes never need the ingestion stack
+    from .bulk_ingest import iter_raw_messages
+
+    messages = []
+    for raw in iter_raw_messages(path):
+        raw = re.sub(rb'\r?\n', b'\r\n', raw)
+        match = re.search(rb'^Date:[ \t]*(.+?)\r$', raw.split(b'\r\n\r\n', 1)[0], re.MULTILINE | re.IGNORECASE)
+        try:
+            received = parsedate_to_datetime(match.group(1).decode('ascii', 'replace'))
+            received = received.astimezone(timezone.utc).replace(tzinfo=None) if received.tzinfo else received
+        except (AttributeError, TypeError, ValueError):
+            received = datetime.utcnow()
+        messages.append((raw, received))
+    return sorted(messages, key=lambda message: message[1])
+
+
+def _split_message(raw: bytes) -> Tuple[bytes, bytes]:
+    """(header including the blank line, body)"""
+    end = raw.find(b'\r\n\r\n')
+    if end < 0:
+        return raw, b''
+    return raw[:end + 4], raw[end + 4:]
+
+
+def _header_fields(header: bytes, names: List[str], exclude: bool = False) -> bytes:
+    wanted = {name.upper() for name in names}
+    kept: List[bytes] = []
+    keep = False
+    for line in header.split(b'\r\n'):
+        if not line:
+            continue
+        if line[:1] in (b' ', b'\t'):
+            if keep:
+                kept.append(line)
+            continue
+        name = line.split(b':', 1)[0].strip().decode('ascii', 'replace').upper()
+        keep = (name in wanted) != exclude
+        if keep:
+            kept.append(line)
+    return b'\r\n'.join(kept) + b'\r\n\r\n' if kept else b'\r\n'
+
+
+def _message_set(spec: str, count: int) -> List[int]:
+    numbers: List[int] = []
+    for part in spec.split(','):
+        first, _, last = part.partition(':')
+        start = count if first == '*' else int(first)
+        end = start if not last else (count if last == '*' else int(last))
+        if start > end:
+            start, end = end, start
+        numbers.extend(n for n in range(start, end + 1) if 1 <= n <= count)
+    return numbers
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One IMAP session; enough of IMAP4rev1 for the fetch path and IDLE"""
+
+    # Responses go out in several writes; without this, delayed ACKs would dominate the timings
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.server.count('connections')
+        self._send(b'* OK [CAPABILITY IMAP4rev1 IDLE] Fake IMAP ready\r\n')
+        while True:
+            line = self._readline()
+            if not line:
+                return
+            tag, _, rest = line.decode('utf-8', 'replace').strip().partition(' ')
+            command, _, args = rest.partition(' ')
+            command = command.upper()
+            self.server.count('commands', command=command)
+            if self.server.config.latency:
+                time.sleep(self.server.config.latency)
+
+            handler = getattr(self, f"_{command.lower()}", None)
+            if handler is None:
+                self._send(f"{tag} BAD Unsupported command {command}\r\n".encode())
+                continue
+            if handler(tag, args) is False:
+                return
+
+    def _capability(self, tag: str, args: str):
+        self._send(f"* CAPABILITY IMAP4rev1 IDLE\r\n{tag} OK CAPABILITY completed\r\n".encode())
+
+    def _noop(self, tag: str, args: str):
+        self._send(f"{tag} OK NOOP completed\r\n".encode())
+
+    def _login(self, tag: str, args: str):
+        self._send(f"{tag} OK LOGIN completed\r\n".encode())
+
+    def _select(self, tag: str, args: str):
+        count = len(self.server.messages)
+        self._send((
+            f"* FLAGS (\\Seen)\r\n* {count} EXISTS\r\n* 0 RECENT\r\n* OK [UIDVALIDITY 1] UIDs valid\r\n"
+            f"{tag} OK [READ-WRITE] SELECT completed\r\n"
+        ).encode())
+
+    _examine = _select
+
+    def _search(self, tag: str, args: str):
+        match = _SINCE.search(args)
+        since = datetime.strptime(match.group(1).title(), '%d-%b-%Y').date() if match else None
+        numbers = [
+            str(n) for n, (_, received) in enumerate(self.server.messages, 1)
+            if since is None or received.date() >= since
+        ]
+        self._send(f"* SEARCH {' '.join(numbers)}\r\n{tag} OK SEARCH completed\r\n".encode())
+
+    def _fetch(self, tag: str, args: str):
+        spec, _, items = args.partition(' ')
+        messages = self.server.messages
+        for number in _message_set(spec, len(messages)):
+            raw, received = messages[number - 1]
+            self._send(b'* ' + str(number).encode() + b' FETCH (' + self._fetch_items(raw, received, number, items) + b')\r\n')
+            self.server.count('messages_fetched')
+        self._send(f"{tag} OK FETCH completed\r\n".encode())
+
+    def _fetch_items(self, raw: bytes, received: datetime, number: int, items: str) -> bytes:
+        parts: List[bytes] = []
+        header, body = _split_message(raw)
+        for match in _FETCH_ITEM.finditer(items):
+            item = match.group(0).upper()
+            if item == 'RFC822.SIZE':
+                parts.append(f"RFC822.SIZE {len(raw)}".encode())
+            elif item == 'INTERNALDATE':
+                parts.append(f'INTERNALDATE "{received.strftime("%d-%b-%Y %H:%M:%S")} +0000"'.encode())
+            elif item == 'FLAGS':
+                parts.append(b'FLAGS ()')
+            elif item == 'UID':
+                parts.append(f"UID {number}".encode())
+            elif item in ('RFC822', 'RFC822.HEADER'):
+                data = raw if item == 'RFC822' else header
+                parts.append(item.encode() + b' {' + str(len(data)).encode() + b'}\r\n' + data)
+            else:
+                section = match.group(2).upper()
+                fields = _HEADER_FIELDS.search(section)
+                if fields:
+                    data = _header_fields(header, fields.group(1).split(), exclude='.NOT' in section)
+                elif section == 'HEADER':
+                    data = header
+                elif section == 'TEXT':
+                    data = body
+                else:
+                    data = raw
+                name = f"BODY[{match.group(2)}]"
+                if match.group(3) is not None:
+                    offset = int(match.group(3))
+                    data = data[offset:offset + int(match.group(4))] if match.group(4) else data[offset:]
+                    name += f"<{offset}>"
+                parts.append(name.encode() + b' {' + str(len(data)).encode() + b'}\r\n' + data)
+        return b' '.join(parts)
+
+    def _idle(self, tag: str, args: str):
+        """Announce mailbox changes made while idling, until the client sends DONE"""
+        known, _ = self.server.updates_since(None)
+        self._send(b'+ idling\r\n')
+        while True:
+            ready, _, _ = select.select([self.connection], [], [], 0.1)
+            if ready:
+                line = self._readline()
+                if not line or line.strip().upper() == b'DONE':
+                    break
+            known, updates = self.server.updates_since(known)
+            if updates:
+                # Changes made together reach the client in one packet, as real servers send them
+                self._send(updates)
+        self._send(f"{tag} OK IDLE terminated\r\n".encode())
+
+    def _close(self, tag: str, args: str):
+        self._send(f"{tag} OK CLOSE completed\r\n".encode())
+
+    def _logout(self, tag: str, args: str):
+        self._send(f"* BYE Fake IMAP logging out\r\n{tag} OK LOGOUT completed\r\n".encode())
+        return False
+
+    def _readline(self) -> bytes:
+        try:
+            line = self.rfile.readline()
+        except (ConnectionResetError, OSError):
+            return b''
+        self.server.count('bytes_received', len(line))
+        return line
+
+    def _send(self, data: bytes):
+        self.wfile.write(data)
+        self.wfile.flush()
+        self.server.count('bytes_sent', len(data))
+        if self.server.config.bytes_per_second:
+            time.sleep(len(data) / self.server.config.bytes_per_second)
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    """
+    Local IMAP server over plain TCP, for benchmarks of mailbox sync
+    without a real account. It serves a synthetic mailbox of position and
+    cargo circulars with a configurable size and attachment mix, or a
+    fixture mailbox, and supports the commands the fetch path and IDLE
+    listener use: LOGIN, SELECT, SEARCH SINCE, FETCH with header fields,
+    sizes and partial bodies, and IDLE, which announces `deliver` and
+    `expunge` calls. A per-command latency and a
+    bandwidth cap stand in for the network; `stats` counts round trips and
+    bytes transferred. Connect with IMAP_SERVER/IMAP_PORT and
+    IMAP_SSL=false, or run it with `ship-broker fake-imap`.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    block_on_close = False
+
+    def __init__(self, config: Optional[FakeIMAPConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeIMAPConfig()
+        self.messages: List[Message] = (
+            load_mailbox(self.config.mailbox) if self.config.mailbox else synthetic_mailbox(self.config)
+        )
+        self.counts: Counter = Counter()
+        self._updates: List[bytes] = []  # Untagged responses announced to idling clients
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    @property
+    def mailbox_bytes(self) -> int:
+        return sum(len(raw) for raw, _ in self.messages)
+
+    def deliver(self, raw: bytes, received: Optional[datetime] = None):
+        """Add a message, announced to idling clients"""
+        with self._lock:
+            self.messages.append((re.sub(rb'\r?\n', b'\r\n', raw), received or datetime.utcnow()))
+            self._updates.append(f"* {len(self.messages)} EXISTS\r\n".encode())
+
+    def expunge(self, number: int):
+        """Remove message `number` (1-based), announced to idling clients"""
+        with self._lock:
+            del self.messages[number - 1]
+            self._updates.append(f"* {number} EXPUNGE\r\n".encode())
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Idling clients receive the changes made inside the block in a single write"""
+        with self._lock:
+            yield
+
+    def updates_since(self, known: Optional[int]) -> Tuple[int, bytes]:
+        """Untagged updates after the first `known`, and the new count; None to only get the count"""
+        with self._lock:
+            count = len(self._updates)
+            return count, b''.join(self._updates[known:]) if known is not None else b''
+
+    def count(self, name: str, amount: int = 1, command: Optional[str] = None):
+        with self._lock:
+            self.counts[name] += amount
+            if command:
+                self.counts[f"command_{command.lower()}"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts.clear()
+
+    def start(self) -> 'FakeIMAPServer':
+        """Serve from a background thread, for tests and benchmarks in the same process"""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-imap", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'FakeIMAPServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
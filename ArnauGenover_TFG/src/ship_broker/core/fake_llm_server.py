@@ -0,0 +1,287 @@
+# src/ship_broker/core/fake_llm_server.py
+
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .body_trimmer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+EMPTY_EXTRACTION = '{"vessels": [], "cargoes": []}'
+
+
+@dataclass
+class FakeLLMConfig:
+    """How the stand-in server behaves; the rates are per request, between 0 and 1"""
+    latency: float = 0.5                # Seconds before an answer
+    jitter: float = 0.0                 # Uniform extra seconds on top of `latency`
+    error_rate: float = 0.0             # Answer 500
+    rate_limit_rate: float = 0.0        # Answer 429 with retry-after
+    timeout_rate: float = 0.0           # Hang for `hang_seconds`, past the client's timeout, then drop the connection
+    truncate_rate: float = 0.0          # Streamed answers cut off halfway
+    requests_per_minute: int = 0        # Quota enforced with 429s and x-ratelimit headers; 0 for none
+    retry_after: float = 1.0
+    hang_seconds: float = 120.0
+    chunk_chars: int = 16               # Answer text per streamed chunk
+    chunk_delay: float = 0.0            # Seconds between streamed chunks
+    # (text in the user message, answer) pairs, tried in order
+    responses: List[Tuple[str, str]] = field(default_factory=list)
+    default_response: str = EMPTY_EXTRACTION
+    seed: Optional[int] = None
+
+    @classmethod
+    def load_responses(cls, path: str) -> List[Tuple[str, str]]:
+        """Canned answers from a JSON list of {"match": ..., "response": ...}; objects are sent as JSON"""
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+        return [
+            (entry.get('match', ''),
+             entry['response'] if isinstance(entry['response'], str) else json.dumps(entry['response']))
+            for entry in entries
+        ]
+
+
+def _usage(messages: List[Dict], content: str) -> Dict:
+    prompt_tokens = sum(estimate_tokens(m.get('content') or '') for m in messages)
+    completion_tokens = estimate_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: 'FakeLLMServer'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f"fake-llm {self.address_string()} {format % args}")
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, _error("Not found", "invalid_request_error"))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, _error("Request body is not JSON", "invalid_request_error"))
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, _error(f"Unknown path {self.path}", "invalid_request_error"))
+            return
+
+        fault, wait, headers = self.server.admit()
+        if fault == 'rate_limit':
+            self._send_json(429, _error("Rate limit reached", "rate_limit_exceeded"), headers)
+        elif fault == 'error':
+            time.sleep(wait)
+            self._send_json(500, _error("The server had an error while processing your request", "server_error"))
+        elif fault == 'timeout':
+            time.sleep(wait)
+            self.close_connection = True
+        elif body.get('stream'):
+            time.sleep(wait)
+            self._send_stream(body, headers, truncate=fault == 'truncate')
+        else:
+            time.sleep(wait)
+            self._send_json(200, self.server.completion(body), headers)
+
+    def _send_stream(self, request: Dict, headers: Dict[str, str], truncate: bool):
+        """Server-sent events as the API streams them; the end of the body ends the stream"""
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            chunks = self.server.completion_chunks(request)
+            if truncate:
+                chunks = chunks[:len(chunks) // 2]
+            for chunk in chunks:
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                if self.server.config.chunk_delay:
+                    time.sleep(self.server.config.chunk_delay)
+            if not truncate:
+                self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up first, as a timing-out client does
+            self.close_connection = True
+
+
+def _error(message: str, code: str) -> Dict:
+    return {"error": {"message": message, "type": code, "param": None, "code": code}}
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the chat completions API, for load tests of the
+    ingestion pipeline without network or cost. It answers with canned
+    responses, whole or streamed, after a configurable latency, and injects
+    500s, 429 storms, hung requests, streams cut off halfway and a
+    per-minute quota with OpenAI's rate-limit headers, so retries, backoff
+    and throttling can be reproduced. Point the
+    OpenAI SDK at `url`, or run it with `ship-broker fake-llm`.
+    """
+
+    daemon_threads = True
+    # Hung requests must not hold up shutdown
+    block_on_close = False
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeLLMConfig()
+        self.counts = {"requests": 0, "completions": 0, "errors": 0, "rate_limited": 0, "timeouts": 0, "truncated": 0}
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def admit(self) -> Tuple[Optional[str], float, Dict[str, str]]:
+        """The fault to inject for a request, if any, how long to wait first, and the response headers"""
+        config = self.config
+        with self._lock:
+            self.counts["requests"] += 1
+            headers: Dict[str, str] = {}
+            if config.requests_per_minute:
+                now = time.monotonic()
+                if now - self._window_start >= 60:
+                    self._window_start, self._window_requests = now, 0
+                reset = max(0.0, 60 - (now - self._window_start))
+                if self._window_requests >= config.requests_per_minute:
+                    self.counts["rate_limited"] += 1
+                    return 'rate_limit', 0.0, {
+                        'retry-after': f'{reset:.3f}',
+                        'x-ratelimit-remaining-requests': '0',
+                        'x-ratelimit-reset-requests': f'{reset:.3f}s'
+                    }
+                self._window_requests += 1
+                headers = {
+                    'x-ratelimit-limit-requests': str(config.requests_per_minute),
+                    'x-ratelimit-remaining-requests': str(config.requests_per_minute - self._window_requests),
+                    'x-ratelimit-reset-requests': f'{reset:.3f}s'
+                }
+
+            roll = self._random.random()
+            wait = config.latency + self._random.uniform(0, config.jitter)
+            if roll < config.rate_limit_rate:
+                self.counts["rate_limited"] += 1
+                return 'rate_limit', 0.0, {'retry-after': f'{config.retry_after:g}'}
+            roll -= config.rate_limit_rate
+            if roll < config.error_rate:
+                self.counts["errors"] += 1
+                return 'error', wait, {}
+            roll -= config.error_rate
+            if roll < config.timeout_rate:
+                self.counts["timeouts"] += 1
+                return 'timeout', config.hang_seconds, {}
+            roll -= config.timeout_rate
+            if roll < config.truncate_rate:
+                self.counts["truncated"] += 1
+                return 'truncate', wait, headers
+            self.counts["completions"] += 1
+            return None, wait, headers
+
+    def answer(self, messages: List[Dict]) -> str:
+        user = next((m.get('content') or '' for m in reversed(messages) if m.get('role') == 'user'), '')
+        for match, response in self.config.responses:
+            if match in user:
+                return response
+        return self.config.default_response
+
+    def completion(self, request: Dict) -> Dict:
+        messages = request.get('messages') or []
+        content = self.answer(messages)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get('model', 'fake-llm'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": _usage(messages, content)
+        }
+
+    def completion_chunks(self, request: Dict) -> List[Dict]:
+        """
+        The answer as chat.completion.chunk objects of `chunk_chars`
+        characters each, followed by a usage chunk when the request's
+        stream_options ask for one.
+        """
+        messages = request.get('messages') or []
+        content = self.answer(messages)
+        size = max(1, self.config.chunk_chars)
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get('model', 'fake-llm')
+        }
+        chunks = [dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])]
+        for start in range(0, len(content), size):
+            chunks.append(dict(base, choices=[{
+                "index": 0, "delta": {"content": content[start:start + size]}, "finish_reason": None
+            }]))
+        chunks.append(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (request.get('stream_options') or {}).get('include_usage'):
+            chunks.append(dict(base, choices=[], usage=_usage(messages, content)))
+        return chunks
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def start(self) -> 'FakeLLMServer':
+        """Serve from a background thread, for tests and benchmarks in the same process"""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'FakeLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,195 @@
+# src/ship_broker/core/imap_idle.py
+
+import asyncio
+import imaplib
+import logging
+import select
+import ssl
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# RFC 2177 asks clients to re-issue IDLE at least every 29 minutes
+IDLE_RENEW_SECONDS = 29 * 60
+MAX_RECONNECT_DELAY = 300
+
+
+def open_imap(server: str, port: Optional[int] = None, use_ssl: bool = True) -> imaplib.IMAP4:
+    """IMAP over TLS, or plain TCP for local servers such as `ship-broker fake-imap`"""
+    if use_ssl:
+        return imaplib.IMAP4_SSL(server, port or imaplib.IMAP4_SSL_PORT)
+    return imaplib.IMAP4(server, port or imaplib.IMAP4_PORT)
+
+
+class ImapIdleListener:
+    """
+    Keep an IMAP connection open in IDLE and call `on_new_mail` as soon as
+    the server announces new messages. Every (re)connect triggers one resync
+    run so nothing that arrived while disconnected is missed. Servers without
+    the IDLE capability fall back to polling every `poll_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        email_address: str,
+        password: str,
+        imap_server: str,
+        on_new_mail: Callable[[], Awaitable[None]],
+        poll_interval: int = 300,
+        idle_timeout: int = IDLE_RENEW_SECONDS,
+        mailbox: str = "INBOX",
+        imap_port: Optional[int] = None,
+        imap_ssl: Optional[bool] = None
+    ):
+        self.email_address = email_address
+        self.password = password
+        self.imap_server = imap_server
+        self.imap_port = imap_port or settings.IMAP_PORT or None
+        self.imap_ssl = settings.IMAP_SSL if imap_ssl is None else imap_ssl
+        self.on_new_mail = on_new_mail
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.mailbox = mailbox
+        # Read from the worker thread that blocks in IDLE
+        self._stopping = threading.Event()
+
+    async def run(self):
+        """Listen for new mail until stop() is called"""
+        self._stopping.clear()
+        delay = 1
+
+        while not self._stopping.is_set():
+            try:
+                mail = await asyncio.to_thread(self._connect)
+            except Exception as e:
+                logger.error(f"IMAP connection failed, retrying in {delay}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+
+            delay = 1
+            try:
+                # Resync anything that arrived while we were not listening
+                await self._notify()
+
+                if not self._supports_idle(mail):
+                    logger.warning(f"{self.imap_server} does not support IDLE, falling back to polling")
+                    await asyncio.to_thread(self._logout, mail)
+                    mail = None
+                    await self._poll()
+                    return
+
+                logger.info(f"Listening for new mail on {self.imap_server} with IDLE")
+                while not self._stopping.is_set():
+                    has_mail = await asyncio.to_thread(self._idle_once, mail)
+                    if has_mail:
+                        await self._notify()
+            except Exception as e:
+                logger.error(f"IMAP IDLE connection lost: {str(e)}")
+                await asyncio.sleep(delay)
+            finally:
+                if mail is not None:
+                    await asyncio.to_thread(self._logout, mail)
+
+    async def stop(self):
+        """Stop listening; the IDLE loop exits within about a second"""
+        self._stopping.set()
+
+    async def _notify(self):
+        try:
+            await self.on_new_mail()
+        except Exception as e:
+            logger.error(f"Error handling new mail: {str(e)}")
+
+    async def _poll(self):
+        while not self._stopping.is_set():
+            await asyncio.sleep(self.poll_interval)
+            if not self._stopping.is_set():
+                await self._notify()
+
+    def _connect(self) -> imaplib.IMAP4:
+        logger.info(f"Connecting to {self.imap_server} for IDLE")
+        mail = open_imap(self.imap_server, self.imap_port, self.imap_ssl)
+        mail.login(self.email_address, self.password)
+        mail.select(self.mailbox, readonly=True)
+        return mail
+
+    def _supports_idle(self, mail: imaplib.IMAP4) -> bool:
+        return 'IDLE' in mail.capabilities
+
+    def _idle_once(self, mail: imaplib.IMAP4) -> bool:
+        """
+        Run one IDLE cycle. Returns True when the server reported new
+        messages, False when the cycle ended because of renewal or stop().
+        """
+        tag = mail._new_tag()
+        mail.send(tag + b' IDLE\r\n')
+
+        has_mail = False
+        # Untagged updates queued since the last command can precede the continuation
+        while True:
+            line = self._readline(mail)
+            if line.startswith(b'+'):
+                break
+            if line.startswith(tag):
+                raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+            has_mail = has_mail or self._is_new_mail(line)
+
+        deadline = time.monotonic() + self.idle_timeout
+        while not has_mail and not self._stopping.is_set() and time.monotonic() < deadline:
+            if not self._has_pending_data(mail, timeout=1.0):
+                continue
+            has_mail = self._is_new_mail(self._readline(mail))
+
+        mail.send(b'DONE\r\n')
+        while True:
+            line = self._readline(mail)
+            if line.startswith(tag):
+                break
+            has_mail = has_mail or self._is_new_mail(line)
+
+        return has_mail
+
+    def _has_pending_data(self, mail: imaplib.IMAP4, timeout: float) -> bool:
+        # Lines already read into imaplib's buffer, or decrypted by the SSL layer, never show up in select()
+        if self._has_buffered_data(mail):
+            return True
+        if hasattr(mail.sock, 'pending') and mail.sock.pending():
+            return True
+        ready, _, _ = select.select([mail.sock], [], [], timeout)
+        return bool(ready)
+
+    def _has_buffered_data(self, mail: imaplib.IMAP4) -> bool:
+        # peek() returns the buffer without reading when it is not empty; with the
+        # socket non-blocking, an empty buffer and no data on the wire returns nothing
+        timeout = mail.sock.gettimeout()
+        mail.sock.settimeout(0)
+        try:
+            return bool(mail.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            mail.sock.settimeout(timeout)
+
+    def _readline(self, mail: imaplib.IMAP4) -> bytes:
+        line = mail.readline()
+        if not line:
+            raise ConnectionError("IMAP server closed the connection")
+        return line
+
+    def _is_new_mail(self, line: bytes) -> bool:
+        line = line.rstrip().upper()
+        return line.startswith(b'*') and (line.endswith(b' EXISTS') or line.endswith(b' RECENT'))
+
+    def _logout(self, mail: Optional[imaplib.IMAP4]):
+        if mail is None:
+            return
+        try:
+            mail.logout()
+        except Exception as e:
+            logger.debug(f"Error closing IMAP connection: {str(e)}")
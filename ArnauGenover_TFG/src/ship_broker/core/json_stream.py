@@ -0,0 +1,92 @@
+# src/ship_broker/core/json_stream.py
+
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+class RecordStream:
+    """
+    Incremental parser for a streamed JSON answer of the form
+    {"vessels": [{...}, ...], "cargoes": [{...}, ...]}. Fed the completion
+    text as it arrives, it returns each object of the watched top-level
+    arrays as soon as its closing brace is seen. An object that is not valid
+    JSON is skipped on its own, and a truncated answer keeps every object
+    completed before the break.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = frozenset(keys)
+        self.records = 0
+        self.skipped = 0
+        # Brackets of the containers open at the current position
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # Strings directly in the top-level object; the last one before an array is its key
+        self._string: List[str] = []
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        # Text of the array element being read, when it belongs to a watched key
+        self._element: Optional[List[str]] = None
+        self._closed = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level object was closed, i.e. the answer was not cut off"""
+        return self._closed
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """(key, object) pairs completed by this piece of text"""
+        found: List[Tuple[str, Any]] = []
+        for char in text:
+            if self._element is not None:
+                self._element.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = ''.join(self._string)
+                    continue
+                if len(self._stack) == 1:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char in '{[':
+                self._stack.append(char)
+                if len(self._stack) == 2 and char == '[' and self._stack[0] == '{':
+                    self._key = self._last_string
+                elif len(self._stack) == 3 and char == '{' and self._stack[1] == '[' and self._key in self.keys:
+                    self._element = [char]
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if self._element is not None and len(self._stack) == 2:
+                    record = self._finish_element()
+                    if record is not None:
+                        found.append((self._key, record))
+                elif len(self._stack) == 1:
+                    self._key = None
+                elif not self._stack:
+                    self._closed = True
+        return found
+
+    def _finish_element(self) -> Optional[Any]:
+        text = ''.join(self._element)
+        self._element = None
+        try:
+            record = json.loads(text)
+        except ValueError:
+            self.skipped += 1
+            return None
+        if not isinstance(record, dict):
+            self.skipped += 1
+            return None
+        self.records += 1
+        return record
@@ -0,0 +1,281 @@
+# src/ship_broker/core/llm_client.py
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Dict, Mapping, Optional, TypeVar
+
+from openai import (
+    APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+)
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar('T')
+
+# Transient failures worth another attempt; other API errors (bad request, auth) are not
+RETRYABLE_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate-limit reset header: "1s", "6m0s", "250ms" or plain seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds the server asked us to wait, from retry-after-ms or retry-after"""
+    if not headers:
+        return None
+    millis = headers.get('retry-after-ms')
+    if millis:
+        try:
+            return float(millis) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _count_usage(tally: Optional[Counter], usage: Any):
+    if tally is not None and usage is not None:
+        tally['prompt_tokens'] += usage.prompt_tokens or 0
+        tally['completion_tokens'] += usage.completion_tokens or 0
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff, so retrying callers do not stampede together"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMClient:
+    """
+    The process-wide OpenAI client. One AsyncOpenAI instance (and so one
+    HTTP connection pool) lives on a dedicated event loop thread; callers on
+    any thread or event loop submit work to it, so completions never block
+    the API's event loop. A semaphore caps requests in flight, transient
+    failures are retried with jittered exponential backoff, and when the
+    rate-limit headers say the quota is spent, new requests wait for the
+    reset instead of collecting 429s.
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int, timeout: float, max_retries: int,
+                 backoff_base: float, backoff_max: float, base_url: Optional[str] = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        # Monotonic time before which no request is sent, set from rate-limit headers
+        self._resume_at = 0.0
+
+        # Retries are ours, so backoff and rate-limit pauses are shared across callers
+        self._client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        self._semaphore = self.run(self._make_semaphore(max(1, max_concurrency)))
+
+    @staticmethod
+    async def _make_semaphore(limit: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(limit)
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the client's loop and wait for it; for worker threads"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("LLMClient.run() called from the client's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(self, coro: Awaitable[T]) -> Future:
+        """Start a coroutine on the client's loop without waiting for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def arun(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the client's loop without blocking the caller's loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def create(self, **kwargs) -> Any:
+        """Blocking chat completion"""
+        return self.run(self.complete(**kwargs))
+
+    async def acreate(self, **kwargs) -> Any:
+        """Chat completion awaitable from any event loop"""
+        return await self.arun(self.complete(**kwargs))
+
+    async def complete(self, timeout: Optional[float] = None, tally: Optional[Counter] = None, **kwargs) -> Any:
+        """
+        Chat completion with limits and retries; must run on the client's
+        loop. `tally`, when given, counts this call's retries and tokens.
+        """
+        async with self._request(timeout, kwargs, tally) as raw:
+            response = raw.parse()
+            _count_usage(tally, getattr(response, 'usage', None))
+            return response
+
+    async def stream(self, timeout: Optional[float] = None, tally: Optional[Counter] = None,
+                     **kwargs) -> AsyncIterator[str]:
+        """
+        Text of a streamed chat completion as it arrives; must run on the
+        client's loop. Opening the stream is retried like `complete`; a
+        stream that breaks off raises to the caller, who keeps what it read.
+        """
+        kwargs = dict(kwargs, stream=True, stream_options={"include_usage": True})
+        async with self._request(timeout, kwargs, tally) as raw:
+            try:
+                async for chunk in raw.parse():
+                    # The last chunk carries the usage and no choices
+                    _count_usage(tally, getattr(chunk, 'usage', None))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception:
+                self.failures += 1
+                raise
+
+    @asynccontextmanager
+    async def _request(self, timeout: Optional[float], kwargs: Dict,
+                       tally: Optional[Counter] = None) -> AsyncIterator[Any]:
+        """The raw response, holding a concurrency slot until the caller is done reading it"""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                # Checked once a slot is free, so requests queued behind a 429 also wait
+                await self._wait_for_quota()
+                self.requests += 1
+                try:
+                    raw = await self._client.chat.completions.with_raw_response.create(
+                        timeout=timeout or self.timeout, **kwargs
+                    )
+                except RETRYABLE_ERRORS as e:
+                    headers = e.response.headers if isinstance(e, APIStatusError) else None
+                    if attempt == self.max_retries:
+                        self.failures += 1
+                        raise
+                    delay = self._retry_delay(e, headers, attempt)
+                    logger.warning(
+                        f"LLM request failed ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} "
+                        f"in {delay:.1f}s"
+                    )
+                except APIStatusError:
+                    self.failures += 1
+                    raise
+                else:
+                    self._observe_quota(raw.headers)
+                    yield raw
+                    return
+            self.retries += 1
+            if tally is not None:
+                tally['retries'] += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, headers: Optional[Mapping[str, str]], attempt: int) -> float:
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+        requested = retry_after(headers)
+        if requested is not None:
+            # The server's wait, plus a little jitter so waiting callers spread out
+            delay = requested + random.uniform(0, self.backoff_base)
+        if isinstance(error, RateLimitError):
+            self._pause(delay)
+        return delay
+
+    def _observe_quota(self, headers: Mapping[str, str]):
+        """Hold back new requests until the reset when a quota window is used up"""
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            if remaining is not None and remaining.strip() == '0':
+                reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if reset:
+                    self._pause(reset)
+
+    def _pause(self, seconds: float):
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def _wait_for_quota(self):
+        wait = self._resume_at - time.monotonic()
+        if wait > 0:
+            self.throttled += 1
+        # The pause can be extended by other requests while this one waits
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._resume_at - time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures
+        }
+
+    def close(self):
+        try:
+            self.run(self._client.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+_clients: Dict[Optional[str], LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(base_url: Optional[str] = None) -> LLMClient:
+    """
+    The client for an API endpoint, shared by every OpenAIHelper using it, so
+    the concurrency limit and quota are process-wide. None is the configured
+    OpenAI endpoint.
+    """
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = LLMClient(
+                # Stand-in servers accept any key, but the SDK refuses an empty one
+                api_key=settings.OPENAI_API_KEY or ('unused' if base_url else ''),
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+                max_retries=settings.LLM_MAX_RETRIES,
+                backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+                backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+                base_url=base_url or settings.OPENAI_BASE_URL or None
+            )
+        return client
+
+
+def close_llm_client():
+    """Close the connections of every client created so far"""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,245 @@
+# src/ship_broker/core/mime_extractor.py
+
+import binascii
+import html
+import logging
+import quopri
+import re
+from email.message import Message
+from email.parser import BytesHeaderParser
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PART_BYTES = 512 * 1024
+DEFAULT_MAX_TEXT_BYTES = 1024 * 1024
+
+_TEXT_TYPES = ('text/plain', 'text/html')
+
+# Fast HTML to text: drop invisible blocks, turn block ends into newlines, strip tags
+_HTML_INVISIBLE = re.compile(r'<(script|style|head|title)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_HTML_BREAK = re.compile(r'<\s*br\s*/?>|</\s*(?:p|div|tr|li|h[1-6]|table|blockquote)\s*>', re.IGNORECASE)
+_HTML_CELL = re.compile(r'</\s*t[dh]\s*>', re.IGNORECASE)
+_HTML_TAG = re.compile(r'<[^>]+>')
+_INLINE_SPACE = re.compile(r'[ \t\r\f\v\xa0]+')
+_EXTRA_LINES = re.compile(r'\n\s*\n\s*\n+')
+
+
+def html_to_text(markup: str) -> str:
+    """Convert an HTML body to plain text, keeping line and cell structure"""
+    text = _HTML_INVISIBLE.sub('', markup)
+    text = _HTML_COMMENT.sub('', text)
+    text = _HTML_BREAK.sub('\n', text)
+    text = _HTML_CELL.sub(' ', text)
+    text = html.unescape(_HTML_TAG.sub('', text))
+    lines = (_INLINE_SPACE.sub(' ', line).strip() for line in text.split('\n'))
+    return _EXTRA_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def decode_text(payload: bytes, charset: Optional[str]) -> str:
+    """Decode bytes with the declared charset, falling back to UTF-8"""
+    try:
+        return payload.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        logger.debug(f"Unknown charset {charset}, decoding as UTF-8")
+        return payload.decode('utf-8', errors='replace')
+
+
+def message_text(email_message: Message) -> str:
+    """Text of an already parsed message: text/plain parts, else HTML converted to text"""
+    plain: List[str] = []
+    markup: List[str] = []
+    for part in email_message.walk():
+        content_type = part.get_content_type()
+        if content_type not in _TEXT_TYPES or part.get_content_disposition() == 'attachment':
+            continue
+        payload = part.get_payload(decode=True)
+        if payload is None:
+            continue
+        text = decode_text(payload, part.get_content_charset())
+        (plain if content_type == 'text/plain' else markup).append(text)
+    if plain:
+        return '\n'.join(plain)
+    return html_to_text('\n'.join(markup))
+
+
+class _Part:
+    def __init__(self, headers: Message, collect: bool):
+        self.content_type = headers.get_content_type()
+        self.charset = headers.get_content_charset()
+        self.encoding = (headers.get('Content-Transfer-Encoding') or '7bit').strip().lower()
+        self.collect = collect
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+
+class MimeTextExtractor:
+    """
+    Incremental MIME parser that keeps only the text of a message.
+
+    Feed raw RFC822 bytes in chunks of any size. Headers are parsed first and
+    exposed as `headers`; attachment and other non-text payloads are skipped
+    line by line without being stored; text/plain and text/html parts are
+    decoded (base64, quoted-printable, charset) up to `max_part_bytes` each and
+    `max_total_bytes` overall. `done` becomes True once nothing more worth
+    reading can follow: the text limit is reached, or the outermost multipart
+    has been closed. A forwarded message or a later text part can follow any
+    attachment, so attachments alone never end the message early.
+    """
+
+    def __init__(self, max_part_bytes: int = DEFAULT_MAX_PART_BYTES,
+                 max_total_bytes: int = DEFAULT_MAX_TEXT_BYTES):
+        self.max_part_bytes = max_part_bytes
+        self.max_total_bytes = max_total_bytes
+        self.headers: Optional[Message] = None
+        self.truncated = False
+        self.done = False
+        self.bytes_read = 0
+
+        self._pending = b''
+        self._header_lines: List[bytes] = []
+        self._in_headers = True
+        self._boundaries: List[bytes] = []
+        self._part: Optional[_Part] = None
+        self._plain: List[str] = []
+        self._html: List[str] = []
+        self._collected = 0
+
+    def feed(self, data: bytes):
+        if self.done:
+            return
+        self.bytes_read += len(data)
+        lines = (self._pending + data).split(b'\n')
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line + b'\n')
+            if self.done:
+                return
+        # A very long line inside a skipped payload is not worth buffering
+        if len(self._pending) > self.max_part_bytes and not (self._part and self._part.collect):
+            self._pending = b''
+
+    def close(self) -> str:
+        """Finish parsing and return the message text"""
+        if self._pending and not self.done:
+            self._line(self._pending)
+        self._pending = b''
+        self._finish_part()
+        return self.text()
+
+    def text(self) -> str:
+        if self._plain:
+            return '\n'.join(self._plain)
+        return html_to_text('\n'.join(self._html))
+
+    def _line(self, line: bytes):
+        if self._in_headers:
+            if line.strip():
+                self._header_lines.append(line)
+            else:
+                self._start_part()
+            return
+
+        if line.startswith(b'--') and self._boundaries and self._boundary(line):
+            return
+
+        part = self._part
+        if part is None or not part.collect:
+            return
+        if part.encoding == 'base64':
+            try:
+                line = binascii.a2b_base64(line)
+            except binascii.Error:
+                return
+        if part.size + len(line) > self.max_part_bytes:
+            line = line[:self.max_part_bytes - part.size]
+            part.collect = False
+            self.truncated = True
+        part.chunks.append(line)
+        part.size += len(line)
+
+    def _boundary(self, line: bytes) -> bool:
+        marker = line.rstrip(b'\r\n')
+        for depth in range(len(self._boundaries) - 1, -1, -1):
+            boundary = self._boundaries[depth]
+            if marker == b'--' + boundary:
+                self._end_body()
+                self._finish_part()
+                del self._boundaries[depth + 1:]
+                self._in_headers = True
+                return True
+            if marker == b'--' + boundary + b'--':
+                self._end_body()
+                self._finish_part()
+                del self._boundaries[depth:]
+                if depth == 0:
+                    # Only the epilogue follows the outermost multipart
+                    self.done = True
+                return True
+        return False
+
+    def _end_body(self):
+        # The line break before a boundary belongs to the boundary (RFC 2046)
+        part = self._part
+        if part is None or not part.chunks or part.encoding == 'base64':
+            return
+        last = part.chunks[-1]
+        if last.endswith(b'\r\n'):
+            part.chunks[-1] = last[:-2]
+        elif last.endswith(b'\n'):
+            part.chunks[-1] = last[:-1]
+
+    def _start_part(self):
+        headers = BytesHeaderParser().parsebytes(b''.join(self._header_lines))
+        self._header_lines = []
+        self._in_headers = False
+        if self.headers is None:
+            self.headers = headers
+
+        content_type = headers.get_content_type()
+        if headers.get_content_maintype() == 'multipart':
+            boundary = headers.get_boundary()
+            if boundary:
+                self._boundaries.append(boundary.encode('ascii', errors='replace'))
+            self._part = None
+            return
+        if content_type == 'message/rfc822':
+            # Forwarded message: its own headers follow directly
+            self._in_headers = True
+            return
+
+        collect = (
+            content_type in _TEXT_TYPES
+            and headers.get_content_disposition() != 'attachment'
+            and self._collected < self.max_total_bytes
+        )
+        self._part = _Part(headers, collect)
+
+    def _finish_part(self):
+        part = self._part
+        self._part = None
+        if part is None or not part.chunks:
+            return
+
+        payload = b''.join(part.chunks)
+        if part.encoding == 'quoted-printable':
+            payload = quopri.decodestring(payload)
+        remaining = self.max_total_bytes - self._collected
+        if len(payload) > remaining:
+            payload = payload[:remaining]
+            self.truncated = True
+        self._collected += len(payload)
+
+        text = decode_text(payload, part.charset)
+        (self._plain if part.content_type == 'text/plain' else self._html).append(text)
+        if self._collected >= self.max_total_bytes:
+            self.done = True
+
+
+def extract_text(raw: bytes, max_part_bytes: int = DEFAULT_MAX_PART_BYTES,
+                 max_total_bytes: int = DEFAULT_MAX_TEXT_BYTES) -> str:
+    """Text of a raw RFC822 message with attachment payloads skipped"""
+    extractor = MimeTextExtractor(max_part_bytes, max_total_bytes)
+    extractor.feed(raw)
+    return extractor.close()
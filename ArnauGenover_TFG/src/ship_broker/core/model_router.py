@@ -0,0 +1,146 @@
+# src/ship_broker/core/model_router.py
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .circular_splitter import split_records
+from ..config import get_settings
+
+settings = get_settings()
+
+# Whether a record the model returned holds up, e.g. CargoData(**record).is_valid()
+RecordValidator = Callable[[str, Dict], bool]
+
+_VESSEL_PREFIX = re.compile(r'^\s*(?:M/?V|M/?T|MV\.)\s+', re.IGNORECASE)
+_NUMBER = re.compile(r'^\s*[\d.,]+\s*$')
+
+
+def check_schema(kind: str, record: Dict) -> Optional[str]:
+    """What is wrong with the shape of one answer record, or None"""
+    if not isinstance(record, dict):
+        return "record is not an object"
+    if kind == 'vessels':
+        name, amount = record.get('name'), record.get('dwt')
+        dates = ('eta', 'open_date')
+    else:
+        name, amount = record.get('cargo_type'), record.get('quantity')
+        dates = ('laycan_start', 'laycan_end')
+    if not isinstance(name, str) or not name.strip():
+        return "record without a name"
+    if amount is not None and not isinstance(amount, (int, float)) and not (
+            isinstance(amount, str) and (not amount.strip() or _NUMBER.match(amount))):
+        return "non-numeric quantity"
+    if any(record.get(field) is not None and not isinstance(record.get(field), str) for field in dates):
+        return "malformed date"
+    return None
+
+
+def _grounded(name: str, text: str) -> bool:
+    """Whether a vessel name occurs in the text it was extracted from, not made up"""
+    core = _VESSEL_PREFIX.sub('', name).strip().upper()
+    return bool(core) and core in text
+
+
+@dataclass(frozen=True)
+class Assessment:
+    accepted: bool
+    confidence: float
+    reason: str
+
+
+class ModelRouter:
+    """
+    Tiered model choice per extraction block: the fast, cheap model answers
+    first, and the strong model is asked only when that answer does not hold
+    up. An answer is scored by the share of its records that pass the
+    schema checks and the parser's validation, how many of the block's
+    vessel and cargo sections it covers, and whether its vessel names occur
+    in the text; below `min_confidence` the block is escalated. Decisions
+    are counted process-wide.
+    """
+
+    def __init__(self, fast_model: str, strong_model: str, min_confidence: float):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.min_confidence = min_confidence
+        self.accepted = 0
+        self.escalated = 0
+        self.reasons: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.fast_model) and self.fast_model != self.strong_model
+
+    def assess(self, block: str, answer: Dict[str, List[Dict]], complete: bool,
+               validate: Optional[RecordValidator] = None) -> Assessment:
+        if not complete:
+            return Assessment(False, 0.0, "answer cut off")
+
+        records: List[Tuple[str, Dict]] = [
+            (kind, record) for kind in ('vessels', 'cargoes') for record in answer.get(kind) or []
+        ]
+        expected = len(split_records(block)) - 1
+        if not records:
+            if expected:
+                return Assessment(False, 0.0, f"no records for {expected} sections")
+            return Assessment(True, 1.0, "nothing to extract")
+
+        problems: Counter = Counter()
+        valid = 0
+        for kind, record in records:
+            problem = check_schema(kind, record)
+            if problem is None and validate is not None and not validate(kind, record):
+                problem = "failed validation"
+            if problem:
+                problems[problem] += 1
+            else:
+                valid += 1
+
+        text = block.upper()
+        names = [record['name'] for kind, record in records if kind == 'vessels' and isinstance(record.get('name'), str)]
+        grounded = sum(1 for name in names if _grounded(name, text)) / len(names) if names else 1.0
+        coverage = min(1.0, len(records) / expected) if expected else 1.0
+        confidence = (valid / len(records)) * coverage * grounded
+
+        if confidence >= self.min_confidence:
+            return Assessment(True, confidence, "confident")
+        if problems:
+            reason = problems.most_common(1)[0][0]
+        elif coverage < 1.0:
+            reason = f"{len(records)} records for {expected} sections"
+        else:
+            reason = "vessel names not in the text"
+        return Assessment(False, confidence, reason)
+
+    def record(self, assessment: Assessment):
+        with self._lock:
+            if assessment.accepted:
+                self.accepted += 1
+            else:
+                self.escalated += 1
+                self.reasons[assessment.reason] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            routed = self.accepted + self.escalated
+            return {
+                "enabled": self.enabled,
+                "fast_model": self.fast_model,
+                "strong_model": self.strong_model,
+                "blocks": routed,
+                "accepted_fast": self.accepted,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / routed, 3) if routed else 0.0,
+                "reasons": dict(self.reasons.most_common())
+            }
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter:
+    """Shared by every OpenAIHelper, so escalation rates cover the whole process"""
+    return ModelRouter(settings.EXTRACTION_FAST_MODEL, settings.EXTRACTION_MODEL, settings.ROUTING_MIN_CONFIDENCE)
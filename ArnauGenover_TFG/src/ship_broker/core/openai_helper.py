@@ -1,149 +1,363 @@
 # src/ship_broker/core/openai_helper.py
-from openai import OpenAI
-from typing import Dict, Optional, List
-import json
-from datetime import datetime, date
+from typing import Callable, Dict, Iterator, Optional, List, Tuple
+import asyncio
+import queue
+from collections import Counter
+from datetime import datetime
 import logging
 from ..config import settings
+from .date_normalizer import normalize_date
+from .body_trimmer import estimate_tokens, trim_body, truncate_to_budget
+from .circular_splitter import split_blocks
+from .extraction_backend import ExtractionBackend
+from .extraction_cache import cache_key, get_extraction_cache
+from .extraction_metrics import PARSER_LLM, ExtractionMetrics
+from .json_stream import RecordStream
+from .llm_client import LLMClient, get_llm_client
+from .model_router import ModelRouter, RecordValidator, get_model_router
 
 logger = logging.getLogger(__name__)
 
-class OpenAIHelper:
+# Bump whenever the extraction prompts change, so cached answers to the old prompt are not reused
+PROMPT_VERSION = 2
+
+# Instructions and schema are sent once, in the system message; the user message is only the email
+EXTRACTION_SYSTEM_PROMPT = """You are a shipping expert. Extract all vessel and cargo information from the email.
+1. If the email mentions "PROPOSE SUITABLE CARGOES" or similar, treat the vessels as cargo opportunities
+2. Look for quantities (DWT, MTS, DWCC), and for position and dates after "OPEN"
+3. Give freight rates in USD/MT format (e.g. "USD 42.50/MT")
+4. Note vessel equipment such as cranes and capacity in the description
+5. Dates given as day-month only (e.g. "07-11") are in the near future
+Return ONLY a JSON object of this shape, with numbers as plain numbers:
+{"vessels":[{"name":"","imo":"","dwt":0,"position":"","vessel_type":"","eta":"DD-MM","open_date":"DD-MM","description":"equipment, rates and other details"}],
+"cargoes":[{"cargo_type":"cargo, or vessel name for a cargo opportunity","quantity":0,"load_port":"or open position","discharge_port":"","laycan_start":"DD-MM","laycan_end":"DD-MM","rate":"USD/MT","description":"short notes not covered by the other fields"}]}"""
+
+# Chat message framing per request, on top of the prompt text
+_MESSAGE_OVERHEAD_TOKENS = 12
+
+class StreamedAnswer:
+    """Records of one block's answer so far, and whether the answer arrived whole"""
+
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "gpt-4-turbo-preview"
+        self.answer: Dict[str, List[Dict]] = {'vessels': [], 'cargoes': []}
+        self.complete = False
+
+    @property
+    def records(self) -> int:
+        return len(self.answer['vessels']) + len(self.answer['cargoes'])
+
+
+class OpenAIHelper(ExtractionBackend):
+    name = "openai"
+
+    def __init__(self, llm: Optional[LLMClient] = None, model: Optional[str] = None,
+                 name: Optional[str] = None, router: Optional[ModelRouter] = None):
+        # Shared client: one connection pool, one concurrency limit and rate-limit state per process
+        self.llm = llm or get_llm_client()
+        # The strong model; with routing enabled, blocks go to the router's fast model first
+        self.model = model or settings.EXTRACTION_MODEL
+        self.router = router or get_model_router()
+        if name:
+            self.name = name
         self.current_year = datetime.now().year
+        # LLM answers for date strings the local grammar could not parse
+        self._date_cache: Dict[str, Optional[datetime]] = {}
+        self.cache = get_extraction_cache()
 
     def extract_info(self, content: str) -> Dict:
         """
         Extract both vessel and cargo information from email content using OpenAI.
-        Returns a dictionary with 'vessels' and 'cargoes' lists.
+        Returns a dictionary with 'vessels' and 'cargoes' lists, and what the
+        extraction cost under 'metrics'.
+        """
+        metrics = ExtractionMetrics(parser=PARSER_LLM, backend=self.name)
+        merged = {'vessels': [], 'cargoes': []}
+        for kind, record in self.iter_records(content, metrics):
+            merged[kind].append(record)
+        merged['metrics'] = metrics.to_dict()
+        return merged
+
+    @property
+    def routed(self) -> bool:
+        return self.router.enabled
+
+    @property
+    def cache_model(self) -> str:
+        """Model part of cache keys; routed answers may come from either tier"""
+        return f"{self.router.fast_model}>{self.model}" if self.routed else self.model
+
+    def iter_records(self, content: str, metrics: Optional[ExtractionMetrics] = None,
+                     validate: Optional[RecordValidator] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        ('vessels' or 'cargoes', record) pairs, standardized, as the model
+        produces them: answers are streamed and each record is handed over
+        once its JSON object is complete, so validation starts with the first
+        record instead of after the whole completion.
+
+        Long circulars are split into blocks of whole vessel or cargo records
+        that are extracted concurrently, so latency follows the slowest block
+        rather than the sum, and a block that fails is retried on its own
+        instead of failing the whole email. Blocks seen before under the same
+        prompt and model come from the cache. Quoted reply history,
+        signatures and disclaimers are trimmed first, and each block is
+        capped at the token budget, so splitting keeps every record of a
+        long circular. With routing, each block is first sent to the
+        fast model and escalated to the strong one when the answer fails the
+        router's checks and `validate`. `metrics`, when given, receives the
+        tokens saved, cache use, escalations and each request's tokens and
+        retries. The requests run on the shared LLM
+        client's event loop; only this generator's thread waits.
         """
-        system_prompt = self.get_system_prompt()
-        prompt = f"""You are a shipping expert. Extract all vessel and cargo information from this email.
-        Pay special attention to:
-        1. If email mentions "PROPOSE SUITABLE CARGOES" or similar, treat vessels mentioned as cargo opportunities
-        2. Look for quantity information (DWT, MTS, DWCC)
-        3. Look for location and date information after "OPEN"
-        4. Identify vessel equipment like cranes, capacity, etc.
-        5. For dates, if only day-month is provided (e.g., "07-11"), assume it's in the near future
-        
-        Return ONLY a JSON object with this structure:
-        {{
-            "vessels": [
-                {{
-                    "name": "vessel name",
-                    "dwt": numeric value only,
-                    "position": "current position",
-                    "vessel_type": "type of vessel",
-                    "eta": "DD-MM",
-                    "open_date": "DD-MM",
-                    "description": "additional details including equipment"
-                }}
-            ],
-            "cargoes": [
-                {{
-                    "cargo_type": "type of cargo or vessel name if it's a cargo opportunity",
-                    "quantity": numeric value only in MT,
-                    "load_port": "loading port name or open position",
-                    "discharge_port": "discharge port if mentioned",
-                    "laycan_start": "DD-MM",
-                    "laycan_end": "DD-MM",
-                    "rate": "rate if mentioned",
-                    "description": "full original text and details"
-                }}
-            ]
-        }}
-
-        Email content:
-        {content}
+        trimmed = trim_body(content)
+        blocks = []
+        for block in split_blocks(trimmed.text, settings.EXTRACTION_BLOCK_CHARS):
+            # Only a block that could not be split further, e.g. one without record boundaries, is cut
+            capped = truncate_to_budget(block, settings.EXTRACTION_TOKEN_BUDGET)
+            if capped != block:
+                trimmed.truncated = True
+                trimmed.removed['budget'] = (
+                    trimmed.removed.get('budget', 0) + estimate_tokens(block) - estimate_tokens(capped)
+                )
+            blocks.append(capped)
+        if trimmed.truncated:
+            logger.warning(
+                f"Email block over the {settings.EXTRACTION_TOKEN_BUDGET} token budget, "
+                f"{trimmed.removed['budget']} tokens not sent"
+            )
+        keys = [cache_key(block, PROMPT_VERSION, self.cache_model) for block in blocks]
+        cached: List[Optional[Dict]] = [self.cache.get(key) if self.cache else None for key in keys]
+
+        missing = [i for i, result in enumerate(cached) if result is None]
+        tokens = trimmed.to_dict()
+        tokens['sent'] = sum(
+            estimate_tokens(EXTRACTION_SYSTEM_PROMPT) + estimate_tokens(blocks[i]) + _MESSAGE_OVERHEAD_TOKENS
+            for i in missing
+        )
+        if metrics is not None:
+            metrics.backend = self.name
+            metrics.tokens_saved += tokens['saved']
+            if self.cache:
+                metrics.cache_hits += len(blocks) - len(missing)
+                metrics.cache_misses += len(missing)
+        logger.info(
+            f"Extraction input: {tokens['original']} -> {tokens['trimmed']} body tokens "
+            f"(saved {tokens['saved']}), ~{tokens['sent']} prompt tokens sent"
+        )
+
+        counts = {'vessels': 0, 'cargoes': 0}
+        for result in cached:
+            if result is not None:
+                for kind, record in self._standardized(result):
+                    counts[kind] += 1
+                    yield kind, record
+
+        failed = 0
+        if missing:
+            # Records cross from the client's loop to this thread as they are parsed
+            arrivals: queue.Queue = queue.Queue()
+            future = self.llm.submit(
+                self._request_blocks([blocks[i] for i in missing], arrivals.put, validate, metrics)
+            )
+            future.add_done_callback(lambda _: arrivals.put(None))
+            while True:
+                item = arrivals.get()
+                if item is None:
+                    break
+                kind, raw = item
+                record = self._standardize_record(kind, raw)
+                if record is not None:
+                    counts[kind] += 1
+                    yield kind, record
+
+            for i, result in zip(missing, future.result()):
+                if result is None:
+                    failed += 1
+                elif self.cache and result.complete:
+                    # Cut-off answers are kept for this email but never cached
+                    self.cache.put(keys[i], result.answer)
+
+        if failed:
+            logger.error(f"Error using OpenAI: {failed} of {len(blocks)} blocks could not be extracted")
+        if len(blocks) > 1:
+            logger.info(
+                f"Extracted circular in {len(blocks)} blocks: "
+                f"{counts['vessels']} vessels, {counts['cargoes']} cargoes"
+            )
+
+    async def _request_blocks(self, blocks: List[str], on_record: Callable[[Tuple[str, Dict]], None],
+                              validate: Optional[RecordValidator] = None,
+                              metrics: Optional[ExtractionMetrics] = None) -> List[Optional['StreamedAnswer']]:
         """
+        Request all blocks at once on the client's loop, passing each record
+        to `on_record` as it is parsed. A block whose answer breaks off is
+        retried, and only records past those already passed on are sent;
+        blocks that never produced anything are None.
+        """
+        async def extract(index: int, block: str) -> Optional[StreamedAnswer]:
+            if self.routed:
+                answer = await self._request_fast(block, validate, metrics)
+                if answer is not None:
+                    for kind in ('vessels', 'cargoes'):
+                        for record in answer.answer[kind]:
+                            on_record((kind, record))
+                    return answer
+
+            best: Optional[StreamedAnswer] = None
+            for attempt in range(1 + max(0, settings.EXTRACTION_BLOCK_RETRIES)):
+                answer = StreamedAnswer()
+                seen = best.records if best else 0
+
+                def forward(kind: str, record: Dict):
+                    # A retry repeats the records the broken attempt already produced
+                    if answer.records > seen:
+                        on_record((kind, record))
 
+                try:
+                    await self._request_extraction(block, answer, forward, metrics=metrics)
+                except Exception as e:
+                    logger.warning(
+                        f"Extraction of block {index + 1}/{len(blocks)} failed (attempt {attempt + 1}, "
+                        f"{answer.records} records read): {str(e)}"
+                    )
+                if best is None or answer.records >= best.records:
+                    best = answer
+                if answer.complete:
+                    return answer
+            return best if best and best.records else None
+
+        return await asyncio.gather(*(extract(index, block) for index, block in enumerate(blocks)))
+
+    async def _request_fast(self, block: str, validate: Optional[RecordValidator],
+                            metrics: Optional[ExtractionMetrics] = None) -> Optional['StreamedAnswer']:
+        """The fast model's answer for a block when it holds up; None to escalate to the strong model"""
+        answer = StreamedAnswer()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            # Held back until assessed, so an escalated block never hands on records twice
+            await self._request_extraction(block, answer, lambda kind, record: None, self.router.fast_model, metrics)
+        except Exception as e:
+            logger.debug(f"Fast model extraction failed: {str(e)}")
+        assessment = self.router.assess(block, answer.answer, answer.complete, validate)
+        self.router.record(assessment)
+        if not assessment.accepted:
+            if metrics is not None:
+                metrics.escalations += 1
+            logger.info(
+                f"Escalating block to {self.model}: {assessment.reason} (confidence {assessment.confidence:.2f})"
+            )
+            return None
+        return answer
+
+    async def _request_extraction(self, content: str, answer: 'StreamedAnswer',
+                                  on_record: Callable[[str, Dict], None], model: Optional[str] = None,
+                                  metrics: Optional[ExtractionMetrics] = None):
+        """Stream the model's answer for one block into `answer`; raises on API errors"""
+        model = model or self.model
+        prompt = f"Email content:\n{content}"
+        stream = RecordStream(('vessels', 'cargoes'))
+        tally: Counter = Counter()
+        streamed = 0
+        try:
+            async for text in self.llm.stream(
+                tally=tally,
+                model=model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={ "type": "json_object" }
-            )
-            
-            try:
-                # Extract the JSON content from the response
-                result = json.loads(response.choices[0].message.content)
-                
-                # Process and standardize the results
-                processed_result = {
-                    'vessels': [],
-                    'cargoes': []
-                }
-
-                # Process vessels
-                for vessel in result.get('vessels', []):
-                    if vessel.get('name'):
-                        processed_result['vessels'].append({
-                            'name': vessel.get('name'),
-                            'dwt': vessel.get('dwt'),
-                            'position': vessel.get('position'),
-                            'vessel_type': vessel.get('vessel_type'),
-                            'eta': self.standardize_date(vessel.get('eta')),
-                            'open_date': self.standardize_date(vessel.get('open_date')),
-                            'description': vessel.get('description')
-                        })
-
-                # Process cargoes
-                for cargo in result.get('cargoes', []):
-                    if cargo.get('cargo_type'):
-                        processed_result['cargoes'].append({
-                            'cargo_type': cargo.get('cargo_type'),
-                            'quantity': cargo.get('quantity'),
-                            'load_port': cargo.get('load_port'),
-                            'discharge_port': cargo.get('discharge_port'),
-                            'laycan_start': self.standardize_date(cargo.get('laycan_start')),
-                            'laycan_end': self.standardize_date(cargo.get('laycan_end')),
-                            'rate': cargo.get('rate'),
-                            'description': cargo.get('description')
-                        })
-
-                return processed_result
-
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON from OpenAI response: {str(e)}")
-                logger.error(f"Raw response was: {response.choices[0].message.content}")
-                return {'vessels': [], 'cargoes': []}
+            ):
+                streamed += len(text)
+                for kind, record in stream.feed(text):
+                    answer.answer[kind].append(record)
+                    on_record(kind, record)
+        finally:
+            if metrics is not None:
+                # Estimated when the stream broke off before the usage chunk
+                prompt_tokens = tally['prompt_tokens'] or (
+                    estimate_tokens(EXTRACTION_SYSTEM_PROMPT) + estimate_tokens(prompt) + _MESSAGE_OVERHEAD_TOKENS
+                    if streamed else 0
+                )
+                completion_tokens = tally['completion_tokens'] or (streamed + 3) // 4
+                metrics.add_request(model, prompt_tokens, completion_tokens, tally['retries'])
+        answer.complete = stream.complete
+        if stream.skipped:
+            logger.warning(f"Skipped {stream.skipped} malformed records in the OpenAI answer")
+        if not stream.complete:
+            raise ValueError(f"OpenAI answer cut off after {answer.records} records")
+
+    def _standardized(self, result: Dict) -> Iterator[Tuple[str, Dict]]:
+        for kind in ('vessels', 'cargoes'):
+            for raw in result.get(kind) or []:
+                record = self._standardize_record(kind, raw)
+                if record is not None:
+                    yield kind, record
 
+    def _standardize_record(self, kind: str, raw: Dict) -> Optional[Dict]:
+        """One record of the answer standardized, or None when unusable"""
+        try:
+            processed = self._process_result({kind: [raw]})[kind]
         except Exception as e:
-            logger.error(f"Error using OpenAI: {str(e)}")
-            return {'vessels': [], 'cargoes': []}
+            logger.error(f"Unusable extraction result: {str(e)}")
+            return None
+        return processed[0] if processed else None
+
+    def _process_result(self, result: Dict) -> Dict:
+        """Standardize the model's answer: drop unnamed records and parse dates"""
+        # Process and standardize the results
+        processed_result = {
+            'vessels': [],
+            'cargoes': []
+        }
+
+        # Process vessels
+        for vessel in result.get('vessels', []):
+            if vessel.get('name'):
+                processed_result['vessels'].append({
+                    'name': vessel.get('name'),
+                    'imo': vessel.get('imo'),
+                    'dwt': vessel.get('dwt'),
+                    'position': vessel.get('position'),
+                    'vessel_type': vessel.get('vessel_type'),
+                    'eta': self.standardize_date(vessel.get('eta')),
+                    'open_date': self.standardize_date(vessel.get('open_date')),
+                    'description': vessel.get('description')
+                })
+
+        # Process cargoes
+        for cargo in result.get('cargoes', []):
+            if cargo.get('cargo_type'):
+                processed_result['cargoes'].append({
+                    'cargo_type': cargo.get('cargo_type'),
+                    'quantity': cargo.get('quantity'),
+                    'load_port': cargo.get('load_port'),
+                    'discharge_port': cargo.get('discharge_port'),
+                    'laycan_start': self.standardize_date(cargo.get('laycan_start')),
+                    'laycan_end': self.standardize_date(cargo.get('laycan_end')),
+                    'rate': cargo.get('rate'),
+                    'description': cargo.get('description')
+                })
+
+        return processed_result
 
     def standardize_date(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Convert various date formats to datetime objects with smart future date handling."""
+        """
+        Convert various date formats to datetime objects with smart future date handling.
+        Broker shorthand is parsed by the local date grammar; only strings it
+        cannot parse are sent to OpenAI, and each of those only once.
+        """
         if not date_str:
             return None
 
-        try:
-            # If it's already a full date, try to parse it directly
-            if isinstance(date_str, str) and len(date_str.split('-')) == 3:
-                return datetime.strptime(date_str, '%Y-%m-%d')
-        except ValueError:
-            pass
+        if isinstance(date_str, str):
+            parsed = normalize_date(date_str)
+            if parsed:
+                return parsed
 
-        try:
-            # Handle DD-MM format
-            if isinstance(date_str, str) and len(date_str.replace('/', '-').split('-')) == 2:
-                day, month = map(int, date_str.replace('/', '-').split('-'))
-                # Try current year first
-                try:
-                    target_date = date(self.current_year, month, day)
-                    # If the date would be in the past, use next year
-                    if target_date < date.today():
-                        target_date = date(self.current_year + 1, month, day)
-                    return datetime.combine(target_date, datetime.min.time())
-                except ValueError:
-                    logger.warning(f"Invalid day-month combination: {date_str}")
-                    return None
+        key = str(date_str).strip().upper()
+        if key in self._date_cache:
+            return self._date_cache[key]
 
+        try:
             # For other formats, ask OpenAI to extract the day and month
             prompt = f"""
             Extract only the day and month numbers from this text: "{date_str}"
@@ -154,7 +368,7 @@ class OpenAIHelper:
             If the text is too vague, return the first day of the mentioned month.
             """
             
-            response = self.client.chat.completions.create(
+            response = self.llm.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "Extract dates in DD-MM format only"},
@@ -164,58 +378,16 @@ class OpenAIHelper:
             )
             
             extracted_date = response.choices[0].message.content.strip()
-            
-            try:
-                day, month = map(int, extracted_date.split('-'))
-                target_date = date(self.current_year, month, day)
-                if target_date < date.today():
-                    target_date = date(self.current_year + 1, month, day)
-                return datetime.combine(target_date, datetime.min.time())
-            except ValueError:
+            result = normalize_date(extracted_date)
+            if not result:
                 logger.warning(f"Could not parse extracted date: {extracted_date}")
-                return None
+            self._date_cache[key] = result
+            return result
             
         except Exception as e:
             logger.warning(f"Date standardization warning: {str(e)}")
             return None
 
-        return None
-
     def get_system_prompt(self) -> str:
         """Return the system prompt for vessel and cargo extraction."""
-        return """You are a shipping expert that extracts and structures vessel and cargo information from emails.
-        Pay special attention to:
-        1. Rate information in vessel offers (e.g., "USD 42.50/MT" or "Freight Rate: USD 38.00/MT")
-        2. If email mentions "PROPOSE SUITABLE CARGOES" or similar, treat vessels mentioned as cargo opportunities
-        3. Look for quantity information (DWT, MTS, DWCC)
-        4. Look for location and date information after "OPEN"
-        5. Look for freight rates and ensure they're in USD/MT format
-        6. Identify vessel equipment like cranes, capacity, etc.
-        7. For dates, if only day-month is provided (e.g., "07-11"), assume it's in the near future
-        
-        Return ONLY a JSON object with this structure:
-        {
-            "vessels": [
-                {
-                    "name": "vessel name",
-                    "dwt": numeric value only,
-                    "position": "current position",
-                    "vessel_type": "type of vessel",
-                    "eta": "DD-MM",
-                    "open_date": "DD-MM",
-                    "description": "additional details including equipment and rates"
-                }
-            ],
-            "cargoes": [
-                {
-                    "cargo_type": "type of cargo or vessel name if it's a cargo opportunity",
-                    "quantity": numeric value only in MT,
-                    "load_port": "loading port name or open position",
-                    "discharge_port": "discharge port if mentioned",
-                    "laycan_start": "DD-MM",
-                    "laycan_end": "DD-MM",
-                    "rate": "rate if mentioned in USD/MT format",
-                    "description": "full original text and details"
-                }
-            ]
-        }"""
\ No newline at end of file
+        return EXTRACTION_SYSTEM_PROMPT
@@ -0,0 +1,80 @@
+# src/ship_broker/core/phrase_matcher.py
+
+import re
+from typing import Dict, Generic, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Separators a multi-word phrase may be written with: "IRON ORE", "IRON-ORE", "IRON  ORE"
+_FLEXIBLE_SPACE = r'[\s\-/]+'
+_BOUNDARY_BEFORE = r'(?<![A-Z0-9])'
+_BOUNDARY_AFTER = r'(?![A-Z0-9])'
+
+
+def trie_regex(words: Iterable[str], flexible_space: bool = False) -> str:
+    """
+    Build a prefix-factored alternation of the words. The regex engine then
+    walks it like a trie, so each offset is rejected in a few steps however
+    many words there are, and longer words win over their prefixes.
+    """
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for char in word.upper():
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [
+            (_FLEXIBLE_SPACE if flexible_space and char == ' ' else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+def phrase_key(text: str) -> str:
+    """Canonical spelling of a matched phrase, used to look up its value"""
+    return re.sub(_FLEXIBLE_SPACE, ' ', text.upper()).strip()
+
+
+class PhraseMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+    value: object
+
+
+class PhraseMatcher(Generic[T]):
+    """
+    Dictionary matcher: finds every listed phrase in a text in one
+    left-to-right pass, on word boundaries and case-insensitively,
+    preferring the longest phrase at each position. Each phrase maps to a
+    value, e.g. the canonical entry it is an alias of.
+    """
+
+    def __init__(self, phrases: Dict[str, T]):
+        self._values: Dict[str, T] = {phrase_key(phrase): value for phrase, value in phrases.items()}
+        self._regex = re.compile(
+            _BOUNDARY_BEFORE + '(' + trie_regex(self._values, flexible_space=True) + ')' + _BOUNDARY_AFTER,
+            re.IGNORECASE
+        )
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def finditer(self, text: str) -> Iterator[PhraseMatch]:
+        for match in self._regex.finditer(text or ''):
+            value = self._values.get(phrase_key(match.group(1)))
+            if value is not None:
+                yield PhraseMatch(match.start(1), match.end(1), match.group(1), value)
+
+    def findall(self, text: str) -> List[PhraseMatch]:
+        return list(self.finditer(text))
+
+    def first(self, text: str) -> Optional[PhraseMatch]:
+        return next(self.finditer(text), None)
@@ -0,0 +1,164 @@
+# src/ship_broker/core/ports.py
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .phrase_matcher import PhraseMatch, PhraseMatcher
+
+
+class Port(NamedTuple):
+    id: str  # UN/LOCODE
+    name: str
+    country: str
+    lat: float
+    lon: float
+
+
+# UN/LOCODE -> (name, country, lat, lon, aliases and broker spellings).
+# Names that are ordinary words ("MOBILE", "SPLIT") are left out on purpose.
+GAZETTEER: Dict[str, Tuple[str, str, float, float, Tuple[str, ...]]] = {
+    # Australia
+    'AUDAM': ('DAMPIER', 'AUSTRALIA', -20.6167, 116.7167, ()),
+    'AUPHE': ('PORT HEDLAND', 'AUSTRALIA', -20.3100, 118.5750, ('PT HEDLAND', 'HEDLAND')),
+    'AUNTL': ('NEWCASTLE', 'AUSTRALIA', -32.9167, 151.7833, ('NEWCASTLE NSW', 'NEWCASTLE AUSTRALIA')),
+    'AUGLT': ('GLADSTONE', 'AUSTRALIA', -23.8333, 151.2500, ()),
+    'AUHPT': ('HAY POINT', 'AUSTRALIA', -21.2833, 149.3000, ()),
+    'AUPKL': ('PORT KEMBLA', 'AUSTRALIA', -34.4667, 150.9000, ('PT KEMBLA',)),
+    'AUGET': ('GERALDTON', 'AUSTRALIA', -28.7833, 114.6000, ()),
+    'AUKWI': ('KWINANA', 'AUSTRALIA', -32.2333, 115.7667, ()),
+    # China
+    'CNTSN': ('TIANJIN', 'CHINA', 39.0000, 117.7167, ('XINGANG', 'TIANJIN XINGANG')),
+    'CNQDG': ('QINGDAO', 'CHINA', 36.0833, 120.3167, ('TSINGTAO',)),
+    'CNRZH': ('RIZHAO', 'CHINA', 35.3833, 119.5500, ()),
+    'CNCFD': ('CAOFEIDIAN', 'CHINA', 38.9333, 118.5167, ()),
+    'CNJTA': ('JINGTANG', 'CHINA', 39.2167, 119.0000, ()),
+    'CNDLC': ('DALIAN', 'CHINA', 38.9333, 121.6500, ()),
+    'CNLYG': ('LIANYUNGANG', 'CHINA', 34.7500, 119.4500, ()),
+    'CNSHA': ('SHANGHAI', 'CHINA', 31.2333, 121.4833, ()),
+    'CNNGB': ('NINGBO', 'CHINA', 29.8667, 121.5500, ('NINGBO ZHOUSHAN',)),
+    'CNZOS': ('ZHOUSHAN', 'CHINA', 30.0000, 122.1000, ()),
+    'CNCAN': ('GUANGZHOU', 'CHINA', 23.1000, 113.4333, ()),
+    'CNFOC': ('FUZHOU', 'CHINA', 26.0500, 119.3000, ()),
+    # Southeast and East Asia
+    'SGSIN': ('SINGAPORE', 'SINGAPORE', 1.2833, 103.8500, ()),
+    'MYPKG': ('PORT KLANG', 'MALAYSIA', 3.0000, 101.4000, ('PT KLANG', 'KLANG')),
+    'IDSRI': ('SAMARINDA', 'INDONESIA', -0.5000, 117.1500, ()),
+    'IDTBA': ('TABONEO', 'INDONESIA', -3.7500, 114.6000, ()),
+    'IDBXT': ('BONTANG', 'INDONESIA', 0.1000, 117.5000, ()),
+    'IDBPN': ('BALIKPAPAN', 'INDONESIA', -1.2667, 116.8167, ()),
+    'IDKSO': ('KUMAI', 'INDONESIA', -2.7333, 111.7333, ()),
+    'VNHPH': ('HAIPHONG', 'VIETNAM', 20.8667, 106.6833, ('HAI PHONG',)),
+    'PHMNL': ('MANILA', 'PHILIPPINES', 14.5833, 120.9667, ()),
+    'KRPUS': ('BUSAN', 'SOUTH KOREA', 35.1000, 129.0333, ('PUSAN',)),
+    'KRKPO': ('POHANG', 'SOUTH KOREA', 36.0333, 129.3833, ()),
+    'KRKAN': ('GWANGYANG', 'SOUTH KOREA', 34.9000, 127.7000, ('KWANGYANG',)),
+    'JPCHB': ('CHIBA', 'JAPAN', 35.6000, 140.1000, ()),
+    'JPKSM': ('KASHIMA', 'JAPAN', 35.9000, 140.6833, ()),
+    'JPMIZ': ('MIZUSHIMA', 'JAPAN', 34.5000, 133.7333, ()),
+    # Indian subcontinent and Middle East
+    'INMUN': ('MUNDRA', 'INDIA', 22.8333, 69.7167, ()),
+    'INKDL': ('KANDLA', 'INDIA', 23.0167, 70.2167, ('DEENDAYAL',)),
+    'INPRT': ('PARADIP', 'INDIA', 20.2667, 86.6667, ('PARADEEP',)),
+    'INVTZ': ('VISAKHAPATNAM', 'INDIA', 17.6833, 83.2833, ('VIZAG',)),
+    'INKRI': ('KRISHNAPATNAM', 'INDIA', 14.2500, 80.1333, ()),
+    'INHAL': ('HALDIA', 'INDIA', 22.0333, 88.1000, ()),
+    'INGOI': ('GOA', 'INDIA', 15.4167, 73.8000, ('MORMUGAO', 'MARMAGAO')),
+    'BDCGP': ('CHITTAGONG', 'BANGLADESH', 22.3419, 91.8132, ('CHATTOGRAM',)),
+    'PKKHI': ('KARACHI', 'PAKISTAN', 24.8333, 66.9833, ()),
+    'PKBQM': ('PORT QASIM', 'PAKISTAN', 24.7833, 67.3500, ('PT QASIM', 'QASIM')),
+    'AEJEA': ('JEBEL ALI', 'UAE', 25.0167, 55.0667, ()),
+    'SAJUB': ('JUBAIL', 'SAUDI ARABIA', 27.0167, 49.6667, ('AL JUBAIL',)),
+    'OMSOH': ('SOHAR', 'OMAN', 24.3667, 56.7333, ()),
+    # Africa
+    'ZARCB': ('RICHARDS BAY', 'SOUTH AFRICA', -28.8000, 32.0833, ('RBCT', 'R BAY')),
+    'ZADUR': ('DURBAN', 'SOUTH AFRICA', -29.8667, 31.0333, ()),
+    'ZASDB': ('SALDANHA BAY', 'SOUTH AFRICA', -33.0333, 17.9333, ('SALDANHA',)),
+    'MZMPM': ('MAPUTO', 'MOZAMBIQUE', -25.9667, 32.5667, ()),
+    'MACAS': ('CASABLANCA', 'MOROCCO', 33.6000, -7.6167, ()),
+    'MAJFL': ('JORF LASFAR', 'MOROCCO', 33.1167, -8.6333, ()),
+    'EGALY': ('ALEXANDRIA', 'EGYPT', 31.1833, 29.8667, ()),
+    'GNKMR': ('KAMSAR', 'GUINEA', 10.6500, -14.6167, ()),
+    'NGLOS': ('LAGOS', 'NIGERIA', 6.4500, 3.3833, ('APAPA',)),
+    # Europe and Mediterranean
+    'NLRTM': ('ROTTERDAM', 'NETHERLANDS', 51.9000, 4.4833, ()),
+    'NLAMS': ('AMSTERDAM', 'NETHERLANDS', 52.3833, 4.9000, ()),
+    'BEANR': ('ANTWERP', 'BELGIUM', 51.2194, 4.4025, ('ANTWERPEN',)),
+    'BEGNE': ('GHENT', 'BELGIUM', 51.0500, 3.7333, ('GENT',)),
+    'DEHAM': ('HAMBURG', 'GERMANY', 53.5333, 9.9667, ()),
+    'FRDKK': ('DUNKIRK', 'FRANCE', 51.0500, 2.3667, ('DUNKERQUE',)),
+    'GBIMM': ('IMMINGHAM', 'UNITED KINGDOM', 53.6333, -0.1833, ()),
+    'GBNCL': ('NEWCASTLE UPON TYNE', 'UNITED KINGDOM', 54.9667, -1.6000, ('NEWCASTLE UK',)),
+    'PLGDN': ('GDANSK', 'POLAND', 54.4000, 18.6667, ()),
+    'ESGIJ': ('GIJON', 'SPAIN', 43.5500, -5.7000, ()),
+    'ESTAR': ('TARRAGONA', 'SPAIN', 41.1000, 1.2333, ()),
+    'ITTAR': ('TARANTO', 'ITALY', 40.4667, 17.2000, ()),
+    'TRIZM': ('IZMIR', 'TURKEY', 38.4333, 27.1500, ()),
+    'TRISK': ('ISKENDERUN', 'TURKEY', 36.5833, 36.1667, ()),
+    'UAODS': ('ODESSA', 'UKRAINE', 46.4833, 30.7333, ('ODESA',)),
+    'RUNVS': ('NOVOROSSIYSK', 'RUSSIA', 44.7167, 37.7833, ('NOVO',)),
+    'RUULU': ('UST LUGA', 'RUSSIA', 59.6833, 28.4000, ()),
+    'ROCND': ('CONSTANTA', 'ROMANIA', 44.1667, 28.6500, ()),
+    # Americas
+    'USHOU': ('HOUSTON', 'USA', 29.7604, -95.3698, ()),
+    'USMSY': ('NEW ORLEANS', 'USA', 29.9500, -90.0667, ('NOLA',)),
+    'USBAL': ('BALTIMORE', 'USA', 39.2667, -76.5833, ()),
+    'USORF': ('NORFOLK', 'USA', 36.8500, -76.3000, ()),
+    'USLGB': ('LONG BEACH', 'USA', 33.7667, -118.2000, ()),
+    'CAVAN': ('VANCOUVER', 'CANADA', 49.2833, -123.1167, ()),
+    'CASEI': ('SEPT ILES', 'CANADA', 50.2000, -66.3833, ('SEPT-ILES',)),
+    'BRSSZ': ('SANTOS', 'BRAZIL', -23.9500, -46.3333, ()),
+    'BRPNG': ('PARANAGUA', 'BRAZIL', -25.5000, -48.5167, ()),
+    'BRRIG': ('RIO GRANDE', 'BRAZIL', -32.0333, -52.0833, ()),
+    'BRTUB': ('TUBARAO', 'BRAZIL', -20.2833, -40.2500, ()),
+    'BRPDM': ('PONTA DA MADEIRA', 'BRAZIL', -2.5667, -44.3667, ('PDM',)),
+    'BRIQI': ('ITAQUI', 'BRAZIL', -2.5667, -44.3667, ()),
+    'ARROS': ('ROSARIO', 'ARGENTINA', -32.9500, -60.6333, ('UP RIVER', 'UPRIVER')),
+    'ARBHI': ('BAHIA BLANCA', 'ARGENTINA', -38.7833, -62.2667, ()),
+    'COPBO': ('PUERTO BOLIVAR', 'COLOMBIA', 12.2333, -71.9667, ()),
+    'CLSAI': ('SAN ANTONIO', 'CHILE', -33.5833, -71.6167, ()),
+    'PECLL': ('CALLAO', 'PERU', -12.0500, -77.1500, ()),
+}
+
+PORTS: Dict[str, Port] = {
+    port_id: Port(port_id, name, country, lat, lon)
+    for port_id, (name, country, lat, lon, _) in GAZETTEER.items()
+}
+
+
+def _build_matcher() -> PhraseMatcher:
+    phrases = {}
+    for port_id, (name, _, _, _, aliases) in GAZETTEER.items():
+        for phrase in (name, *aliases):
+            phrases[phrase] = port_id
+    return PhraseMatcher(phrases)
+
+
+_MATCHER = _build_matcher()
+
+
+def find_ports(text: Optional[str]) -> List[PhraseMatch]:
+    """Every gazetteer port named in a text, in order, found in one pass; values are port IDs"""
+    return _MATCHER.findall(text or '')
+
+
+def get_port(port_id: Optional[str]) -> Optional[Port]:
+    return PORTS.get((port_id or '').upper())
+
+
+@lru_cache(maxsize=4096)
+def resolve_port(text: Optional[str]) -> Optional[Port]:
+    """
+    The port a free-text port field refers to: an exact UN/LOCODE, or else
+    the first gazetteer name or alias in it, so "RICHARDS BAY, SOUTH AFRICA"
+    and "RBCT" both resolve to ZARCB.
+    """
+    port = get_port(text.strip()) if text else None
+    if port:
+        return port
+    match = _MATCHER.first(text or '')
+    return PORTS[match.value] if match else None
+
+
+def resolve_port_id(text: Optional[str]) -> Optional[str]:
+    port = resolve_port(text)
+    return port.id if port else None
@@ -2,16 +2,27 @@
 
 import asyncio
 import logging
-from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
 from .database import SessionLocal
 from .email_parser import EmailParser
+from .email_pipeline import EmailPipeline
 from .auction_background import check_vessels_for_auctions
+from .imap_idle import ImapIdleListener
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Seconds to wait for the IDLE listener to leave its current cycle on shutdown
+LISTENER_STOP_TIMEOUT = 5
+
+# IDLE notifications and the polling loop must never run a cycle concurrently
+_cycle_lock = asyncio.Lock()
+
+_listener: Optional[ImapIdleListener] = None
+_listener_task: Optional[asyncio.Task] = None
+
 async def process_emails(db: Session):
     """Process new emails"""
     try:
@@ -21,29 +32,75 @@ async def process_emails(db: Session):
             db,
             settings.IMAP_SERVER
         )
-        emails = parser.get_emails(days=1)
-        for email_data in emails:
-            parser.process_and_store_email(email_data)
+        await EmailPipeline(parser).run(days=1)
     except Exception as e:
         logger.error(f"Error processing emails: {str(e)}")
 
+async def run_processing_cycle():
+    """Process new emails and create any pending auctions"""
+    async with _cycle_lock:
+        db = SessionLocal()
+        try:
+            # Process emails
+            await process_emails(db)
+
+            # Check for vessels that need auctions
+            await check_vessels_for_auctions(db)
+
+        finally:
+            db.close()
+
 async def start_scheduler():
-    """Start background tasks"""
+    """Start background tasks; cancelling this task also stops the IDLE listener"""
+    global _listener, _listener_task
+    if settings.EMAIL_USE_IDLE and settings.EMAIL_ADDRESS:
+        # Push ingestion: process as soon as the server announces new mail.
+        # The listener falls back to polling on servers without IDLE.
+        _listener = ImapIdleListener(
+            settings.EMAIL_ADDRESS,
+            settings.EMAIL_PASSWORD,
+            settings.IMAP_SERVER,
+            on_new_mail=run_processing_cycle,
+            poll_interval=settings.EMAIL_CHECK_INTERVAL,
+            idle_timeout=settings.EMAIL_IDLE_TIMEOUT
+        )
+        _listener_task = asyncio.create_task(_listener.run())
+
+    try:
+        await _schedule()
+    finally:
+        await stop_scheduler()
+
+async def stop_scheduler():
+    """Stop the IDLE listener, cancelling it if it does not finish its cycle in time"""
+    global _listener, _listener_task
+    listener, task = _listener, _listener_task
+    _listener, _listener_task = None, None
+    if listener is None or task is None:
+        return
+    await listener.stop()
+    try:
+        await asyncio.wait_for(task, timeout=LISTENER_STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("IMAP IDLE listener did not stop in time, cancelled")
+    except Exception as e:
+        logger.error(f"Error stopping IMAP IDLE listener: {str(e)}")
+
+async def _schedule():
     while True:
         try:
-            db = SessionLocal()
-            try:
-                # Process emails
-                await process_emails(db)
-                
-                # Check for vessels that need auctions
-                await check_vessels_for_auctions(db)
-                
-            finally:
-                db.close()
-                
+            if settings.EMAIL_USE_IDLE and settings.EMAIL_ADDRESS:
+                # Emails arrive through the listener; keep the periodic auction sweep
+                async with _cycle_lock:
+                    db = SessionLocal()
+                    try:
+                        await check_vessels_for_auctions(db)
+                    finally:
+                        db.close()
+            else:
+                await run_processing_cycle()
         except Exception as e:
             logger.error(f"Error in scheduler: {str(e)}")
-            
+
         # Wait before next check
-        await asyncio.sleep(settings.EMAIL_CHECK_INTERVAL)  # Usually 300 seconds (5 minutes)
\ No newline at end of file
+        await asyncio.sleep(settings.EMAIL_CHECK_INTERVAL)  # Usually 300 seconds (5 minutes)
@@ -0,0 +1,220 @@
+# src/ship_broker/core/section_classifier.py
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .phrase_matcher import trie_regex
+
+_DIGITS = tuple('0123456789')
+
+# Indicator patterns as (anchors, pattern). Anchors are the literals a match
+# can start with; they build the prefilter that drives the single scan.
+# Patterns shared by several classifications appear once.
+INDICATOR_PATTERNS = {
+    'mv_name': (('M/V',), r'M/V\s+[A-Z]'),
+    'vessel_details': (('VESSEL',), r'\bVESSEL\s+(?:DETAILS?|SPECS?|NAME)\b'),
+    'dwt': (('DWT',), r'\bDWT\b'),
+    'imo': (('IMO',), r'\bIMO\s+NO\b'),
+    'built': (('BUILT',), r'\bBUILT\b'),
+    'flag': (('FLAG',), r'\bFLAG\b'),
+    'class': (('CLASS',), r'\bCLASS\b'),
+    'vessel_position': (('VESSEL',), r'\bVESSEL\s+POSITION\b'),
+    'open_at': (('OPEN',), r'\bOPEN\s+(?:AT|IN|FROM)\b'),
+    'open_on': (('OPEN',), r'\bOPEN\s+ON\b'),
+    'eta': (('ETA',), r'\bETA\b'),
+    'tonnage': (_DIGITS, r'\b\d{4,6}\s*(?:MT|MTS|KMT|K|TONS?|DWT)\b'),
+    'laycan': (('LAYCAN',), r'\bLAYCAN\b'),
+    'freight_rate': (('FREIGHT',), r'\bFREIGHT\s+RATE\b'),
+    'load_port': (('LOAD',), r'\bLOAD(?:ING)?\s+PORT\b'),
+    'discharge_port': (('DISCH',), r'\bDISCH(?:ARGE)?\s+PORT\b'),
+    'cargo_ready': (('CARGO',), r'\bCARGO\s+READY\b'),
+    'dwcc': (('DWCC',), r'\bDWCC\b'),  # Deadweight Cargo Capacity
+    'cbft': (('CBFT',), r'\bCBFT\b'),  # Cubic Feet
+    'propose_cargoes': (('PROPOSE',), r'\bPROPOSE\s+(?:SUITABLE\s+)?C(?:AR)?GOES?\b'),
+    'propose_suitable_cgoes': (('PROPOSE',), r'\bPROPOSE\s+SUITABLE\s+CGOES\b'),
+    'grain_capacity': (('GR:',), r'\bGR:\d'),
+    'cranes': (('CRANE',), r'\bCRANES?\b'),
+    'position': (('CURRENT', 'POSITION'), r'\b(?:CURRENT\s+)?POSITION\b'),
+    'arriving': (('ARRIVING',), r'\bARRIVING\b'),
+    'departing': (('DEPARTING',), r'\bDEPARTING\b'),
+    'expected': (('EXPECTED',), r'\bEXPECTED\b'),
+    'cargo': (('CARGO',), r'\bCARGO\b'),
+    'freight': (('FREIGHT',), r'\bFREIGHT\b'),
+    'rate': (('RATE',), r'\bRATE\b'),
+    'mt': (('MT',), r'\bMT\b'),
+    'quantity': (('QUANTITY',), r'\bQUANTITY\b'),
+    # Vessel block markers used by extract_vessels
+    'vessel_block': (('VESSEL',), r'VESSEL\s+DETAILS?:?'),
+    'mv_block': (('M/V', 'MV'), r'M/?V\s+'),
+    'name_block': (('NAME',), r'NAME\s*:'),
+    'ship_block': (('SHIP',), r'SHIP\s+DETAILS?:?'),
+    # Circular headers announcing a cargo request rather than vessel offers
+    'header_propose_cgoes': (('PROPOSE',), r'PROPOSE\s+(?:SUITABLE\s+)?CGOES'),
+    'header_no_recirculate': (('PLS',), r'PLS\s+(?:DO\s+)?NOT\s+RECIRCULATE'),
+    'header_available_cargoes': (('AVAILABLE',), r'AVAILABLE\s+CARGOES?:'),
+}
+
+_DATE_VALUE = r'[\d\-\.\/]+\s*(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)?(?:\s*\d{4})?'
+_RATE_UNIT = r'(?:MT|TON|METRIC TON)'
+
+# Field patterns as (anchors, pattern); the value is the pattern's first group.
+# The leftmost match of each one is captured during the same scan.
+FIELD_PATTERNS = {
+    'cargo_type': (('CARGO', 'COMMODITY'), r'(?:CARGO|COMMODITY)\s*:?\s*([A-Z][A-Z\s]+)'),
+    'quantity_value': (
+        ('QUANTITY', 'QTY', 'AMOUNT'),
+        r'(?:QUANTITY|QTY|AMOUNT)\s*:?\s*([\d,\.]+)\s*(?:MT|MTS|KMT|K|TONS?)'
+    ),
+    'load_port_value': (('LOAD', 'FROM'), r'(?:LOAD(?:ING)?\s+PORT|FROM)\s*:?\s*([A-Z][A-Z\s,]+)'),
+    'discharge_port_value': (('DISCH', 'TO'), r'(?:DISCH(?:ARGE)?\s+PORT|TO)\s*:?\s*([A-Z][A-Z\s,]+)'),
+    'vessel_name': (('VESSEL', 'NAME', 'M/V', 'MV'), r'(?:VESSEL|NAME|M/?V)\s*:?\s*([A-Z][A-Z\s]+)'),
+    'dwt_value': (('DWT', 'DEADWEIGHT'), r'(?:DWT|DEADWEIGHT)\s*:?\s*([\d,\.]+)'),
+    'position_value': (('POSITION', 'PORT', 'LOC'), r'(?:POSITION|PORT|LOC)\s*:?\s*([A-Z][A-Z\s]+)'),
+    'type_value': (('TYPE', 'VESSEL'), r'(?:TYPE|VESSEL TYPE)\s*:?\s*([A-Z][A-Z\s]+)'),
+    'eta_value': (('ETA',), r'ETA\s*:?\s*(' + _DATE_VALUE + ')'),
+    'open_value': (('OPEN',), r'OPEN\s*:?\s*(' + _DATE_VALUE + ')'),
+    'freight_rate_value': (
+        ('FREIGHT', 'RATE'),
+        r'(?:FREIGHT|RATE)\s*:?\s*(?:USD|US\$|\$)?\s*([\d,\.]+)(?:\s*(?:USD|US\$|\$|\/)?\s*(?:MT|TON|PER MT|PMT))'
+    ),
+    'usd_rate_value': (
+        ('USD', 'US$', '$'),
+        r'(?:USD|US\$|\$)\s*([\d,\.]+)(?:\s*(?:\/|\s+PER\s+)?' + _RATE_UNIT + ')'
+    ),
+    'rate_usd_value': (
+        _DIGITS + (',', '.'),
+        r'([\d,\.]+)\s*(?:USD|US\$|\$)(?:\s*(?:\/|\s+PER\s+)?' + _RATE_UNIT + ')'
+    ),
+}
+
+VESSEL_INDICATORS = frozenset({
+    'mv_name', 'vessel_details', 'dwt', 'imo', 'built', 'flag', 'class',
+    'vessel_position', 'open_at', 'eta'
+})
+CARGO_INDICATORS = frozenset({
+    'tonnage', 'laycan', 'freight_rate', 'load_port', 'discharge_port', 'cargo_ready',
+    'dwcc', 'cbft', 'propose_cargoes', 'open_at', 'open_on', 'grain_capacity', 'cranes'
+})
+VESSEL_SECTION = frozenset({
+    'vessel_details', 'dwt', 'imo', 'built', 'flag', 'class', 'vessel_position'
+})
+POSITION_UPDATE = frozenset({
+    'position', 'eta', 'open_at', 'arriving', 'departing', 'expected'
+})
+CARGO_SECTION = frozenset({
+    'cargo', 'laycan', 'freight', 'rate', 'propose_suitable_cgoes', 'mt', 'quantity', 'dwcc', 'cbft'
+})
+VESSEL_BLOCK = frozenset({'vessel_block', 'mv_block', 'name_block', 'ship_block'})
+CARGO_HEADERS = frozenset({'header_propose_cgoes', 'header_no_recirculate', 'header_available_cargoes'})
+
+# Rate patterns in order of preference
+RATE_FIELDS = ('freight_rate_value', 'usd_rate_value', 'rate_usd_value')
+
+SECTION_SPLIT = re.compile(r'\n\s*\n')
+
+
+def _build_dispatch() -> Dict[str, List[Tuple[str, bool, re.Pattern]]]:
+    # Group compiled patterns by the first character of their anchors
+    dispatch: Dict[str, List[Tuple[str, bool, re.Pattern]]] = {}
+    patterns = [(name, False, spec) for name, spec in INDICATOR_PATTERNS.items()]
+    patterns += [(name, True, spec) for name, spec in FIELD_PATTERNS.items()]
+    for name, is_field, (anchors, pattern) in patterns:
+        compiled = re.compile(pattern, re.IGNORECASE)
+        for first in {anchor[0].upper() for anchor in anchors}:
+            dispatch.setdefault(first, []).append((name, is_field, compiled))
+    return dispatch
+
+
+_DISPATCH = _build_dispatch()
+_PREFILTER = re.compile(
+    '(?=' + trie_regex(
+        anchor
+        for spec in [*INDICATOR_PATTERNS.values(), *FIELD_PATTERNS.values()]
+        for anchor in spec[0]
+    ) + ')',
+    re.IGNORECASE
+)
+_TOTAL_PATTERNS = len(INDICATOR_PATTERNS) + len(FIELD_PATTERNS)
+
+
+@dataclass(frozen=True)
+class SectionScan:
+    """Classification and leftmost field matches of one email section"""
+    text: str
+    features: FrozenSet[str] = frozenset()
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def has_vessel_indicators(self) -> bool:
+        return not self.features.isdisjoint(VESSEL_INDICATORS)
+
+    @property
+    def has_cargo_indicators(self) -> bool:
+        return not self.features.isdisjoint(CARGO_INDICATORS)
+
+    @property
+    def is_vessel_section(self) -> bool:
+        return not self.features.isdisjoint(VESSEL_SECTION)
+
+    @property
+    def is_position_update(self) -> bool:
+        return not self.features.isdisjoint(POSITION_UPDATE)
+
+    @property
+    def is_cargo_section(self) -> bool:
+        return not self.features.isdisjoint(CARGO_SECTION)
+
+    @property
+    def is_vessel_block(self) -> bool:
+        return not self.features.isdisjoint(VESSEL_BLOCK)
+
+    @property
+    def has_cargo_headers(self) -> bool:
+        return not self.features.isdisjoint(CARGO_HEADERS)
+
+    def get(self, name: str) -> Optional[str]:
+        return self.fields.get(name)
+
+    def rate(self) -> Optional[str]:
+        """First rate found, preferring explicit FREIGHT/RATE labels"""
+        for name in RATE_FIELDS:
+            if name in self.fields:
+                return self.fields[name]
+        return None
+
+
+@lru_cache(maxsize=1024)
+def scan_section(text: str) -> SectionScan:
+    """
+    Classify a section and capture its fields in a single pass. The prefilter
+    stops only at offsets where some anchor starts; there, only the patterns
+    sharing that first character are tried, and each pattern is dropped once
+    it has matched. Results equal a re.search of every pattern.
+    """
+    found = set()
+    features = set()
+    fields: Dict[str, str] = {}
+    for candidate in _PREFILTER.finditer(text):
+        pos = candidate.start()
+        for name, is_field, pattern in _DISPATCH.get(text[pos].upper(), ()):
+            if name in found:
+                continue
+            match = pattern.match(text, pos)
+            if not match:
+                continue
+            found.add(name)
+            if is_field:
+                fields[name] = match.group(1)
+            else:
+                features.add(name)
+        if len(found) == _TOTAL_PATTERNS:
+            break
+    return SectionScan(text=text, features=frozenset(features), fields=fields)
+
+
+@lru_cache(maxsize=32)
+def scan_sections(text: str) -> Tuple[SectionScan, ...]:
+    """Split an email into blank-line separated sections and scan each once"""
+    return tuple(scan_section(section) for section in SECTION_SPLIT.split(text))
@@ -0,0 +1,312 @@
+# src/ship_broker/core/sender_templates.py
+
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from email.utils import parseaddr
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import SenderTemplate
+from .date_normalizer import normalize_date, normalize_date_range
+from .section_classifier import scan_section
+
+logger = logging.getLogger(__name__)
+
+# Record fields by kind; the first one identifies the record on its line
+VESSEL_FIELDS = ('name', 'dwt', 'vessel_type', 'position', 'open_date', 'eta')
+CARGO_FIELDS = ('cargo_type', 'quantity', 'load_port', 'discharge_port', 'laycan_start', 'laycan_end', 'rate')
+NUMBER_FIELDS = {'dwt', 'quantity'}
+DATE_FIELDS = {'open_date', 'eta', 'laycan_start', 'laycan_end'}
+
+_NUMBER = r'\d[\d,.]*(?:\s*K\b)?'
+_DATE = (
+    r'\d{1,2}(?:[-/.]\d{1,2}){1,2}(?:\s*[A-Z]{3,9}\b)?'
+    r'|\d{1,2}(?:ST|ND|RD|TH)?\s*[A-Z]{3,9}\b'
+    r'|(?:EARLY|ELY|MID|LATE|END)\s+[A-Z]{3,9}\b'
+    r'|PPT|PROMPT|SPOT|ASAP'
+)
+_NUMBER_TOKEN = re.compile(_NUMBER, re.IGNORECASE)
+_DATE_TOKEN = re.compile(_DATE, re.IGNORECASE)
+_LITERAL_DIGITS = re.compile(r'\d+')
+_LITERAL_SPACE = re.compile(r'\s+')
+
+
+def sender_address(from_header: Optional[str]) -> Optional[str]:
+    """Lowercased address of a From header, used as the template key"""
+    address = parseaddr(from_header or '')[1].strip().lower()
+    return address or None
+
+
+def parse_number(token: str) -> Optional[float]:
+    """Parse broker quantities: "55,000", "55.000", "55K" """
+    token = token.strip().upper()
+    multiplier = 1000 if token.endswith('K') else 1
+    digits = token.rstrip('K').strip()
+    if re.fullmatch(r'\d{1,3}(?:[.,]\d{3})+', digits):
+        digits = re.sub(r'[.,]', '', digits)
+    try:
+        return float(digits.replace(',', '')) * multiplier
+    except ValueError:
+        return None
+
+
+@dataclass
+class LineTemplate:
+    """A regex for one record per line, with the record field each group fills"""
+    kind: str
+    pattern: str
+    groups: Dict[str, List[str]]
+    support: int = 1
+    _compiled: Optional[re.Pattern] = field(default=None, repr=False, compare=False)
+
+    @property
+    def regex(self) -> re.Pattern:
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern, re.IGNORECASE)
+        return self._compiled
+
+    def parse(self, line: str) -> Optional[Dict]:
+        match = self.regex.fullmatch(line)
+        if not match:
+            return None
+        record = {}
+        for group, names in self.groups.items():
+            token = match.group(group).strip()
+            if names[0] in NUMBER_FIELDS:
+                record[names[0]] = parse_number(token)
+            elif names[0] in DATE_FIELDS:
+                if len(names) > 1:
+                    window = normalize_date_range(token)
+                    record[names[0]], record[names[1]] = window if window else (None, None)
+                else:
+                    record[names[0]] = normalize_date(token)
+            else:
+                record[names[0]] = token
+        return record
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'pattern': self.pattern, 'groups': self.groups, 'support': self.support}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LineTemplate':
+        return cls(data['kind'], data['pattern'], data['groups'], data.get('support', 1))
+
+
+@dataclass
+class TemplateMatch:
+    vessels: List[Dict]
+    cargoes: List[Dict]
+    confidence: float
+
+
+def _find_span(line: str, name: str, value) -> Optional[Tuple[int, int]]:
+    if value in (None, ''):
+        return None
+    if name in NUMBER_FIELDS:
+        for token in _NUMBER_TOKEN.finditer(line):
+            parsed = parse_number(token.group())
+            if parsed and abs(parsed - float(value)) <= 0.01 * float(value):
+                return token.span()
+        return None
+    if name in DATE_FIELDS:
+        target = value.date() if isinstance(value, datetime) else None
+        for token in _DATE_TOKEN.finditer(line):
+            window = normalize_date_range(token.group())
+            if window and target in (window[0].date(), window[1].date()):
+                return token.span()
+        return None
+    start = line.upper().find(str(value).strip().upper())
+    return (start, start + len(str(value).strip())) if start >= 0 and str(value).strip() else None
+
+
+def _literal(text: str) -> str:
+    parts = _LITERAL_SPACE.split(text)
+    escaped = [_LITERAL_DIGITS.sub(r'\\d+', re.escape(part)) for part in parts]
+    return r'\s+'.join(escaped) if len(parts) > 1 else escaped[0]
+
+
+def learn_line_template(kind: str, line: str, record: Dict) -> Optional[LineTemplate]:
+    """
+    Generalize the line a record was extracted from into a template: field
+    values become capture groups, the text between them stays literal
+    (with flexible whitespace and digits). Returns None when the record's
+    identifying field or too few fields can be located on the line.
+    """
+    names = VESSEL_FIELDS if kind == 'vessel' else CARGO_FIELDS
+    spans: Dict[Tuple[int, int], List[str]] = {}
+    for name in names:
+        span = _find_span(line, name, record.get(name))
+        if span:
+            spans.setdefault(span, []).append(name)
+
+    located = [name for group in spans.values() for name in group]
+    if names[0] not in located or len(located) < 2:
+        return None
+
+    pattern = [r'\s*']
+    groups: Dict[str, List[str]] = {}
+    position = 0
+    for start, end in sorted(spans):
+        if start < position:
+            continue  # Overlapping fields, keep the earlier one
+        field_names = spans[(start, end)]
+        pattern.append(_literal(line[position:start]))
+        group = f"g{len(groups)}"
+        if field_names[0] in NUMBER_FIELDS:
+            body = _NUMBER
+        elif field_names[0] in DATE_FIELDS:
+            body = _DATE
+        else:
+            body = '.+?'
+        pattern.append(f'(?P<{group}>{body})')
+        groups[group] = field_names
+        position = end
+    pattern.append(_literal(line[position:].rstrip()) + r'\s*')
+
+    template = LineTemplate(kind, ''.join(pattern), groups)
+    try:
+        parsed = template.parse(line)
+    except re.error:
+        return None
+    # The template must read back the record it was learned from
+    if not parsed or str(parsed.get(names[0], '')).upper() != str(record[names[0]]).strip().upper():
+        return None
+    return template
+
+
+class TemplateCache:
+    """
+    Extraction templates learned per sender from emails the LLM parsed.
+    Brokers send circulars in stable layouts, one record per line; once a
+    layout has been seen `min_support` times its template extracts later
+    emails from the same sender locally. A result is only trusted when the
+    templates cover at least `min_confidence` of the lines that look like
+    vessel or cargo records. Thread-safe; changed senders are persisted by
+    `save` in the caller's transaction.
+    """
+
+    def __init__(self, min_support: int = 2, min_confidence: float = 0.8):
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._templates: Dict[str, List[LineTemplate]] = {}
+        self._hits: Dict[str, int] = {}
+        self._dirty = set()
+
+    @classmethod
+    def load(cls, db: Optional[Session], min_support: int = 2, min_confidence: float = 0.8) -> 'TemplateCache':
+        cache = cls(min_support, min_confidence)
+        if db is None:
+            return cache
+        for row in db.query(SenderTemplate):
+            cache._templates[row.sender] = [LineTemplate.from_dict(data) for data in json.loads(row.templates)]
+            cache._hits[row.sender] = row.hits or 0
+        return cache
+
+    def templates(self, sender: str) -> List[LineTemplate]:
+        with self._lock:
+            return list(self._templates.get(sender, []))
+
+    def apply(self, sender: Optional[str], content: str) -> Optional[TemplateMatch]:
+        """Extract records with the sender's templates; None when not confident enough"""
+        if not sender:
+            return None
+        templates = [t for t in self.templates(sender) if t.support >= self.min_support]
+        if not templates:
+            return None
+
+        vessels, cargoes = [], []
+        matched = unmatched = 0
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            for template in templates:
+                record = template.parse(line)
+                if record:
+                    record['description'] = line.strip()
+                    (vessels if template.kind == 'vessel' else cargoes).append(record)
+                    matched += 1
+                    break
+            else:
+                scan = scan_section(line)
+                if scan.has_vessel_indicators or scan.has_cargo_indicators or scan.is_vessel_block:
+                    unmatched += 1
+
+        if not matched:
+            return None
+        confidence = matched / (matched + unmatched)
+        if confidence < self.min_confidence:
+            logger.debug(f"Template confidence {confidence:.2f} too low for {sender}")
+            return None
+
+        with self._lock:
+            self._hits[sender] = self._hits.get(sender, 0) + 1
+            self._dirty.add(sender)
+        return TemplateMatch(vessels, cargoes, confidence)
+
+    def learn(self, sender: Optional[str], content: str, vessels: Iterable, cargoes: Iterable) -> int:
+        """Learn line templates from records the LLM extracted. Returns how many were seen"""
+        if not sender:
+            return 0
+        lines = [line for line in content.splitlines() if line.strip()]
+        learned = []
+        for kind, records in (('vessel', vessels), ('cargo', cargoes)):
+            key = VESSEL_FIELDS[0] if kind == 'vessel' else CARGO_FIELDS[0]
+            for record in records:
+                record = _as_dict(record)
+                value = str(record.get(key) or '').strip().upper()
+                line = next((line for line in lines if value and value in line.upper()), None)
+                template = learn_line_template(kind, line, record) if line else None
+                if template:
+                    learned.append(template)
+        if not learned:
+            return 0
+
+        with self._lock:
+            known = {t.pattern: t for t in self._templates.setdefault(sender, [])}
+            # One vote per layout per email
+            for pattern in {t.pattern: t for t in learned}:
+                if pattern in known:
+                    known[pattern].support += 1
+                else:
+                    template = next(t for t in learned if t.pattern == pattern)
+                    self._templates[sender].append(template)
+                    known[pattern] = template
+            self._templates[sender].sort(key=lambda t: t.support, reverse=True)
+            self._dirty.add(sender)
+        return len(learned)
+
+    def save(self, db: Session) -> List[str]:
+        """Add changed senders' templates to the session without committing"""
+        with self._lock:
+            dirty = {
+                sender: (json.dumps([t.to_dict() for t in self._templates.get(sender, [])]), self._hits.get(sender, 0))
+                for sender in self._dirty
+            }
+            self._dirty.clear()
+        if not dirty:
+            return []
+
+        rows = {row.sender: row for row in db.query(SenderTemplate).filter(SenderTemplate.sender.in_(list(dirty)))}
+        for sender, (templates, hits) in dirty.items():
+            row = rows.get(sender) or SenderTemplate(sender=sender)
+            row.templates = templates
+            row.hits = hits
+            row.updated_at = datetime.utcnow()
+            db.add(row)
+        return list(dirty)
+
+    def mark_dirty(self, senders: Iterable[str]):
+        with self._lock:
+            self._dirty.update(senders)
+
+
+def _as_dict(record) -> Dict:
+    if isinstance(record, dict):
+        return record
+    return {f.name: getattr(record, f.name) for f in fields(record)}
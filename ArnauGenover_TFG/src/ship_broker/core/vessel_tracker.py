@@ -10,6 +10,8 @@ import math
 from dotenv import load_dotenv
 import os
 
+from .ports import get_port, resolve_port
+
 # Configure logging
 logging.getLogger('websockets.client').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -264,20 +266,12 @@ class VesselTracker:
             logger.error(f"Error getting vessels: {str(e)}")
             return []
     
-    def _get_port_coordinates(self, port_name: str) -> Optional[Dict]:
-        """Get port coordinates from name"""
-        ports_db = {
-            "DAMPIER, AUSTRALIA": {"lat": -20.6167, "lon": 116.7167},
-            "NEWCASTLE, AUSTRALIA": {"lat": -32.9167, "lon": 151.7833},
-            "SINGAPORE": {"lat": 1.2833, "lon": 103.8500},
-            "TIANJIN, CHINA": {"lat": 39.0000, "lon": 117.7167},
-            "MUNDRA, INDIA": {"lat": 22.8333, "lon": 69.7167},
-            "CHITTAGONG, BANGLADESH": {"lat": 22.3419, "lon": 91.8132},
-            "ANTWERP, BELGIUM": {"lat": 51.2194, "lon": 4.4025},
-            "HOUSTON, USA": {"lat": 29.7604, "lon": -95.3698}
-        }
-        
-        return ports_db.get(port_name.upper())
+    def _get_port_coordinates(self, port_name: Optional[str], port_id: Optional[str] = None) -> Optional[Dict]:
+        """Get port coordinates by gazetteer ID, resolving the name when the ID is missing or unknown"""
+        port = (get_port(port_id) if port_id else None) or resolve_port(port_name)
+        if not port:
+            return None
+        return {"lat": port.lat, "lon": port.lon}
 
     def _get_mock_data(self, port_name: str) -> List[Dict]:
         """Return mock data when no real data is available"""
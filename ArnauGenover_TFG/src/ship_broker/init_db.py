@@ -8,7 +8,7 @@ current_dir = Path(__file__).resolve().parent
 src_dir = current_dir.parent.parent / "src"
 sys.path.append(str(src_dir))
 
-from ship_broker.core.database import Base, engine
+from ship_broker.core.database import Base, engine, upgrade_schema
 from ship_broker.config import settings
 
 def init_db():
@@ -18,6 +18,9 @@ def init_db():
     
     # Create tables
     Base.metadata.create_all(bind=engine)
+    added = upgrade_schema(engine)
+    if added:
+        print(f"Added columns: {', '.join(added)}")
     print(f"Database tables created successfully at {db_path}!")
 
 if __name__ == "__main__":
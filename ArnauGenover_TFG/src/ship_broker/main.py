@@ -14,6 +14,7 @@ from .core.database import Base, engine
 from .core.scheduler import start_scheduler
 from .api.routes.auth import get_current_user
 from .core.vessel_tracker import tracker
+from .core.llm_client import close_llm_client
 
 from fastapi import Form, status
 from fastapi.responses import RedirectResponse
@@ -131,8 +132,8 @@ async def startup_event():
     try:
         logger.info("Starting background tasks...")
         
-        # Start the scheduler
-        asyncio.create_task(start_scheduler())
+        # Start the scheduler; kept so shutdown can stop it and its IDLE listener
+        app.state.scheduler_task = asyncio.create_task(start_scheduler())
         
         # Start AIS stream
         asyncio.create_task(tracker.start_tracking())
@@ -145,8 +146,17 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup when the application shuts down"""
     try:
+        # Stop the scheduler; cancelling it also stops the IMAP IDLE listener
+        scheduler_task = getattr(app.state, "scheduler_task", None)
+        if scheduler_task:
+            scheduler_task.cancel()
+            await asyncio.gather(scheduler_task, return_exceptions=True)
+
         # Stop AIS stream
         await tracker.stop_tracking()
+
+        # Close the shared OpenAI connection pool
+        await asyncio.to_thread(close_llm_client)
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
 
@@ -0,0 +1,96 @@
+# tests/test_archive_reprocessor.py
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ship_broker.core import email_parser
+from ship_broker.core.archive_reprocessor import ArchiveReprocessor
+from ship_broker.core.database import Auction, AuctionBid, Base, Cargo, RawEmail, Vessel
+from ship_broker.core.email_parser import PARSER_VERSION, EmailParser
+
+VESSEL = "M/V OCEAN STAR, DWT 56000, OPEN AT SINGAPORE 10 MAY"
+CARGO = "CARGO: COAL\nQUANTITY: 50000 MT\nLOAD PORT: RICHARDS BAY\nDISCHARGE PORT: ROTTERDAM\nLAYCAN 10-15 MAY"
+
+def _parser(tmp_path) -> EmailParser:
+    engine = create_engine(f"sqlite:///{tmp_path / 'reprocess.db'}")
+    Base.metadata.create_all(bind=engine)
+    return EmailParser("", "", Session(bind=engine), use_ai=False)
+
+def _ingest(parser, emails):
+    parser.store_batch([(email_data, *parser.extract_email(email_data)) for email_data in emails])
+    parser.db.commit()
+
+def _email(n, content):
+    return {'subject': f'Circular {n}', 'sender': 'ops@broker.com', 'message_id': f'<{n}@broker.com>', 'content': content}
+
+def test_only_older_parser_versions_are_reprocessed(tmp_path):
+    parser = _parser(tmp_path)
+    db = parser.db
+    _ingest(parser, [_email(1, VESSEL), _email(2, CARGO)])
+    vessel_row = db.query(RawEmail).filter(RawEmail.message_id == '<1@broker.com>').one()
+    vessel_row.parser_version = PARSER_VERSION - 1
+    db.commit()
+
+    stats = ArchiveReprocessor(parser, batch_size=1, concurrency=2).run()
+    assert (stats.emails, stats.vessels, stats.cargoes, stats.remaining) == (1, 1, 0, 0)
+
+    # The old vessel was replaced, not duplicated, and now points at the same archive row
+    vessel = db.query(Vessel).one()
+    assert vessel.name == "OCEAN STAR"
+    assert vessel.source_email_id == vessel_row.id
+    assert db.query(Cargo).count() == 1
+    assert {row.parser_version for row in db.query(RawEmail)} == {PARSER_VERSION}
+
+    assert ArchiveReprocessor(parser).run().emails == 0
+
+def test_duplicates_are_restamped_without_extraction(tmp_path):
+    parser = _parser(tmp_path)
+    db = parser.db
+    _ingest(parser, [_email(1, VESSEL)])
+    _ingest(parser, [_email(2, VESSEL + "\n")])
+    db.query(RawEmail).update({RawEmail.parser_version: None})
+    db.commit()
+
+    stats = ArchiveReprocessor(parser).run()
+    assert (stats.emails, stats.duplicates, stats.vessels) == (2, 1, 1)
+    assert db.query(Vessel).count() == 1
+
+def test_templates_load_once_before_the_workers_start(tmp_path, monkeypatch):
+    loads = []
+    load = email_parser.TemplateCache.load
+
+    def slow_load(*args, **kwargs):
+        loads.append(1)
+        time.sleep(0.05)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(email_parser.TemplateCache, "load", slow_load)
+    parser = _parser(tmp_path)
+    for n in range(8):
+        parser.store_batch([(_email(n, f"{VESSEL} {n}"), [], [])])
+    parser.db.query(RawEmail).update({RawEmail.parser_version: None})
+    parser.db.commit()
+    parser._templates = None
+    loads.clear()
+
+    ArchiveReprocessor(parser, batch_size=8, concurrency=8).run()
+    assert len(loads) == 1
+def test_reprocessed_vessel_takes_its_auction_along(tmp_path):
+    parser = _parser(tmp_path)
+    db = parser.db
+    _ingest(parser, [_email(1, "M/V OCEAN STAR, DWT 56000, ETA 10 MAY 2026"),
+                     _email(2, "M/V SEA LION, DWT 33000, ETA 12 MAY 2026")])
+    auction = db.query(Auction).join(Vessel).filter(Vessel.name == "OCEAN STAR").one()
+    db.add(AuctionBid(auction_id=auction.id, bid_space_mt=1000, sale_price=20.0))
+    db.query(RawEmail).filter(RawEmail.message_id == '<1@broker.com>').update({RawEmail.parser_version: None})
+    db.commit()
+
+    assert ArchiveReprocessor(parser).run().emails == 1
+
+    # One auction per vessel, none left pointing at the deleted row, and its bids went with it
+    vessel_ids = {vessel_id for (vessel_id,) in db.query(Vessel.id)}
+    auctions = db.query(Auction.vessel_id).all()
+    assert len(vessel_ids) == len(auctions) == 2
+    assert {vessel_id for (vessel_id,) in auctions} == vessel_ids
+    assert db.query(AuctionBid).count() == 0
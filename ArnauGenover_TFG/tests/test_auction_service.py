@@ -0,0 +1,105 @@
+# tests/test_auction_service.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from ship_broker.core.auction_service import AuctionService
+from ship_broker.core.database import (
+    Auction, AuctionStatus, Base, EmailFingerprint, ProcessedEmail, RawEmail, Vessel
+)
+from ship_broker.core.email_parser import EmailParser
+
+def _parser(tmp_path, name="auctions") -> EmailParser:
+    engine = create_engine(f"sqlite:///{tmp_path / f'{name}.db'}")
+    Base.metadata.create_all(bind=engine)
+    parser = EmailParser("", "", Session(bind=engine), use_ai=False)
+    # Loaded up front so only the store itself is measured
+    parser.duplicate_index()
+    parser.sender_templates()
+    parser.entity_index()
+    return parser
+
+def _circular(n, names, eta=True):
+    lines = [f"M/V {name}, DWT {30000 + 1000 * i}" + (f", ETA {10 + i} MAY 2026" if eta else "")
+             for i, name in enumerate(names)]
+    return {'subject': f'Circular {n}', 'sender': 'ops@broker.com', 'message_id': f'<{n}@broker.com>',
+            'content': "\n\n".join(lines)}
+
+def _store(parser, email_data):
+    return parser.store_batch([(email_data, *parser.extract_email(email_data))])
+
+def _statements(parser, email_data):
+    """Statements and commits used to store one email"""
+    statements, commits = [], []
+    engine = parser.db.get_bind()
+    count_statement = lambda *args: statements.append(1)
+    count_commit = lambda session: commits.append(1)
+    event.listen(engine, "before_execute", count_statement)
+    event.listen(parser.db, "after_commit", count_commit)
+    try:
+        _store(parser, email_data)
+    finally:
+        event.remove(engine, "before_execute", count_statement)
+        event.remove(parser.db, "after_commit", count_commit)
+    return len(statements), len(commits)
+
+def test_multi_vessel_email_is_stored_in_one_commit(tmp_path):
+    small = _statements(_parser(tmp_path, "small"), _circular(1, ["SEA LION", "OCEAN STAR"]))
+    large = _statements(_parser(tmp_path, "large"), _circular(1, ["SEA LION", "OCEAN STAR", "BLUE WAVE",
+                                                                   "GOLDEN RAY", "NORTH WIND", "SILVER BAY"]))
+    assert small[1] == large[1] == 1
+    # Batched inserts: the statement count does not grow with the vessels in the email
+    assert small[0] == large[0]
+
+def test_auctions_only_for_vessels_with_eta(tmp_path):
+    parser = _parser(tmp_path)
+    db = parser.db
+    _store(parser, _circular(1, ["SEA LION", "OCEAN STAR"]))
+    _store(parser, _circular(2, ["BLUE WAVE"], eta=False))
+    auctioned = {name for (name,) in db.query(Vessel.name).join(Auction)}
+    assert auctioned == {"SEA LION", "OCEAN STAR"}
+
+    # A new mention of a vessel with an active auction does not open another one
+    _store(parser, _circular(3, ["SEA LION"]))
+    assert db.query(Auction).count() == 2
+
+def test_existing_active_auctions_are_skipped(tmp_path):
+    db = _parser(tmp_path).db
+    vessels = [Vessel(name=name, dwt=dwt, eta=datetime(2026, 5, 10)) for name, dwt in
+               (("SEA LION", 33000), ("OCEAN STAR", 56000), ("NO DWT", None))]
+    db.add_all(vessels)
+    db.commit()
+    service = AuctionService(db)
+    assert service.create_auction_for_vessel(vessels[0].id) is not None
+
+    created = service.create_auctions_for_vessels(vessels)
+    assert [auction.vessel_id for auction in created] == [vessels[1].id]
+    assert db.query(Auction).filter(Auction.status == AuctionStatus.ACTIVE).count() == 2
+
+def test_failure_mid_batch_leaves_nothing_behind(tmp_path, monkeypatch):
+    parser = _parser(tmp_path)
+    db = parser.db
+    emails = [_circular(1, ["SEA LION"]), _circular(2, ["OCEAN STAR"])]
+    results = [(email_data, *parser.extract_email(email_data)) for email_data in emails]
+
+    calculate = AuctionService.calculate_auction_parameters
+
+    def fail_on_second(self, vessel):
+        if vessel.name == "OCEAN STAR":
+            raise RuntimeError("pricing unavailable")
+        return calculate(self, vessel)
+
+    monkeypatch.setattr(AuctionService, "calculate_auction_parameters", fail_on_second)
+    with pytest.raises(RuntimeError):
+        parser.store_batch(results)
+    monkeypatch.undo()
+
+    for model in (RawEmail, ProcessedEmail, EmailFingerprint, Vessel, Auction):
+        assert db.query(model).count() == 0
+    # Nothing was indexed either, so the same batch stores cleanly afterwards
+    assert parser.find_duplicate(emails[0]) is None
+    stats = parser.store_batch(results)
+    assert (stats.emails, stats.duplicates, stats.vessels) == (2, 0, 2)
+    assert db.query(Auction).count() == 2
@@ -0,0 +1,39 @@
+# tests/test_body_trimmer.py
+from ship_broker.core.body_trimmer import estimate_tokens, trim_body
+
+POSITION = "MV OCEAN STAR\nDWT: 56000\nOPEN AT SINGAPORE 10-15 MAY\nIMO 9074729"
+DISCLAIMER = (
+    "This email and any attachments are confidential and intended solely for the addressee. "
+    "If you have received this email in error please notify the sender."
+)
+
+def test_reply_history_is_dropped_when_the_reply_has_records():
+    text = f"{POSITION}\n\nOn Mon, 5 May 2025 at 10:00, Broker <a@b.com> wrote:\n> MV OLD VESSEL\n> DWT: 30000"
+    result = trim_body(text)
+    assert result.text == POSITION
+    assert result.removed['reply_history'] > 0
+
+def test_reply_to_a_circular_keeps_the_quoted_circular():
+    text = f"Pls see below, noted.\n\n-----Original Message-----\nFrom: x@y.com\n\n{POSITION}"
+    assert "OCEAN STAR" in trim_body(text).text
+
+def test_signature_and_disclaimer_are_removed():
+    text = f"{POSITION}\n\nBest regards,\nJohn Smith\nChartering Desk\nTel +30 210 000000\n\n{DISCLAIMER}"
+    result = trim_body(text)
+    assert result.text == POSITION
+    assert result.tokens_saved > 0
+
+def test_signoff_before_more_records_is_kept():
+    text = f"{POSITION}\n\nRegards\n\nMV SEA LION\nDWT: 32000\nOPEN SANTOS 20 MAY"
+    assert "SEA LION" in trim_body(text).text
+
+def test_budget_cuts_on_section_boundaries():
+    text = "\n\n".join(POSITION.replace("OCEAN STAR", f"OCEAN {i}") for i in range(50))
+    result = trim_body(text, max_tokens=200)
+    assert result.truncated
+    assert result.tokens <= 200
+    assert result.text.endswith("IMO 9074729")
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
@@ -0,0 +1,73 @@
+# tests/test_bulk_ingest.py
+import email
+import mailbox
+from email.message import EmailMessage
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ship_broker.core.bulk_ingest import BulkIngestor, iter_raw_messages
+from ship_broker.core.database import Base, Cargo, EmailFingerprint, ProcessedEmail, Vessel
+
+VESSEL = "M/V OCEAN STAR, DWT 56000, OPEN AT SINGAPORE 10 MAY"
+CARGO = "CARGO: COAL\nQUANTITY: 50000 MT\nLOAD PORT: RICHARDS BAY\nDISCHARGE PORT: ROTTERDAM\nLAYCAN 10-15 MAY"
+
+def message(n, content) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = f"Circular {n}"
+    msg["From"] = "Ops <ops@broker.com>"
+    msg["Message-ID"] = f"<{n}@broker.com>"
+    msg.set_content(content)
+    return msg
+
+def write_mbox(path, messages):
+    box = mailbox.mbox(str(path))
+    for msg in messages:
+        box.add(msg)
+    box.close()
+    return path
+
+def subjects(raws):
+    return sorted(email.message_from_bytes(raw)["Subject"] for raw in raws)
+
+def test_iter_raw_messages_reads_every_mailbox_format(tmp_path):
+    expected = ["Circular 1", "Circular 2"]
+    mbox = write_mbox(tmp_path / "box.mbox", [message(1, VESSEL), message(2, CARGO)])
+
+    maildir = mailbox.Maildir(str(tmp_path / "maildir"))
+    for n, content in ((1, VESSEL), (2, CARGO)):
+        maildir.add(message(n, content))
+
+    emls = tmp_path / "emls" / "nested"
+    emls.mkdir(parents=True)
+    (tmp_path / "emls" / "1.eml").write_bytes(message(1, VESSEL).as_bytes())
+    (emls / "2.eml").write_bytes(message(2, CARGO).as_bytes())
+
+    for path in (mbox, tmp_path / "maildir", tmp_path / "emls"):
+        assert subjects(iter_raw_messages(path)) == expected
+    assert subjects(iter_raw_messages(tmp_path / "emls" / "1.eml")) == ["Circular 1"]
+
+def test_ingest_stores_each_email_once_and_skips_copies(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(bind=engine)
+    # The copy and the repeated Message-ID land in the batch after their originals, before those are stored
+    mbox = write_mbox(tmp_path / "box.mbox", [
+        message(1, VESSEL), message(2, CARGO), message(3, VESSEL), message(2, CARGO + "\nRevised"),
+    ])
+
+    with Session(bind=engine) as db:
+        stats = BulkIngestor(db, workers=2, batch_size=2).ingest([mbox])
+        assert (stats.messages, stats.stored, stats.duplicates, stats.skipped, stats.failed) == (4, 3, 1, 1, 0)
+        assert (stats.vessels, stats.cargoes) == (1, 1)
+        assert db.query(Vessel).count() == db.query(Cargo).count() == 1
+
+        # The copy was linked without being extracted
+        parsers = dict(db.query(ProcessedEmail.message_id, ProcessedEmail.parser))
+        assert parsers["<1@broker.com>"] is not None
+        assert parsers["<3@broker.com>"] is None
+        assert db.query(EmailFingerprint.duplicate_of).filter(
+            EmailFingerprint.message_id == "<3@broker.com>"
+        ).scalar() == "<1@broker.com>"
+
+        again = BulkIngestor(db, workers=2, batch_size=2).ingest([mbox])
+        assert (again.stored, again.skipped, again.vessels) == (0, 4, 0)
@@ -0,0 +1,34 @@
+# tests/test_circular_splitter.py
+from ship_broker.core.circular_splitter import split_blocks, split_records
+
+PREAMBLE = "GOOD DAY,\nPLS PROPOSE SUITABLE CARGOES FOR BELOW VESSELS:"
+
+def vessel(i):
+    return f"MV OCEAN {i}\nDWT: {50000 + i}\nOPEN AT SINGAPORE 10-15 MAY\nIMO 9074729"
+
+def circular(count):
+    return "\n\n".join([PREAMBLE] + [vessel(i) for i in range(count)] + ["BEST REGARDS"])
+
+def test_short_email_is_one_block():
+    text = circular(2)
+    assert split_blocks(text, 6000) == [text]
+
+def test_records_keep_trailing_notes():
+    preamble, *records = split_records(circular(3))
+    assert preamble == PREAMBLE
+    assert len(records) == 3
+    assert records[-1].endswith("BEST REGARDS")
+
+def test_large_circular_split_on_record_boundaries():
+    blocks = split_blocks(circular(60), 600)
+    assert len(blocks) > 1
+    assert all(block.startswith(PREAMBLE) for block in blocks)
+    names = [line for block in blocks for line in block.splitlines() if line.startswith("MV OCEAN")]
+    assert names == [f"MV OCEAN {i}" for i in range(60)]
+
+def test_one_vessel_per_line_list_is_cut_on_lines():
+    lines = "\n".join(f"MV OCEAN {i} DWT: {50000 + i} OPEN SINGAPORE 10-15 MAY" for i in range(100))
+    blocks = split_blocks(PREAMBLE + "\n\n" + lines, 1000)
+    assert len(blocks) > 1
+    assert all(len(block) <= 1000 for block in blocks)
+    assert sum(block.count("MV OCEAN") for block in blocks) == 100
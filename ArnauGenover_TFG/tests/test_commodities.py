@@ -0,0 +1,28 @@
+# tests/test_commodities.py
+import pytest
+from ship_broker.core.commodities import classify_commodity
+from ship_broker.core.email_parser import CargoData
+
+@pytest.mark.parametrize("text, canonical, category", [
+    ("HRC", "HOT ROLLED COILS", "STEEL"),
+    ("SBM in bags", "SOYBEAN MEAL", "AGRI"),
+    ("PKS", "PALM KERNEL SHELLS", "BIOMASS"),
+    ("50,000 MT STEAM COAL", "COAL", "ENERGY"),
+    ("IRON-ORE FINES", "IRON ORE", "ORE"),
+    ("CORNER", None, None),
+])
+def test_classify_commodity(text, canonical, category):
+    match = classify_commodity(text)
+    assert match.canonical == canonical
+    assert match.category == category
+
+def test_suspicious_terms_are_whole_words():
+    assert classify_commodity("COAL DETAILS").suspicious
+    assert not classify_commodity("METALS SCRAP").suspicious
+
+def test_is_valid_normalizes_cargo_type():
+    cargo = CargoData(cargo_type="hrc", quantity=25000, load_port="TIANJIN")
+    assert cargo.is_valid()
+    assert cargo.cargo_type == "HOT ROLLED COILS"
+
+    assert not CargoData(cargo_type="VESSEL DETAILS", quantity=25000, load_port="TIANJIN").is_valid()
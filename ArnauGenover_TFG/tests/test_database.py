@@ -0,0 +1,50 @@
+# tests/test_database.py
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from ship_broker.core.database import Base, Cargo, ProcessedEmail, Vessel, upgrade_schema
+
+OLD_SCHEMA = [
+    "CREATE TABLE processed_emails (id INTEGER PRIMARY KEY, message_id VARCHAR, subject VARCHAR, processed_at DATETIME)",
+    "CREATE TABLE vessels (id INTEGER PRIMARY KEY, name VARCHAR, dwt FLOAT, position VARCHAR, eta DATETIME, "
+    "open_date DATETIME, vessel_type VARCHAR, description VARCHAR, created_at DATETIME, owner_id INTEGER)",
+    "CREATE TABLE cargoes (id INTEGER PRIMARY KEY, cargo_type VARCHAR, quantity FLOAT, load_port VARCHAR, "
+    "discharge_port VARCHAR, laycan_start DATETIME, laycan_end DATETIME, rate VARCHAR, description VARCHAR, "
+    "created_at DATETIME, owner_id INTEGER)",
+    "INSERT INTO vessels (id, name, dwt, position, description) VALUES (1, 'OCEAN STAR', 55000, 'SINGAPORE', 'old')",
+    "INSERT INTO cargoes (id, cargo_type, quantity, description) VALUES (1, 'COAL', 50000, 'old')",
+]
+
+def _old_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(text(statement))
+    return engine
+
+def test_upgrade_schema_adds_missing_columns(tmp_path):
+    engine = _old_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+
+    added = upgrade_schema(engine)
+    assert "vessels.position_port_id" in added
+    assert "cargoes.load_port_id" in added
+    assert "processed_emails.prompt_tokens" in added
+
+    with Session(engine) as db:
+        vessel = db.query(Vessel).one()
+        assert vessel.name == "OCEAN STAR"
+        assert vessel.position_port_id is None
+        assert vessel.mention_count == 1
+        assert db.query(Cargo).one().mention_count == 1
+        assert db.query(ProcessedEmail).count() == 0
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("vessels")}
+    assert "ix_vessels_position_port_id" in indexes
+
+def test_upgrade_schema_is_idempotent(tmp_path):
+    engine = _old_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    assert upgrade_schema(engine) == []
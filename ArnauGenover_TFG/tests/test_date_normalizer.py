@@ -0,0 +1,36 @@
+# tests/test_date_normalizer.py
+import pytest
+from datetime import date, datetime
+from ship_broker.core.date_normalizer import normalize_date, normalize_date_range
+
+TODAY = date(2024, 10, 20)
+
+@pytest.mark.parametrize("text, expected", [
+    ("07-11", datetime(2024, 11, 7)),
+    ("07/11", datetime(2024, 11, 7)),
+    ("15-01", datetime(2025, 1, 15)),  # Past day-month rolls to next year
+    ("early Nov", datetime(2024, 11, 1)),
+    ("mid Dec", datetime(2024, 12, 15)),
+    ("end Jan", datetime(2025, 1, 31)),
+    ("end of Jan", datetime(2025, 1, 31)),
+    ("PPT", datetime(2024, 10, 20)),
+    ("10/15 NOV", datetime(2024, 11, 10)),
+    ("Nov 10th", datetime(2024, 11, 10)),
+    ("25-Dec-2024", datetime(2024, 12, 25)),
+    ("25 December 2024", datetime(2024, 12, 25)),
+    ("2024-12-25", datetime(2024, 12, 25)),
+    ("07.11.24", datetime(2024, 11, 7)),
+    ("Nov 2025", datetime(2025, 11, 1)),
+])
+def test_normalize_date(text, expected):
+    assert normalize_date(text, today=TODAY) == expected
+
+@pytest.mark.parametrize("text", [None, "", "TBA", "32-01", "10/05 NOV"])
+def test_unparseable_dates(text):
+    assert normalize_date(text, today=TODAY) is None
+
+def test_date_ranges():
+    assert normalize_date_range("10/15 NOV", today=TODAY) == (datetime(2024, 11, 10), datetime(2024, 11, 15))
+    assert normalize_date_range("early Nov", today=TODAY) == (datetime(2024, 11, 1), datetime(2024, 11, 10))
+    # A window still open today stays in the current year
+    assert normalize_date_range("late Oct", today=TODAY) == (datetime(2024, 10, 21), datetime(2024, 10, 31))
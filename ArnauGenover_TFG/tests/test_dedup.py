@@ -0,0 +1,38 @@
+# tests/test_dedup.py
+from ship_broker.core.dedup import DuplicateIndex, Fingerprint, fingerprint
+
+CIRCULAR = "\n".join(
+    f"MV VESSEL{i} {50 + i},000 DWT OPEN SANTOS {i + 1:02d}-11" for i in range(40)
+)
+
+def test_forwarded_copy_has_same_hash():
+    forwarded = (
+        "---------- Forwarded message ---------\n"
+        "From: broker@example.com\n"
+        "Subject: Fwd: positions\n\n> " + CIRCULAR.replace("\n", "\n> ")
+    )
+    assert fingerprint(forwarded).content_hash == fingerprint(CIRCULAR).content_hash
+
+def test_index_matches_near_duplicates_only():
+    index = DuplicateIndex(threshold=0.9)
+    index.add("<original@broker>", fingerprint(CIRCULAR))
+
+    lines = CIRCULAR.split("\n")
+    lines[3] = "MV VESSEL3 53,000 DWT OPEN NOLA 09-11"
+    assert index.match(fingerprint("\n".join(lines))) == "<original@broker>"
+
+    unrelated = "\n".join(f"CARGO {i} 25,000 MT COAL RICHARDS BAY / ROTTERDAM" for i in range(40))
+    assert index.match(fingerprint(unrelated)) is None
+
+def test_remove_and_roundtrip():
+    fp = fingerprint(CIRCULAR)
+    assert Fingerprint.unpack(fp.content_hash, fp.pack()) == fp
+
+    index = DuplicateIndex()
+    index.add("<original@broker>", fp)
+    index.remove("<original@broker>")
+    assert index.match(fp) is None
+    assert len(index) == 0
+
+def test_empty_body_has_no_fingerprint():
+    assert fingerprint("  --  ") is None
@@ -0,0 +1,52 @@
+# tests/test_email_archive.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ship_broker.core.database import Base, RawEmail
+from ship_broker.core.email_archive import EmailArchive, archive_key
+
+CIRCULAR = "M/V OCEAN STAR, DWT 56000, OPEN AT SINGAPORE 10 MAY"
+
+def _session(tmp_path) -> Session:
+    engine = create_engine(f"sqlite:///{tmp_path / 'archive.db'}")
+    Base.metadata.create_all(bind=engine)
+    return Session(bind=engine)
+
+def test_add_many_stores_each_body_once(tmp_path):
+    with _session(tmp_path) as db:
+        archive = EmailArchive(db)
+        first = {'subject': 'Open', 'sender': 'a@b.com', 'message_id': '<1@b.com>', 'content': CIRCULAR}
+        again = {'subject': 'Fwd: Open', 'sender': 'c@d.com', 'message_id': '<2@d.com>', 'content': CIRCULAR}
+        other = {'subject': 'Cargo', 'sender': 'a@b.com', 'message_id': '<3@b.com>', 'content': "CARGO: COAL"}
+
+        rows = archive.add_many([first, again, other])
+        assert rows[0] is rows[1]
+        assert rows[0].id and rows[2].id != rows[0].id
+        db.commit()
+
+        # Later batches reuse the stored row too
+        assert archive.add_many([dict(again, message_id='<4@d.com>')])[0].id == rows[0].id
+        assert db.query(RawEmail).count() == 2
+        assert rows[0].content_hash == archive_key(CIRCULAR)
+        assert rows[0].message_id == '<1@b.com>'
+
+def test_load_round_trips_the_email(tmp_path):
+    with _session(tmp_path) as db:
+        archive = EmailArchive(db)
+        email_data = {'subject': 'Open ±', 'sender': 'a@b.com', 'message_id': '<1@b.com>',
+                      'content': CIRCULAR + "\nÅ", 'extraction': object()}
+        row = archive.add_many([email_data])[0]
+        assert archive.load(row) == {key: email_data[key] for key in ('subject', 'sender', 'message_id', 'content')}
+        assert len(row.body) < row.size + 100
+
+def test_stale_selects_older_parser_versions(tmp_path):
+    with _session(tmp_path) as db:
+        archive = EmailArchive(db)
+        rows = archive.add_many([{'message_id': f'<{n}>', 'content': f'body {n}'} for n in range(3)])
+        archive.mark_parsed(rows[:1], 2)
+        archive.mark_parsed(rows[1:2], 3)
+
+        assert archive.stale(3, 10) == [rows[0], rows[2]]
+        assert archive.stale(3, 10, after_id=rows[0].id) == [rows[2]]
+        assert archive.count_stale(3) == 2
+        assert archive.count_stale(2) == 1
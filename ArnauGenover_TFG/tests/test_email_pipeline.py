@@ -0,0 +1,122 @@
+# tests/test_email_pipeline.py
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ship_broker.core.auction_service import AuctionService
+from ship_broker.core.database import Base, Cargo, EmailFingerprint, EmailJob, EmailJobStatus, ProcessedEmail, Vessel
+from ship_broker.core.email_parser import EmailParser
+from ship_broker.core.email_pipeline import EmailPipeline
+
+VESSEL = "M/V OCEAN STAR, DWT 56000, OPEN AT SINGAPORE 10 MAY"
+CARGO = "CARGO: COAL\nQUANTITY: 50000 MT\nLOAD PORT: RICHARDS BAY\nDISCHARGE PORT: ROTTERDAM\nLAYCAN 10-15 MAY"
+
+def _parser(tmp_path) -> EmailParser:
+    engine = create_engine(f"sqlite:///{tmp_path / 'pipeline.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return EmailParser("", "", Session(bind=engine), use_ai=False)
+
+def _email(n, content):
+    return {'subject': f'Circular {n}', 'sender': 'ops@broker.com', 'message_id': f'<{n}@broker.com>', 'content': content}
+
+def _count_extractions(parser, monkeypatch, delay=0.0, fail=()):
+    """Wrap extract_email to record calls and peak concurrency, failing the given subjects once"""
+    calls = {'count': 0, 'active': 0, 'peak': 0}
+    lock = threading.Lock()
+    extract = parser.extract_email
+    failing = set(fail)
+
+    def tracked(email_data):
+        with lock:
+            calls['count'] += 1
+            calls['active'] += 1
+            calls['peak'] = max(calls['peak'], calls['active'])
+        try:
+            time.sleep(delay)
+            if email_data['subject'] in failing:
+                failing.discard(email_data['subject'])
+                raise RuntimeError("LLM unavailable")
+            return extract(email_data)
+        finally:
+            with lock:
+                calls['active'] -= 1
+
+    monkeypatch.setattr(parser, "extract_email", tracked)
+    return calls
+
+def _job(parser, n) -> EmailJob:
+    parser.db.expire_all()
+    return parser.db.query(EmailJob).filter(EmailJob.message_id == f'<{n}@broker.com>').one()
+
+@pytest.mark.asyncio
+async def test_counts_match_what_was_stored(tmp_path):
+    parser = _parser(tmp_path)
+    emails = [_email(1, VESSEL), _email(2, VESSEL), _email(3, VESSEL), _email(4, CARGO)]
+    result = await EmailPipeline(parser, concurrency=3).run(emails=emails)
+
+    assert (result.emails, result.vessels, result.cargoes, result.duplicates) == (4, 1, 1, 2)
+    assert parser.db.query(Vessel).count() == parser.db.query(Cargo).count() == 1
+    stages = result.stages
+    assert (stages['fetch'].items, stages['store'].items) == (4, 4)
+    assert stages['extract'].failed == stages['store'].failed == 0
+    assert all(_job(parser, n).status == EmailJobStatus.DONE for n in range(1, 5))
+
+@pytest.mark.asyncio
+async def test_extraction_runs_at_most_concurrency_at_once(tmp_path, monkeypatch):
+    parser = _parser(tmp_path)
+    calls = _count_extractions(parser, monkeypatch, delay=0.05)
+    emails = [_email(n, f"M/V SHIP {n}, DWT {30000 + n}") for n in range(8)]
+
+    result = await EmailPipeline(parser, concurrency=2).run(emails=emails)
+    assert calls['count'] == result.stages['extract'].items == 8
+    assert calls['peak'] == 2
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_retried_on_the_next_run(tmp_path, monkeypatch):
+    parser = _parser(tmp_path)
+    _count_extractions(parser, monkeypatch, fail={'Circular 2'})
+
+    result = await EmailPipeline(parser, concurrency=2).run(emails=[_email(1, VESSEL), _email(2, CARGO)])
+    assert result.stages['extract'].failed == 1
+    job = _job(parser, 2)
+    assert (job.status, job.attempts, job.last_error) == (EmailJobStatus.PENDING, 1, "LLM unavailable")
+    assert parser.db.query(Cargo).count() == 0
+
+    result = await EmailPipeline(parser, concurrency=2).run(emails=[])
+    assert (result.emails, result.cargoes) == (1, 1)
+    assert (_job(parser, 2).status, _job(parser, 2).attempts) == (EmailJobStatus.DONE, 2)
+
+@pytest.mark.asyncio
+async def test_failed_store_rolls_back_results_and_completion(tmp_path, monkeypatch):
+    parser = _parser(tmp_path)
+
+    def fail_auctions(self, vessels, commit=True):
+        raise RuntimeError("disk full")
+
+    # Fails after the results and the job completion are flushed, before they commit
+    monkeypatch.setattr(AuctionService, "create_auctions_for_vessels", fail_auctions)
+    result = await EmailPipeline(parser, concurrency=1).run(emails=[_email(1, "M/V OCEAN STAR, DWT 56000, ETA 10 MAY 2026")])
+
+    assert result.stages['store'].failed == 1
+    assert result.vessels == 0
+    job = _job(parser, 1)
+    assert (job.status, job.last_error) == (EmailJobStatus.PENDING, "disk full")
+    assert parser.db.query(Vessel).count() == parser.db.query(ProcessedEmail).count() == 0
+
+@pytest.mark.asyncio
+async def test_duplicate_is_linked_without_extraction(tmp_path, monkeypatch):
+    parser = _parser(tmp_path)
+    calls = _count_extractions(parser, monkeypatch)
+    await EmailPipeline(parser).run(emails=[_email(1, VESSEL)])
+
+    result = await EmailPipeline(parser).run(emails=[_email(2, VESSEL + "\n")])
+    assert calls['count'] == 1
+    assert (result.emails, result.duplicates, result.vessels) == (1, 1, 0)
+    assert parser.db.query(EmailFingerprint.duplicate_of).filter(
+        EmailFingerprint.message_id == '<2@broker.com>'
+    ).scalar() == '<1@broker.com>'
+    assert _job(parser, 2).status == EmailJobStatus.DONE
+    assert parser.db.query(Vessel).one().mention_count == 1
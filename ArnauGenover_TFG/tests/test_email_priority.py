@@ -0,0 +1,42 @@
+# tests/test_email_priority.py
+from datetime import date, datetime, timedelta
+
+from ship_broker.core.email_priority import EmailPrioritizer, parse_sender_weights, urgent_within
+
+NOW = datetime(2025, 5, 10, 12, 0)
+
+def prioritizer():
+    weights = parse_sender_weights("desk@broker.com=3, clarksons.com=2,news.com=0.2")
+    return EmailPrioritizer(weights, half_life_hours=24, urgency_days=5, urgency_weight=1.0, aging_per_hour=0.25)
+
+def test_sender_weights_by_address_then_domain():
+    p = prioritizer()
+    assert p.sender_weight("desk@broker.com") == 3
+    assert p.sender_weight("ops@london.clarksons.com") == 2
+    assert p.sender_weight("other@broker.com") == 1.0
+    assert p.sender_weight(None) == 1.0
+
+def test_fresh_key_broker_beats_stale_newsletter():
+    p = prioritizer()
+    fresh = {"sender": "desk@broker.com", "received_at": NOW - timedelta(hours=1), "content": "MV OCEAN"}
+    stale = {"sender": "weekly@news.com", "received_at": NOW - timedelta(days=3), "content": "Market report"}
+    assert p.score(fresh, NOW) > p.score(stale, NOW)
+    day_old = dict(fresh, received_at=NOW - timedelta(hours=25))
+    assert p.score(day_old, NOW) < p.score(fresh, NOW) / 1.9
+
+def test_near_dates_are_urgent():
+    today = date(2025, 5, 10)
+    assert urgent_within("MV OCEAN\nOPEN AT SINGAPORE 12-14 MAY", 5, today)
+    assert urgent_within("LAYCAN: PPT", 5, today)
+    assert urgent_within("ETA 13/05", 5, today)
+    assert not urgent_within("LAYCAN 20-25 JUNE", 5, today)
+    assert not urgent_within("Market report, no dates", 5, today)
+
+def test_waiting_jobs_overtake_fresher_ones():
+    p = prioritizer()
+    low = p.rank(0.2, NOW)
+    high = p.rank(4.0, NOW)
+    assert high > low
+    # 3.8 points of priority are worth 15.2 hours of waiting
+    assert p.rank(4.0, NOW + timedelta(hours=16)) < low
+    assert p.rank(4.0, NOW + timedelta(hours=15)) > low
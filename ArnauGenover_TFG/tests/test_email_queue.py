@@ -0,0 +1,90 @@
+# tests/test_email_queue.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ship_broker.core.database import Base, EmailJob, EmailJobStatus
+from ship_broker.core.email_priority import EmailPrioritizer
+from ship_broker.core.email_queue import EmailQueue
+
+def queue_for(tmp_path, max_attempts=2):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(bind=engine)
+    prioritizer = EmailPrioritizer({}, half_life_hours=24, urgency_days=5, urgency_weight=1.0, aging_per_hour=0.25)
+    return EmailQueue(Session(bind=engine), lease_seconds=60, max_attempts=max_attempts, prioritizer=prioritizer)
+
+def emails(*ids):
+    return [
+        {"message_id": f"<{n}@broker.com>", "subject": f"Circular {n}", "sender": "ops@broker.com",
+         "content": f"MV OCEAN {n}", "received_at": datetime.utcnow()}
+        for n in ids
+    ]
+
+def expire_leases(queue):
+    queue.db.query(EmailJob).update({EmailJob.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    queue.db.commit()
+
+def test_enqueue_ignores_queued_messages(tmp_path):
+    queue = queue_for(tmp_path)
+    assert queue.enqueue(emails(1, 2)) == 2
+    assert queue.enqueue(emails(2, 3)) == 1
+    assert queue.counts()["pending"] == 3
+
+def test_leased_jobs_are_not_leased_again(tmp_path):
+    queue = queue_for(tmp_path)
+    queue.enqueue(emails(1, 2, 3))
+    first = queue.lease("a", 2)
+    second = queue.lease("b", 5)
+    assert len(first) == 2 and len(second) == 1
+    assert not {job["job_id"] for job in first} & {job["job_id"] for job in second}
+    assert queue.lease("c", 5) == []
+    assert queue.counts()["leased"] == 3
+
+def test_expired_lease_is_leased_again(tmp_path):
+    queue = queue_for(tmp_path)
+    queue.enqueue(emails(1))
+    [job] = queue.lease("a", 1)
+    expire_leases(queue)
+    [again] = queue.lease("b", 1)
+    assert again["job_id"] == job["job_id"]
+    # The first worker lost the lease, so its completion is refused
+    assert not queue.complete(job["job_id"], "a")
+    assert queue.complete(job["job_id"], "b")
+
+def test_failed_attempts_are_retried_until_exhausted(tmp_path):
+    queue = queue_for(tmp_path, max_attempts=2)
+    queue.enqueue(emails(1))
+    [job] = queue.lease("a", 1)
+    queue.fail(job["job_id"], "a", "timeout")
+    assert queue.counts()["pending"] == 1
+
+    [job] = queue.lease("a", 1)
+    queue.fail(job["job_id"], "a", "timeout")
+    stored = queue.db.query(EmailJob).one()
+    assert (stored.status, stored.attempts, stored.last_error) == (EmailJobStatus.FAILED, 2, "timeout")
+    assert queue.lease("a", 1) == []
+
+def test_lease_expiring_on_final_attempt_fails_job(tmp_path):
+    queue = queue_for(tmp_path, max_attempts=1)
+    queue.enqueue(emails(1))
+    queue.lease("a", 1)
+    expire_leases(queue)
+    assert queue.lease("b", 1) == []
+    stored = queue.db.query(EmailJob).one()
+    assert (stored.status, stored.last_error) == (EmailJobStatus.FAILED, "Lease expired on final attempt")
+
+def test_complete_is_idempotent_and_drops_body(tmp_path):
+    queue = queue_for(tmp_path)
+    queue.enqueue(emails(1))
+    [job] = queue.lease("a", 1)
+    assert job["content"] == "MV OCEAN 1"
+    assert queue.complete(job["job_id"], "a")
+    assert not queue.complete(job["job_id"], "a")
+    queue.db.expire_all()
+    stored = queue.db.query(EmailJob).one()
+    assert stored.status == EmailJobStatus.DONE
+    assert stored.content is None
+    assert stored.completed_at is not None
+    # A completed job stays queued, so the email is not enqueued again
+    assert queue.enqueue(emails(1)) == 0
@@ -0,0 +1,43 @@
+# tests/test_email_triage.py
+from ship_broker.core.email_triage import EmailTriage, Triage, evaluate, sweep_coverage
+
+LABELLED = "VESSEL: OCEAN STAR\nDWT: 55000\nPOSITION: SINGAPORE\n\nCARGO: COAL\nQUANTITY: 50000 MT\nLOAD PORT: RICHARDS BAY"
+FREE_TEXT = "MV OCEAN STAR 55K DWT OPEN SINGAPORE 10-15 MAY, PLS PROPOSE\n\nM/V BLUE WAVE 63K DWT OPEN QINGDAO EARLY JUNE"
+
+def test_no_content():
+    triage = EmailTriage(regex_coverage=1.0, max_regex_records=10)
+    assert triage.classify("Automatic reply: Positions", LABELLED).label is Triage.NO_CONTENT
+    assert triage.classify("Lunch", "Hi John, are we still on for Friday?").label is Triage.NO_CONTENT
+    assert triage.classify("Weekly news", "Market comment...\n\nUnsubscribe").label is Triage.NO_CONTENT
+    assert triage.classify("Re: Fixture", "Vessel arrived Santos this morning, will revert").label is Triage.NEEDS_LLM
+
+def test_auto_reply_prefixes_are_anchored():
+    triage = EmailTriage(regex_coverage=1.0, max_regex_records=10)
+    assert triage.classify("Read: Positions", LABELLED).label is Triage.NO_CONTENT
+    assert triage.classify("Undeliverable: Positions", LABELLED).label is Triage.NO_CONTENT
+    assert triage.classify("Delivery Status Notification (Failure)", LABELLED).label is Triage.NO_CONTENT
+    assert triage.classify("Must read: open tonnage", LABELLED).label is Triage.REGEX_SUFFICIENT
+    assert triage.classify("Undeliverable tonnage? see list", LABELLED).label is Triage.REGEX_SUFFICIENT
+
+def test_regex_sufficient_and_needs_llm():
+    triage = EmailTriage(regex_coverage=1.0, max_regex_records=10)
+    decision = triage.classify("Positions", LABELLED)
+    assert decision.label is Triage.REGEX_SUFFICIENT
+    assert decision.features.records == decision.features.labelled_records == 2
+    assert triage.classify("Positions", FREE_TEXT).label is Triage.NEEDS_LLM
+    assert EmailTriage(regex_coverage=1.0, max_regex_records=1).classify("Positions", LABELLED).label is Triage.NEEDS_LLM
+
+def test_evaluation_counts_missed_llm_emails():
+    samples = [
+        ("Positions", LABELLED, Triage.REGEX_SUFFICIENT),
+        ("Positions", FREE_TEXT, Triage.NEEDS_LLM),
+        ("Out of office", "I am out of the office until Monday", Triage.NO_CONTENT),
+    ]
+    report = evaluate(EmailTriage(regex_coverage=1.0, max_regex_records=10), samples)
+    assert report.accuracy == 1.0
+    assert report.missed == 0
+    assert round(report.llm_share, 2) == 0.33
+
+    sweep = dict(sweep_coverage(samples, [0.0, 1.0], max_regex_records=10))
+    assert sweep[1.0].missed == 0
+    assert sweep[0.0].llm_share <= sweep[1.0].llm_share
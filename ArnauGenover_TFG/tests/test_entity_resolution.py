@@ -0,0 +1,62 @@
+# tests/test_entity_resolution.py
+from ship_broker.core.entity_resolution import (
+    EntityIndex, cargo_key, find_imo, normalize_name, valid_imo
+)
+
+def test_normalize_name():
+    assert normalize_name("MV Ocean Star") == "OCEAN STAR"
+    assert normalize_name("M/V OCEAN-STAR") == "OCEAN STAR"
+    assert normalize_name("ms ocean star.") == "OCEAN STAR"
+
+def test_imo_check_digit():
+    assert valid_imo("9074729")
+    assert not valid_imo("9074728")
+    assert find_imo("MV OCEAN STAR IMO 9074728 / IMO NO. 9074729") == "9074729"
+
+def test_vessel_matching():
+    index = EntityIndex()
+    index.add_vessel(1, "MV OCEAN STAR", None, 55000)
+    index.add_vessel(2, "OCEAN STAR", "9074729", 82000)
+
+    assert index.match_vessel("M/V Ocean Star", None, 55200) == 1
+    assert index.match_vessel("OCEAN STAR", None, 81500) == 2
+    assert index.match_vessel("Renamed Ship", "9074729", None) == 2
+    assert index.match_vessel("OCEAN STAR", None, 35000) is None
+    assert index.match_vessel("BLUE WAVE", None, 55000) is None
+
+def test_cargo_matching():
+    index = EntityIndex()
+    index.add_cargo(7, cargo_key("Coal", 50000, "Richards Bay", "Rotterdam"))
+
+    assert index.match_cargo(cargo_key("COAL", 50200, "RICHARDS BAY", "ROTTERDAM")) == 7
+    assert index.match_cargo(cargo_key("COAL", 70000, "RICHARDS BAY", "ROTTERDAM")) is None
+
+def test_vessels_with_different_imo_never_merge():
+    index = EntityIndex()
+    index.add_vessel(1, "OCEAN STAR", "9074729", 55000)
+    assert index.match_vessel("OCEAN STAR", "9176187", 55000) is None
+    assert index.match_vessel("OCEAN STAR", "9176187", None) is None
+    assert index.match_vessel("OCEAN STAR", None, 55100) == 1
+
+def test_name_without_dwt_only_matches_a_sole_namesake():
+    index = EntityIndex()
+    index.add_vessel(1, "OCEAN STAR", None, 55000)
+    assert index.match_vessel("OCEAN STAR", None, None) == 1
+    assert index.match_vessel("OCEAN STAR", "9074729", None) == 1
+
+    index.add_vessel(2, "OCEAN STAR", None, 82000)
+    assert index.match_vessel("OCEAN STAR", None, None) is None
+    assert index.match_vessel("OCEAN STAR", None, 81900) == 2
+
+    # A known vessel without DWT is not a match for any DWT once it has namesakes
+    index.add_vessel(3, "BLUE WAVE", None, None)
+    assert index.match_vessel("BLUE WAVE", None, 63000) == 3
+    index.add_vessel(4, "BLUE WAVE", None, 33000)
+    assert index.match_vessel("BLUE WAVE", None, 63000) is None
+
+def test_updated_vessel_is_reindexed():
+    index = EntityIndex()
+    index.add_vessel(1, "OCEAN STAR", None, None)
+    index.add_vessel(1, "OCEAN STAR", None, 55000)
+    assert index.match_vessel("OCEAN STAR", None, 82000) is None
+    assert index.match_vessel("OCEAN STAR", None, 55000) == 1
@@ -0,0 +1,37 @@
+# tests/test_extraction_cache.py
+from ship_broker.core.extraction_cache import ExtractionCache, cache_key
+
+BODY = "MV OCEAN STAR\nDWT: 55000\nOPEN SINGAPORE 10-15 MAY"
+
+def test_key_ignores_quoting_and_whitespace():
+    forwarded = "\n".join("> " + line for line in BODY.splitlines())
+    assert cache_key(BODY, 1, "gpt") == cache_key(forwarded, 1, "gpt")
+    assert cache_key(BODY, 1, "gpt") == cache_key("  MV OCEAN STAR  DWT: 55000\n\nOPEN SINGAPORE 10-15 MAY", 1, "gpt")
+    assert cache_key(BODY, 1, "gpt") != cache_key(BODY, 2, "gpt")
+    assert cache_key(BODY, 1, "gpt") != cache_key(BODY, 1, "other")
+
+def test_hits_and_misses_persist(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ExtractionCache(path, 1024 * 1024)
+    key = cache_key(BODY, 1, "gpt")
+    assert cache.get(key) is None
+    cache.put(key, {"vessels": [{"name": "OCEAN STAR"}], "cargoes": []})
+
+    reopened = ExtractionCache(path, 1024 * 1024)
+    assert reopened.get(key) == {"vessels": [{"name": "OCEAN STAR"}], "cargoes": []}
+    assert cache.stats()["misses"] == 1
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["entries"] == 1
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"), 200)
+    keys = [cache_key(f"{BODY} {i}", 1, "gpt") for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, {"text": key, "index": i})
+        cache.get(keys[0])  # Keep the first entry in use
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 200
+    assert stats["evictions"] > 0
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
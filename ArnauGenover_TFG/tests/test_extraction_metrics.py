@@ -0,0 +1,28 @@
+# tests/test_extraction_metrics.py
+from ship_broker.core.extraction_metrics import PARSER_LLM, PARSER_REGEX, ExtractionMetrics
+
+def test_requests_add_up_per_model():
+    metrics = ExtractionMetrics(parser=PARSER_LLM, backend="openai")
+    metrics.add_request("fast", 100, 20)
+    metrics.add_request("strong", 120, 30, retries=2)
+    metrics.add_request("fast", 80, 10)
+    assert metrics.models == ["fast", "strong"]
+    assert metrics.llm_requests == 5
+    assert metrics.llm_retries == 2
+    assert metrics.total_tokens == 360
+
+def test_columns_match_the_processed_email_record():
+    metrics = ExtractionMetrics(parser=PARSER_LLM, cache_hits=2, cache_misses=1, seconds=1.23456)
+    metrics.add_request("fast", 100, 20)
+    metrics.add_request("strong", 100, 20)
+    columns = metrics.columns()
+    assert columns["models"] == "fast,strong"
+    assert columns["prompt_tokens"] == 200
+    assert columns["extraction_seconds"] == 1.2346
+    assert columns["cache_hits"] == 2 and columns["cache_misses"] == 1
+
+def test_local_extraction_costs_nothing():
+    metrics = ExtractionMetrics()
+    assert metrics.parser == PARSER_REGEX
+    assert metrics.columns()["models"] is None
+    assert metrics.to_dict()["total_tokens"] == 0
@@ -0,0 +1,59 @@
+# tests/test_fake_imap_server.py
+import email
+import imaplib
+from datetime import datetime, timedelta
+
+from ship_broker.core.fake_imap_server import FakeIMAPConfig, FakeIMAPServer, synthetic_mailbox
+
+CONFIG = FakeIMAPConfig(messages=20, attachment_rate=0.5, attachment_bytes=20_000, days=10, seed=7)
+
+def connect(server):
+    mail = imaplib.IMAP4(*server.address)
+    mail.login("bench", "bench")
+    return mail
+
+def test_synthetic_mailbox_is_reproducible_and_mixed():
+    now = datetime(2025, 5, 10)
+    first, second = synthetic_mailbox(CONFIG, now), synthetic_mailbox(CONFIG, now)
+    assert [date for _, date in first] == [date for _, date in second]
+    assert len(first) == 20
+    parsed = [email.message_from_bytes(raw) for raw, _ in first]
+    assert any(message.is_multipart() for message in parsed)
+    assert all("DWT" in raw.decode() or "CARGO" in raw.decode() for raw, _ in first)
+
+def test_search_and_fetch_the_headers_then_part_of_the_body():
+    with FakeIMAPServer(CONFIG) as server:
+        mail = connect(server)
+        assert mail.select("INBOX") == ("OK", [b"20"])
+        since = (datetime.utcnow() - timedelta(days=3)).strftime("%d-%b-%Y")
+        _, found = mail.search(None, f'(SINCE "{since}")')
+        numbers = found[0].split()
+        assert 0 < len(numbers) < 20
+
+        _, data = mail.fetch(numbers[0], "(RFC822.SIZE BODY.PEEK[HEADER.FIELDS (MESSAGE-ID SUBJECT FROM DATE)])")
+        headers = email.message_from_bytes(data[0][1])
+        assert headers["Message-ID"] and headers["Date"]
+        assert b"RFC822.SIZE" in data[0][0]
+        assert b"To:" not in data[0][1]
+
+        _, data = mail.fetch(numbers[0], "(BODY.PEEK[]<0.100>)")
+        assert len(data[0][1]) == 100
+        mail.logout()
+
+        stats = server.stats()
+        # CAPABILITY, LOGIN, SELECT, SEARCH, two FETCHes and LOGOUT
+        assert stats["commands"] == 7
+        assert stats["command_fetch"] == 2
+        assert stats["bytes_sent"] > 100
+
+def test_idle_announces_delivered_mail():
+    with FakeIMAPServer(CONFIG) as server:
+        mail = connect(server)
+        mail.select("INBOX")
+        tag = mail._new_tag()
+        mail.send(tag + b" IDLE\r\n")
+        assert mail.readline().startswith(b"+")
+        server.deliver(b"Subject: new\n\nMV OCEAN STAR OPEN")
+        assert mail.readline() == b"* 21 EXISTS\r\n"
+        mail.send(b"DONE\r\n")
+        assert mail.readline().startswith(tag + b" OK")
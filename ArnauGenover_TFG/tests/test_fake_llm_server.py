@@ -0,0 +1,78 @@
+# tests/test_fake_llm_server.py
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ship_broker.core.extraction_backend import ExtractionBackend, RegexBackend, get_extraction_backend
+from ship_broker.core.fake_llm_server import FakeLLMConfig, FakeLLMServer
+
+ANSWER = {"vessels": [{"name": "MV OCEAN STAR", "dwt": 56000}], "cargoes": []}
+
+def post(server, content="Email content:\nMV OCEAN STAR"):
+    request = urllib.request.Request(
+        f"{server.url}/chat/completions",
+        data=json.dumps({"model": "fake-llm", "messages": [{"role": "user", "content": content}]}).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status, dict(response.headers), json.loads(response.read())
+
+def test_canned_response_in_chat_completion_format():
+    config = FakeLLMConfig(latency=0, responses=[("OCEAN STAR", json.dumps(ANSWER))])
+    with FakeLLMServer(config) as server:
+        status, _, body = post(server)
+        assert status == 200
+        assert json.loads(body["choices"][0]["message"]["content"]) == ANSWER
+        assert body["usage"]["total_tokens"] > 0
+        _, _, body = post(server, "something else")
+        assert json.loads(body["choices"][0]["message"]["content"]) == {"vessels": [], "cargoes": []}
+
+def test_injected_errors():
+    with FakeLLMServer(FakeLLMConfig(latency=0, error_rate=1.0)) as server:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(server)
+        assert error.value.code == 500
+        assert server.stats()["errors"] == 1
+
+def test_quota_answers_429_with_rate_limit_headers():
+    with FakeLLMServer(FakeLLMConfig(latency=0, requests_per_minute=1)) as server:
+        _, headers, _ = post(server)
+        assert headers["x-ratelimit-remaining-requests"] == "0"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(server)
+        assert error.value.code == 429
+        assert float(error.value.headers["retry-after"]) > 0
+
+def test_regex_backend_leaves_extraction_to_the_regexes():
+    backend = get_extraction_backend("regex")
+    assert isinstance(backend, RegexBackend)
+    assert backend.extract_info("MV OCEAN STAR") == {"vessels": [], "cargoes": []}
+    with pytest.raises(ValueError):
+        get_extraction_backend("nope")
+
+def test_backend_without_extract_info_cannot_be_created():
+    class Incomplete(ExtractionBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_streamed_answer_and_truncation():
+    config = FakeLLMConfig(latency=0, responses=[("OCEAN STAR", json.dumps(ANSWER))], chunk_chars=8)
+    with FakeLLMServer(config) as server:
+        chunks = server.completion_chunks({"messages": [{"role": "user", "content": "MV OCEAN STAR"}]})
+        text = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+        assert json.loads(text) == ANSWER
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    with FakeLLMServer(FakeLLMConfig(latency=0, truncate_rate=1.0)) as server:
+        request = urllib.request.Request(
+            f"{server.url}/chat/completions",
+            data=json.dumps({"messages": [{"role": "user", "content": "x"}], "stream": True}).encode()
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            body = response.read().decode()
+        assert body.startswith("data: ")
+        assert "[DONE]" not in body
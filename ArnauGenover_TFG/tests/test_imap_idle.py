@@ -0,0 +1,58 @@
+# tests/test_imap_idle.py
+import asyncio
+import time
+
+import pytest
+
+from ship_broker.core.fake_imap_server import FakeIMAPConfig, FakeIMAPServer
+from ship_broker.core.imap_idle import ImapIdleListener
+
+CONFIG = FakeIMAPConfig(messages=3, attachment_rate=0.0, seed=7)
+
+def listener_for(server, notified):
+    async def on_new_mail():
+        notified.append(time.monotonic())
+
+    host, port = server.address
+    # A renewal far beyond the test, so only announced mail can end an IDLE cycle
+    return ImapIdleListener("bench", "bench", host, on_new_mail, idle_timeout=600, imap_port=port, imap_ssl=False)
+
+async def wait_for_calls(notified, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while len(notified) < count and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return len(notified)
+
+@pytest.mark.asyncio
+async def test_resync_on_connect_then_new_mail_and_stop():
+    with FakeIMAPServer(CONFIG) as server:
+        notified = []
+        listener = listener_for(server, notified)
+        task = asyncio.create_task(listener.run())
+        try:
+            assert await wait_for_calls(notified, 1) == 1
+            await asyncio.sleep(0.3)
+            server.deliver(b"Subject: new\n\nMV OCEAN STAR OPEN")
+            assert await wait_for_calls(notified, 2) == 2
+        finally:
+            await listener.stop()
+            await asyncio.wait_for(task, timeout=5)
+
+@pytest.mark.asyncio
+async def test_updates_arriving_in_one_packet_are_all_read():
+    with FakeIMAPServer(CONFIG) as server:
+        notified = []
+        listener = listener_for(server, notified)
+        task = asyncio.create_task(listener.run())
+        try:
+            assert await wait_for_calls(notified, 1) == 1
+            await asyncio.sleep(0.3)
+
+            # EXPUNGE then EXISTS in one write: the EXISTS line sits in imaplib's buffer
+            with server.batch():
+                server.expunge(1)
+                server.deliver(b"Subject: new\n\nMV OCEAN STAR OPEN")
+            assert await wait_for_calls(notified, 2) == 2
+        finally:
+            await listener.stop()
+            await asyncio.wait_for(task, timeout=5)
@@ -0,0 +1,42 @@
+# tests/test_json_stream.py
+import json
+
+from ship_broker.core.json_stream import RecordStream
+
+ANSWER = {
+    "vessels": [
+        {"name": "MV OCEAN {1}", "dwt": 56000, "gear": ["4 x 30T", "]"], "notes": {"rate": "USD 42.50/MT"}},
+        {"name": "MV \"SEA\" LION"}
+    ],
+    "remarks": "none",
+    "cargoes": [{"cargo_type": "COAL", "quantity": 50000}]
+}
+
+def feed_in_pieces(text, size):
+    stream = RecordStream(("vessels", "cargoes"))
+    records = []
+    for start in range(0, len(text), size):
+        records.extend(stream.feed(text[start:start + size]))
+    return stream, records
+
+def test_records_come_out_whole_whatever_the_chunking():
+    text = json.dumps(ANSWER, indent=2)
+    for size in (1, 5, 64, len(text)):
+        stream, records = feed_in_pieces(text, size)
+        assert stream.complete
+        assert records == [("vessels", v) for v in ANSWER["vessels"]] + [("cargoes", c) for c in ANSWER["cargoes"]]
+
+def test_each_record_is_returned_as_soon_as_it_closes():
+    stream = RecordStream(("vessels", "cargoes"))
+    assert stream.feed('{"vessels": [{"name": "A"') == []
+    assert stream.feed('}, {"na') == [("vessels", {"name": "A"})]
+
+def test_malformed_record_is_skipped_alone():
+    stream, records = feed_in_pieces('{"vessels": [{"name": "A"}, {"name": "B",,}, {"name": "C"}]}', 7)
+    assert [record["name"] for _, record in records] == ["A", "C"]
+    assert stream.skipped == 1
+
+def test_truncated_answer_keeps_completed_records():
+    stream, records = feed_in_pieces('{"vessels": [{"name": "A"}], "cargoes": [{"cargo_type": "CO', 3)
+    assert records == [("vessels", {"name": "A"})]
+    assert not stream.complete
@@ -0,0 +1,140 @@
+# tests/test_llm_client.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from openai import APITimeoutError, InternalServerError, RateLimitError
+
+from ship_broker.core.fake_llm_server import FakeLLMConfig, FakeLLMServer
+from ship_broker.core.llm_client import LLMClient, backoff_delay, parse_duration, retry_after
+
+def test_parse_reset_durations():
+    assert parse_duration("1s") == 1.0
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("250ms") == 0.25
+    assert parse_duration("1h2m") == 3720.0
+    assert parse_duration("12") == 12.0
+    assert parse_duration(None) is None
+    assert parse_duration("soon") is None
+
+def test_retry_after_headers():
+    assert retry_after({"retry-after-ms": "1500"}) == 1.5
+    assert retry_after({"retry-after": "3"}) == 3.0
+    assert retry_after({"retry-after": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0.0
+    assert retry_after({}) is None
+
+def test_backoff_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, 1.0, 8.0) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 8.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+def _client(server, **overrides):
+    options = dict(max_concurrency=2, timeout=5, max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    options.update(overrides)
+    return LLMClient("unused", base_url=server.url, **options)
+
+def _complete(llm):
+    return llm.create(model="fake-llm", messages=[{"role": "user", "content": "MV OCEAN STAR"}])
+
+class _InFlight:
+    """Peak of the requests the server is answering at once"""
+
+    def __init__(self, server):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        admit, completion = server.admit, server.completion
+
+        def admitted():
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            return admit()
+
+        def answered(request):
+            # Built after the latency, before the client can read it
+            with self.lock:
+                self.active -= 1
+            return completion(request)
+
+        server.admit, server.completion = admitted, answered
+
+def test_requests_in_flight_stay_under_the_limit():
+    with FakeLLMServer(FakeLLMConfig(latency=0.1)) as server:
+        in_flight = _InFlight(server)
+        llm = _client(server, max_concurrency=2)
+        try:
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                list(pool.map(lambda _: _complete(llm), range(6)))
+        finally:
+            llm.close()
+    assert in_flight.peak == 2
+    assert llm.stats()["requests"] == 6
+
+def test_server_errors_are_retried():
+    with FakeLLMServer(FakeLLMConfig(latency=0, error_rate=0.5, seed=3)) as server:
+        llm = _client(server, max_retries=10)
+        try:
+            for _ in range(4):
+                _complete(llm)
+        finally:
+            llm.close()
+    stats = llm.stats()
+    assert stats["retries"] == server.stats()["errors"] > 0
+    assert stats["requests"] == 4 + stats["retries"]
+    assert stats["failures"] == 0
+
+def test_exhausted_retries_raise():
+    with FakeLLMServer(FakeLLMConfig(latency=0, error_rate=1.0)) as server:
+        llm = _client(server, max_retries=2)
+        try:
+            with pytest.raises(InternalServerError):
+                _complete(llm)
+        finally:
+            llm.close()
+    assert llm.stats() == {"requests": 3, "retries": 2, "throttled": 0, "failures": 1}
+
+def test_rate_limit_pauses_every_request_until_the_quota_resets():
+    with FakeLLMServer(FakeLLMConfig(latency=0, rate_limit_rate=1.0, retry_after=0.3)) as server:
+        llm = _client(server, max_concurrency=1, max_retries=1)
+        try:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                calls = [pool.submit(_complete, llm) for _ in range(2)]
+                for call in calls:
+                    with pytest.raises(RateLimitError):
+                        call.result()
+            elapsed = time.monotonic() - started
+        finally:
+            llm.close()
+    # Each 429 held back the next request, whichever caller sent it
+    assert server.stats()["requests"] == 4
+    assert elapsed >= 0.6
+    stats = llm.stats()
+    assert stats["retries"] == 2
+    assert stats["throttled"] >= 2
+
+def test_spent_quota_headers_hold_back_the_next_request():
+    with FakeLLMServer(FakeLLMConfig(latency=0, requests_per_minute=1)) as server:
+        llm = _client(server)
+        try:
+            _complete(llm)
+            assert llm._resume_at > time.monotonic() + 30
+            assert llm.stats()["throttled"] == 0
+        finally:
+            llm.close()
+
+def test_hung_request_times_out_and_is_retried():
+    config = FakeLLMConfig(latency=0, timeout_rate=1.0, hang_seconds=2.0)
+    with FakeLLMServer(config) as server:
+        llm = _client(server, timeout=0.2, max_retries=1)
+        try:
+            started = time.monotonic()
+            with pytest.raises(APITimeoutError):
+                _complete(llm)
+            assert time.monotonic() - started < 2.0
+        finally:
+            llm.close()
+    assert llm.stats()["retries"] == 1
+    assert server.stats()["timeouts"] == 2
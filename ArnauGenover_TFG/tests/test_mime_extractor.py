@@ -0,0 +1,68 @@
+# tests/test_mime_extractor.py
+import email
+from email.message import EmailMessage
+
+from ship_broker.core.mime_extractor import MimeTextExtractor, extract_text, message_text
+
+CIRCULAR = "MV OCEAN STAR\nDWT: 56000\nOPEN AT SINGAPORE 10-15 MAY\n"
+
+def _forward() -> bytes:
+    inner = EmailMessage()
+    inner["Subject"] = "Open tonnage"
+    inner.set_content(CIRCULAR)
+    outer = EmailMessage()
+    outer["Subject"] = "Fwd: Open tonnage"
+    outer["Message-ID"] = "<fwd@example.com>"
+    outer.set_content("Please see below.\n")
+    outer.add_related(b"\x89PNG" + bytes(2000), maintype="image", subtype="png", cid="<logo>")
+    outer.add_attachment(inner)
+    return outer.as_bytes()
+
+def _with_attachment(text: str, charset: str = "utf-8", cte: str = None) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = "Cargo"
+    message.set_content(text, charset=charset, cte=cte)
+    message.add_attachment(bytes(50000), maintype="application", subtype="pdf", filename="q88.pdf")
+    return message.as_bytes()
+
+def test_forwarded_circular_after_inline_image_is_kept():
+    raw = _forward()
+    text = extract_text(raw)
+    assert "Please see below." in text
+    assert "MV OCEAN STAR" in text
+    assert text == message_text(email.message_from_bytes(raw))
+
+def test_base64_and_quoted_printable_parts_are_decoded():
+    for cte in ("base64", "quoted-printable"):
+        raw = _with_attachment("Cargo: 50,000 MT COAL ± 10%\n", cte=cte)
+        text = extract_text(raw)
+        assert "COAL ± 10%" in text
+        assert text == message_text(email.message_from_bytes(raw))
+
+def test_html_only_body_is_converted():
+    message = EmailMessage()
+    message.set_content("<html><body><p>MV OCEAN STAR</p><table><tr><td>DWT</td><td>56000</td></tr></table></body></html>",
+                        subtype="html")
+    assert extract_text(message.as_bytes()) == "MV OCEAN STAR\nDWT 56000"
+
+def test_done_only_after_outer_multipart_closes():
+    raw = _forward()
+    extractor = MimeTextExtractor()
+    for start in range(0, len(raw), 64):
+        assert not extractor.done
+        extractor.feed(raw[start:start + 64])
+    assert extractor.done
+    assert "MV OCEAN STAR" in extractor.close()
+    assert extractor.headers["Subject"] == "Fwd: Open tonnage"
+
+def test_part_and_total_caps():
+    raw = _with_attachment(("A" * 70 + "\n") * 100, cte="7bit")
+    extractor = MimeTextExtractor(max_part_bytes=1000)
+    extractor.feed(raw)
+    assert len(extractor.close()) == 1000
+    assert extractor.truncated
+
+    extractor = MimeTextExtractor(max_total_bytes=300)
+    extractor.feed(raw)
+    assert extractor.done
+    assert len(extractor.close()) == 300
@@ -0,0 +1,49 @@
+# tests/test_model_router.py
+from ship_broker.core.model_router import ModelRouter, check_schema
+
+BLOCK = "\n\n".join(
+    f"MV OCEAN {i}\nDWT: {50000 + i}\nOPEN AT SINGAPORE 10-15 MAY" for i in range(3)
+)
+
+def vessels(*numbers):
+    return {"vessels": [{"name": f"MV OCEAN {i}", "dwt": 50000 + i} for i in numbers], "cargoes": []}
+
+def router():
+    return ModelRouter("fast-model", "strong-model", min_confidence=0.8)
+
+def test_complete_valid_answer_stays_with_the_fast_model():
+    assessment = router().assess(BLOCK, vessels(0, 1, 2), complete=True)
+    assert assessment.accepted
+    assert assessment.confidence == 1.0
+
+def test_missing_records_escalate():
+    assessment = router().assess(BLOCK, vessels(0), complete=True)
+    assert not assessment.accepted
+    assert "sections" in assessment.reason
+
+def test_cut_off_and_invented_answers_escalate():
+    assert not router().assess(BLOCK, vessels(0, 1, 2), complete=False).accepted
+    invented = {"vessels": [{"name": f"MV SEA {i}", "dwt": 1} for i in range(3)], "cargoes": []}
+    assert router().assess(BLOCK, invented, complete=True).reason == "vessel names not in the text"
+
+def test_validator_failures_escalate_and_are_counted():
+    r = router()
+    assessment = r.assess(BLOCK, vessels(0, 1, 2), complete=True, validate=lambda kind, record: False)
+    assert assessment.reason == "failed validation"
+    r.record(assessment)
+    r.record(r.assess(BLOCK, vessels(0, 1, 2), complete=True))
+    stats = r.stats()
+    assert stats["escalated"] == 1 and stats["accepted_fast"] == 1
+    assert stats["escalation_rate"] == 0.5
+    assert stats["reasons"] == {"failed validation": 1}
+
+def test_schema_checks():
+    assert check_schema("vessels", {"name": "MV A", "dwt": "56,000"}) is None
+    assert check_schema("vessels", {"name": "", "dwt": 1}) == "record without a name"
+    assert check_schema("cargoes", {"cargo_type": "COAL", "quantity": "lots"}) == "non-numeric quantity"
+    assert check_schema("cargoes", {"cargo_type": "COAL", "laycan_start": 5}) == "malformed date"
+
+def test_routing_needs_two_different_models():
+    assert router().enabled
+    assert not ModelRouter("", "strong-model", 0.8).enabled
+    assert not ModelRouter("strong-model", "strong-model", 0.8).enabled
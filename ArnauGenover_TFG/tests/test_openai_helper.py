@@ -0,0 +1,40 @@
+# tests/test_openai_helper.py
+import json
+
+import pytest
+
+from ship_broker.config import settings
+from ship_broker.core.fake_llm_server import FakeLLMConfig, FakeLLMServer
+from ship_broker.core.llm_client import LLMClient
+from ship_broker.core.model_router import ModelRouter
+from ship_broker.core.openai_helper import OpenAIHelper
+
+NAMES = [f"SEA {chr(65 + i)}{chr(65 + i)}" for i in range(20)]
+
+@pytest.fixture
+def helper_for(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_CACHE_ENABLED", False)
+    clients = []
+
+    def make(server):
+        llm = LLMClient("unused", max_concurrency=4, timeout=5, max_retries=0,
+                        backoff_base=0.01, backoff_max=0.01, base_url=server.url)
+        clients.append(llm)
+        # The strong model only, so each block is one request
+        return OpenAIHelper(llm=llm, model="fake-llm", router=ModelRouter("", "fake-llm", 0.8))
+
+    yield make
+    for llm in clients:
+        llm.close()
+
+def test_long_circular_keeps_its_tail_under_the_token_budget(helper_for, monkeypatch):
+    # Far more records than the budget allows in one request
+    content = "\n\n".join(f"M/V {name}\nDWT {30000 + i * 1000}\nOPEN AT SINGAPORE" for i, name in enumerate(NAMES))
+    monkeypatch.setattr(settings, "EXTRACTION_TOKEN_BUDGET", 100)
+    monkeypatch.setattr(settings, "EXTRACTION_BLOCK_CHARS", 60)  # One record per block
+    responses = [(name, json.dumps({"vessels": [{"name": name}], "cargoes": []})) for name in NAMES]
+
+    with FakeLLMServer(FakeLLMConfig(latency=0, responses=responses)) as server:
+        result = helper_for(server).extract_info(content)
+    assert {vessel['name'] for vessel in result['vessels']} == set(NAMES)
+    assert server.stats()["requests"] > 1
@@ -0,0 +1,42 @@
+# tests/test_ports.py
+from ship_broker.core.email_parser import EmailParser
+from ship_broker.core.ports import PORTS, find_ports, get_port, resolve_port, resolve_port_id
+from ship_broker.core.vessel_tracker import VesselTracker
+
+def test_resolve_aliases_to_one_id():
+    assert resolve_port_id("Richards Bay") == "ZARCB"
+    assert resolve_port_id("RBCT") == "ZARCB"
+    assert resolve_port_id("RICHARDS BAY, SOUTH AFRICA") == "ZARCB"
+    assert resolve_port_id("zarcb") == "ZARCB"
+    assert resolve_port_id("Nowhere") is None
+
+def test_longest_name_wins():
+    assert resolve_port_id("NEWCASTLE, AUSTRALIA") == "AUNTL"
+    assert resolve_port_id("Newcastle upon Tyne") == "GBNCL"
+    assert resolve_port_id("PT HEDLAND") == resolve_port_id("Port-Hedland") == "AUPHE"
+
+def test_find_ports_in_order():
+    text = "50,000 MT COAL FROM RICHARDS BAY TO ROTTERDAM / ANTWERP, LAYCAN 10-15 MAY"
+    assert [match.value for match in find_ports(text)] == ["ZARCB", "NLRTM", "BEANR"]
+    # Port names inside other words are not hits
+    assert find_ports("SANTOSH TRADING, GOAL 1") == []
+
+def test_coordinates():
+    port = get_port("SGSIN")
+    assert port.name == "SINGAPORE"
+    assert resolve_port("Singapore") is port
+    assert all(-90 <= p.lat <= 90 and -180 <= p.lon <= 180 for p in PORTS.values())
+
+def test_route_ports_need_an_explicit_cue():
+    route = EmailParser("", "", db=None, use_ai=False).extract_route
+    assert route("50,000 MT COAL RICHARDS BAY/ROTTERDAM", None, None) == ("RICHARDS BAY", "ROTTERDAM")
+    assert route("50,000 MT COAL LOADING AT RICHARDS BAY", None, None) == ("RICHARDS BAY", None)
+    assert route("50,000 MT COAL RICHARDS BAY TO ROTTERDAM", None, "ROTTERDAM") == ("RICHARDS BAY", "ROTTERDAM")
+    # An open position or bunkering port named first is not the load port
+    assert route("VSL OPEN SINGAPORE, BUNKERS ROTTERDAM. 50,000 MT COAL", None, None) == (None, None)
+    assert route("50,000 MT COAL, VSL OPEN FROM SINGAPORE", None, None) == (None, None)
+
+def test_unknown_port_id_falls_back_to_the_name():
+    tracker = VesselTracker()
+    assert tracker._get_port_coordinates("Singapore", "XXXXX") == {"lat": 1.2833, "lon": 103.85}
+    assert tracker._get_port_coordinates(None, "XXXXX") is None
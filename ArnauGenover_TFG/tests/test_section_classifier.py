@@ -0,0 +1,93 @@
+# tests/test_section_classifier.py
+import re
+
+from ship_broker.core.section_classifier import scan_section, scan_sections
+
+# The per-field regexes the parser ran one re.search at a time before the single scan
+DATE = r'[\d\-\.\/]+\s*(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)?(?:\s*\d{4})?'
+OLD_CLASSIFIERS = {
+    'has_vessel_indicators': [
+        r'M/V\s+[A-Z]', r'\bVESSEL\s+(?:DETAILS?|SPECS?|NAME)\b', r'\bDWT\b', r'\bIMO\s+NO\b', r'\bBUILT\b',
+        r'\bFLAG\b', r'\bCLASS\b', r'\bVESSEL\s+POSITION\b', r'\bOPEN\s+(?:AT|IN|FROM)\b', r'\bETA\b'
+    ],
+    'has_cargo_indicators': [
+        r'\b\d{4,6}\s*(?:MT|MTS|KMT|K|TONS?|DWT)\b', r'\bLAYCAN\b', r'\bFREIGHT\s+RATE\b', r'\bLOAD(?:ING)?\s+PORT\b',
+        r'\bDISCH(?:ARGE)?\s+PORT\b', r'\bCARGO\s+READY\b', r'\bDWCC\b', r'\bCBFT\b',
+        r'\bPROPOSE\s+(?:SUITABLE\s+)?C(?:AR)?GOES?\b', r'\bOPEN\s+(?:AT|IN|FROM|ON)\b', r'\bGR:\d', r'\bCRANES?\b'
+    ],
+    'is_vessel_section': [
+        r'\bVESSEL\s+(?:DETAILS?|SPECS?|NAME)\b', r'\bDWT\b', r'\bIMO\s+NO\b', r'\bBUILT\b', r'\bFLAG\b',
+        r'\bCLASS\b', r'\bVESSEL\s+POSITION\b'
+    ],
+    'is_position_update': [
+        r'\b(?:CURRENT\s+)?POSITION\b', r'\bETA\b', r'\bOPEN\s+(?:AT|IN|FROM)\b', r'\bARRIVING\b',
+        r'\bDEPARTING\b', r'\bEXPECTED\b'
+    ],
+    'is_cargo_section': [
+        r'\bCARGO\b', r'\bLAYCAN\b', r'\bFREIGHT\b', r'\bRATE\b', r'\bPROPOSE\s+SUITABLE\s+CGOES\b', r'\bMT\b',
+        r'\bQUANTITY\b', r'\bDWCC\b', r'\bCBFT\b'
+    ],
+    'is_vessel_block': [r'VESSEL\s+DETAILS?:?', r'M/?V\s+', r'NAME\s*:', r'SHIP\s+DETAILS?:?'],
+    'has_cargo_headers': [r'PROPOSE\s+(?:SUITABLE\s+)?CGOES', r'PLS\s+(?:DO\s+)?NOT\s+RECIRCULATE', r'AVAILABLE\s+CARGOES?:'],
+}
+OLD_FIELDS = {
+    'cargo_type': r'(?:CARGO|COMMODITY)\s*:?\s*([A-Z][A-Z\s]+)',
+    'quantity_value': r'(?:QUANTITY|QTY|AMOUNT)\s*:?\s*([\d,\.]+)\s*(?:MT|MTS|KMT|K|TONS?)',
+    'load_port_value': r'(?:LOAD(?:ING)?\s+PORT|FROM)\s*:?\s*([A-Z][A-Z\s,]+)',
+    'discharge_port_value': r'(?:DISCH(?:ARGE)?\s+PORT|TO)\s*:?\s*([A-Z][A-Z\s,]+)',
+    'vessel_name': r'(?:VESSEL|NAME|M/?V)\s*:?\s*([A-Z][A-Z\s]+)',
+    'dwt_value': r'(?:DWT|DEADWEIGHT)\s*:?\s*([\d,\.]+)',
+    'position_value': r'(?:POSITION|PORT|LOC)\s*:?\s*([A-Z][A-Z\s]+)',
+    'type_value': r'(?:TYPE|VESSEL TYPE)\s*:?\s*([A-Z][A-Z\s]+)',
+    'eta_value': r'ETA\s*:?\s*(' + DATE + ')',
+    'open_value': r'OPEN\s*:?\s*(' + DATE + ')',
+}
+OLD_RATES = [
+    r'(?:FREIGHT|RATE)\s*:?\s*(?:USD|US\$|\$)?\s*([\d,\.]+)(?:\s*(?:USD|US\$|\$|\/)?\s*(?:MT|TON|PER MT|PMT))',
+    r'(?:USD|US\$|\$)\s*([\d,\.]+)(?:\s*(?:\/|\s+PER\s+)?(?:MT|TON|METRIC TON))',
+    r'([\d,\.]+)\s*(?:USD|US\$|\$)(?:\s*(?:\/|\s+PER\s+)?(?:MT|TON|METRIC TON))',
+]
+
+SECTIONS = [
+    "VESSEL DETAILS:\nM/V OCEAN STAR\nDWT: 56,000\nBUILT 2012, FLAG PANAMA, CLASS NK\nPOSITION: SINGAPORE\nOPEN: 10-15 MAY 2025",
+    "MV Blue Wave 63k dwt open at Qingdao eta 12/06 pls propose cargoes",
+    "Name: Golden Ray\nType: Supramax\nDeadweight 58200\nCurrent position Rotterdam, arriving 20.11",
+    "CARGO: COAL\nQUANTITY: 50,000 MT\nLOAD PORT: RICHARDS BAY\nDISCHARGE PORT: ROTTERDAM\nLAYCAN 10-15 MAY\nFREIGHT RATE: USD 18.50/MT",
+    "Commodity: wheat in bulk, qty 30000 mts from Santos to Tokyo, rate 22.75 USD per metric ton",
+    "PROPOSE SUITABLE CGOES\nPLS DO NOT RECIRCULATE\nAVAILABLE CARGOES: urea 25000 tons, DWCC 28000, 1.2M CBFT, GR:1250000",
+    "$ 31.5/ton basis 1/1, amount 12.000 kmt cement, loc: houston, cranes 4x30t",
+    "Dear all, good morning. Regards, Ops desk",
+    "m/v sea lion - 33,000 DWT HANDYSIZE - open on 01 dec 2025 expected departing nola",
+    "",
+]
+
+def old_scan(text):
+    flags = {
+        name: any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+        for name, patterns in OLD_CLASSIFIERS.items()
+    }
+    fields = {}
+    for name, pattern in OLD_FIELDS.items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            fields[name] = match.group(1)
+    rate = None
+    for pattern in OLD_RATES:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            rate = match.group(1)
+            break
+    return flags, fields, rate
+
+def test_scan_matches_the_per_field_regexes():
+    for text in SECTIONS:
+        scan = scan_section(text)
+        flags, fields, rate = old_scan(text)
+        assert {name: getattr(scan, name) for name in flags} == flags, text
+        assert {name: scan.get(name) for name in fields} == fields, text
+        assert all(scan.get(name) is None for name in OLD_FIELDS if name not in fields), text
+        assert scan.rate() == rate, text
+
+def test_sections_are_split_on_blank_lines():
+    scans = scan_sections("\n\n  \n".join(SECTIONS[:3]))
+    assert [scan.text for scan in scans] == SECTIONS[:3]
@@ -0,0 +1,49 @@
+# tests/test_sender_templates.py
+from ship_broker.core.date_normalizer import normalize_date
+from ship_broker.core.email_parser import VesselData
+from ship_broker.core.sender_templates import TemplateCache, sender_address
+
+SENDER = "ops@broker.com"
+
+LEARNED = """Dear all, pls find our positions:
+
+1) MV OCEAN STAR - 55,000 DWT SUPRAMAX - OPEN SANTOS 07-11
+2) MV BLUE WAVE - 61,500 DWT ULTRAMAX - OPEN QINGDAO 15-11
+
+Best regards"""
+
+LLM_VESSELS = [
+    VesselData("OCEAN STAR", 55000, "SANTOS", open_date=normalize_date("07-11"), vessel_type="SUPRAMAX"),
+    VesselData("BLUE WAVE", 61500, "QINGDAO", open_date=normalize_date("15-11"), vessel_type="ULTRAMAX"),
+]
+
+NEW_EMAIL = """Hello,
+
+3) MV GOLDEN RAY - 58,200 DWT SUPRAMAX - OPEN ROTTERDAM 20-11
+4) MV SEA LION - 33,000 DWT HANDYSIZE - OPEN NOLA early Dec
+
+rgds"""
+
+def test_template_needs_support_before_use():
+    cache = TemplateCache(min_support=2)
+    assert cache.learn(SENDER, LEARNED, LLM_VESSELS, []) == 2
+    assert cache.apply(SENDER, NEW_EMAIL) is None
+
+    cache.learn(SENDER, LEARNED, LLM_VESSELS, [])
+    match = cache.apply(SENDER, NEW_EMAIL)
+    assert match.confidence == 1.0
+    assert [v["name"] for v in match.vessels] == ["GOLDEN RAY", "SEA LION"]
+    assert match.vessels[0]["dwt"] == 58200
+    assert match.vessels[0]["position"] == "ROTTERDAM"
+    assert match.vessels[1]["open_date"] == normalize_date("early Dec")
+
+def test_unknown_layout_lowers_confidence():
+    cache = TemplateCache(min_support=1, min_confidence=0.8)
+    cache.learn(SENDER, LEARNED, LLM_VESSELS, [])
+    mixed = NEW_EMAIL + "\nMV ODD ONE 45,000 DWT open spore ppt"
+    assert cache.apply(SENDER, mixed) is None
+    assert cache.apply("other@broker.com", NEW_EMAIL) is None
+
+def test_sender_address():
+    assert sender_address('"Broker Ops" <Ops@Broker.COM>') == SENDER
+    assert sender_address(None) is None